@@ -0,0 +1,98 @@
+"""Latency of POST /fraud/check through the full app, per API key middleware.
+
+Compares the previous ``BaseHTTPMiddleware`` implementation ("before") with the
+raw ASGI ``ApiKeyMiddleware`` ("after"), in-process over httpx's ASGI transport.
+
+    PYTHONPATH=src python benchmarks/api_key_middleware.py [--requests N]
+"""
+
+import argparse
+import asyncio
+import hmac
+import os
+import statistics
+from time import perf_counter
+
+# Every request comes from the same test client IP; "prod" keeps DEBUG logs out.
+os.environ.setdefault("APP__FRAUD__RATE_LIMIT_MAX_REQUESTS_PER_IP", "10000000")
+os.environ.setdefault("APP__ENV", "prod")
+
+import httpx
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+
+from app.api.middleware import ApiKeyMiddleware
+from app.application import get_production_app
+
+_API_KEY = "benchmark-key"
+_PAYLOAD = {
+    "navigator": {
+        "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+        "language": "en-US",
+        "languages": ["en-US", "en"],
+        "platform": "Win32",
+        "webdriver": False,
+        "hardware_concurrency": 8,
+        "device_memory": 8,
+        "max_touch_points": 0,
+        "plugins_count": 5,
+    },
+    "screen": {"width": 1920, "height": 1080, "pixel_ratio": 1},
+    "viewport": {"width": 1200, "height": 800},
+    "location": {"timezone": "Europe/Berlin", "utc_offset_minutes": 60},
+}
+
+
+class _BaseHttpApiKeyMiddleware(BaseHTTPMiddleware):
+    """The ``BaseHTTPMiddleware`` implementation this benchmark compares against."""
+
+    def __init__(self, app, api_keys: list[str]) -> None:
+        super().__init__(app)
+        self._api_key = api_keys[0]
+
+    async def dispatch(self, request, call_next):
+        provided = request.headers.get("X-API-Key", "")
+        if not hmac.compare_digest(provided, self._api_key):
+            return JSONResponse(
+                {"detail": "Invalid or missing API key"}, status_code=401
+            )
+        return await call_next(request)
+
+
+async def _measure(middleware: type, requests: int) -> list[float]:
+    app = get_production_app()
+    app.add_middleware(middleware, api_keys=[_API_KEY])
+    transport = httpx.ASGITransport(app=app)
+    headers = {"X-API-Key": _API_KEY, "User-Agent": _PAYLOAD["navigator"]["user_agent"]}
+    timings = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for index in range(requests + requests // 10):
+            started = perf_counter()
+            response = await client.post("/fraud/check", json=_PAYLOAD, headers=headers)
+            elapsed = perf_counter() - started
+            response.raise_for_status()
+            # The first tenth warms caches and is not reported.
+            if index >= requests // 10:
+                timings.append(elapsed)
+    await app.state.dishka_container.close()
+    return timings
+
+
+def _report(label: str, timings: list[float]) -> None:
+    cuts = statistics.quantiles(timings, n=100)
+    print(
+        f"{label:<7} mean {statistics.fmean(timings) * 1e6:7.0f} us"
+        f"  p50 {cuts[49] * 1e6:7.0f} us  p99 {cuts[98] * 1e6:7.0f} us"
+    )
+
+
+async def main(requests: int) -> None:
+    _report("before", await _measure(_BaseHttpApiKeyMiddleware, requests))
+    _report("after", await _measure(ApiKeyMiddleware, requests))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    asyncio.run(main(parser.parse_args().requests))
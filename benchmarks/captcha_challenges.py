@@ -0,0 +1,123 @@
+"""Memory held by pending captcha challenges in the in-memory store.
+
+Creates ``--challenges`` review responses with ``--signals`` catalogue signals
+each, stores every one as a pending challenge, drops the responses and reports
+the Python allocations still traced (tracemalloc), per store and per challenge.
+"before" keeps a ``model_copy(deep=True)`` of the whole response per challenge,
+as the store used to; "after" is ``InMemoryCaptchaChallengeStore`` with its
+compact snapshots. Both figures include the challenge ids, dict slots and the
+fingerprint and IP strings, which outlive the responses.
+
+    PYTHONPATH=src python benchmarks/captcha_challenges.py [--challenges N]
+"""
+
+import argparse
+import asyncio
+import gc
+import secrets
+import tracemalloc
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from time import monotonic
+
+from app.api.modules.fraud.schema import FraudCheckResponse
+from app.api.modules.fraud.services.core.challenge_store import (
+    InMemoryCaptchaChallengeStore,
+)
+from app.api.modules.fraud.services.core.signals import signal_catalogue
+
+_TTL_SECONDS = 600
+
+
+@dataclass(slots=True)
+class _ResponseChallenge:
+    """The original challenge: a copy of the whole response."""
+
+    response: FraudCheckResponse
+    request_ip: str | None
+    origin: str | None
+    expires_at: float
+    attempts: int = 0
+
+
+class _DeepCopyStore:
+    """The original store: one deep-copied response per challenge."""
+
+    def __init__(self) -> None:
+        self._items: dict[str, _ResponseChallenge] = {}
+
+    async def create(
+        self, response: FraudCheckResponse, request_ip: str | None, origin: str | None
+    ) -> str:
+        challenge_id = secrets.token_urlsafe(24)
+        self._items[challenge_id] = _ResponseChallenge(
+            response=response.model_copy(deep=True),
+            request_ip=request_ip,
+            origin=origin,
+            expires_at=monotonic() + _TTL_SECONDS,
+        )
+        return challenge_id
+
+
+def _responses(count: int, signals: int) -> list[FraudCheckResponse]:
+    catalogue = signal_catalogue()
+    codes = sorted(catalogue)
+    return [
+        FraudCheckResponse(
+            decision="review",
+            risk_score=55,
+            fingerprint_id=secrets.token_hex(16),
+            request_ip=f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}",
+            ip_country_iso="DE",
+            signals=[
+                catalogue[codes[(index + offset) % len(codes)]]
+                for offset in range(signals)
+            ],
+            captcha_required=True,
+            evaluated_at=datetime.now(UTC),
+        )
+        for index in range(count)
+    ]
+
+
+async def _fill(store, challenges: int, signals: int) -> int:
+    """Traced bytes the store holds once the responses are gone."""
+    gc.collect()
+    tracemalloc.start()
+    responses = _responses(challenges, signals)
+    for response in responses:
+        await store.create(
+            response=response,
+            request_ip=response.request_ip,
+            origin="https://shop.example",
+        )
+    del responses, response
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size
+
+
+async def main(challenges: int, signals: int) -> None:
+    print(f"{challenges} pending challenges, {signals} signals each")
+    for label, make_store in (
+        ("before", _DeepCopyStore),
+        (
+            "after",
+            lambda: InMemoryCaptchaChallengeStore(_TTL_SECONDS, max_items=challenges),
+        ),
+    ):
+        store = make_store()
+        size = await _fill(store, challenges, signals)
+        print(
+            f"{label:<7} {size / 2**20:7.1f} MiB  ({size / challenges:6.0f} B/challenge)"
+        )
+        del store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--challenges", type=int, default=100_000)
+    parser.add_argument("--signals", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.challenges, args.signals))
@@ -0,0 +1,77 @@
+"""Per-request CPU time of FraudFacadeService.check over synthetic traffic.
+
+Runs every check service in-process (geo lookups and captcha off) and reports
+CPU time per request. Only the facade's ``check`` is used, which older
+checkouts have too, so the "before" number comes from pointing PYTHONPATH at
+the older tree. ``--dump`` writes each response's score, decision and signal
+codes as JSON; two dumps from different trees should be identical.
+
+    PYTHONPATH=src python benchmarks/check_cpu.py [--requests N] [--dump out.json]
+    PYTHONPATH=/path/to/old/src python benchmarks/check_cpu.py
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+from time import perf_counter, process_time
+
+os.environ.setdefault("APP__FRAUD__RATE_LIMIT_MAX_REQUESTS_PER_IP", "10000000")
+
+from payloads import check_payloads
+
+from app.api.modules.fraud.schema import FraudCheckRequest
+from app.api.modules.fraud.service import FraudFacadeService
+from app.ioc import get_async_container
+
+
+async def main(requests: int, dump: str | None) -> None:
+    triples = [
+        (FraudCheckRequest.model_validate(payload), headers, ip)
+        for payload, headers, ip in check_payloads(requests)
+    ]
+    container = get_async_container()
+    async with container() as request_container:
+        facade = await request_container.get(FraudFacadeService)
+        # Warm-up pass: imports, caches and first-call costs are not measured.
+        for payload, headers, ip in triples[: requests // 10]:
+            await facade.check(payload=payload, request_ip=ip, request_headers=headers)
+
+        results = []
+        timings = []
+        cpu_started = process_time()
+        for payload, headers, ip in triples:
+            started = perf_counter()
+            response = await facade.check(
+                payload=payload, request_ip=ip, request_headers=headers
+            )
+            timings.append(perf_counter() - started)
+            results.append(
+                [
+                    response.risk_score,
+                    response.decision,
+                    [signal.code for signal in response.signals],
+                ]
+            )
+        cpu = process_time() - cpu_started
+    await container.close()
+
+    cuts = statistics.quantiles(timings, n=100)
+    fired = sum(len(codes) for _, _, codes in results) / len(results)
+    print(
+        f"cpu {cpu / requests * 1e6:6.1f} us/request"
+        f"  wall p50 {cuts[49] * 1e6:6.1f} us  p99 {cuts[98] * 1e6:6.1f} us"
+        f"  ({fired:.1f} signals/request)"
+    )
+    if dump:
+        with open(dump, "w", encoding="utf-8") as file:
+            json.dump(results, file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--dump", help="write per-request results to this JSON file")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.dump))
@@ -0,0 +1,51 @@
+"""Cost of the device fingerprint, scheme 1 (SHA-256 over JSON) against 2 (BLAKE2b).
+
+Validates ``--payloads`` synthetic /fraud/check payloads once, then times
+``build_fingerprint`` over all of them for each version, alternating the
+versions for ``--rounds`` rounds and keeping each one's best round. Also checks
+that both schemes tell the same payloads apart.
+
+    PYTHONPATH=src python benchmarks/fingerprint.py [--payloads N] [--rounds N]
+"""
+
+import argparse
+from time import perf_counter
+
+from payloads import check_payloads
+
+from app.api.modules.fraud.schema import FraudCheckRequest
+from app.api.modules.fraud.services.core.utils import build_fingerprint
+
+
+def main(count: int, rounds: int) -> None:
+    requests = [
+        FraudCheckRequest.model_validate(payload)
+        for payload, _, _ in check_payloads(count)
+    ]
+    best = {1: float("inf"), 2: float("inf")}
+    for _ in range(rounds):
+        for version in best:
+            started = perf_counter()
+            for request in requests:
+                build_fingerprint(request, version=version)
+            best[version] = min(best[version], perf_counter() - started)
+
+    for version, elapsed in best.items():
+        print(
+            f"v{version}  {elapsed / count * 1e6:6.2f} us/fingerprint"
+            f"  ({best[1] / elapsed:4.1f}x v1)"
+        )
+
+    distinct = {
+        version: len({build_fingerprint(request, version) for request in requests})
+        for version in best
+    }
+    print(f"distinct IDs: v1 {distinct[1]}, v2 {distinct[2]} of {count} payloads")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--payloads", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    main(args.payloads, args.rounds)
@@ -0,0 +1,87 @@
+"""Throughput of /fraud/check/batch against the same checks sent one by one.
+
+Runs the full app in-process over httpx's ASGI transport. "single" posts each
+item to /fraud/check; "batch" posts them to /fraud/check/batch in chunks of
+``--batch-size``. Items use ``--ips`` distinct client IPs.
+
+    PYTHONPATH=src python benchmarks/fraud_batch.py [--items N] [--batch-size N]
+"""
+
+import argparse
+import asyncio
+import os
+from time import perf_counter
+
+# "prod" keeps DEBUG logs out; the limit must not turn items into blocks.
+os.environ.setdefault("APP__FRAUD__RATE_LIMIT_MAX_REQUESTS_PER_IP", "10000000")
+os.environ.setdefault("APP__ENV", "prod")
+os.environ.setdefault("APP__API__API_KEY", "")
+# Lets single checks carry the same client IPs as the batch items.
+os.environ.setdefault("APP__FRAUD__TRUST_FORWARDED_IP", "true")
+
+import httpx
+
+from app.application import get_production_app
+
+_PAYLOAD = {
+    "navigator": {
+        "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+        "language": "en-US",
+        "languages": ["en-US", "en"],
+        "platform": "Win32",
+        "hardware_concurrency": 8,
+    },
+    "screen": {"width": 1920, "height": 1080, "pixel_ratio": 1},
+    "viewport": {"width": 1200, "height": 800},
+    "location": {"timezone": "Europe/Berlin", "utc_offset_minutes": 60},
+}
+
+
+async def _single(client: httpx.AsyncClient, ips: list[str]) -> None:
+    for ip in ips:
+        response = await client.post(
+            "/fraud/check", json=_PAYLOAD, headers={"X-Forwarded-For": ip}
+        )
+        response.raise_for_status()
+
+
+async def _batch(client: httpx.AsyncClient, ips: list[str], batch_size: int) -> None:
+    for offset in range(0, len(ips), batch_size):
+        items = [
+            {"payload": _PAYLOAD, "request_ip": ip}
+            for ip in ips[offset : offset + batch_size]
+        ]
+        response = await client.post("/fraud/check/batch", json={"items": items})
+        response.raise_for_status()
+
+
+async def main(items: int, batch_size: int, distinct_ips: int) -> None:
+    app = get_production_app()
+    ips = [f"10.0.{n // 250 % 250}.{n % 250}" for n in range(distinct_ips)]
+    ips = [ips[n % distinct_ips] for n in range(items)]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        # Warm caches (collector checks, UA classification) before timing.
+        await _batch(client, ips[:batch_size], batch_size)
+        for label, run in (
+            ("single", lambda: _single(client, ips)),
+            ("batch", lambda: _batch(client, ips, batch_size)),
+        ):
+            started = perf_counter()
+            await run()
+            elapsed = perf_counter() - started
+            print(
+                f"{label:<7} {items / elapsed:8.0f} checks/s"
+                f"  {elapsed / items * 1e6:7.1f} us/check"
+            )
+    await app.state.dishka_container.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=500, help="up to 500")
+    parser.add_argument("--ips", type=int, default=1000, help="distinct client IPs")
+    args = parser.parse_args()
+    asyncio.run(main(args.items, args.batch_size, args.ips))
@@ -0,0 +1,151 @@
+"""Upstream calls and latency of IpGeoClient against a fake geo provider.
+
+Three scenarios, each run "before" and "after" against an in-process fake
+provider (``httpx.MockTransport``):
+
+- burst: ``--burst`` concurrent lookups over a Zipf-skewed set of IPs, with
+  the provider answering after ``--latency`` seconds. "before" sends one
+  request per lookup that misses the cache; "after" is ``IpGeoClient``, which
+  shares one request per IP.
+- outage: the provider hangs, so every request runs into the lookup timeout.
+  "before" has no circuit breaker (its threshold is never reached); "after"
+  uses the default threshold, so lookups fail fast once the circuit opens.
+- prefix: lookups from carrier networks whose users rotate through the hosts
+  of a /24. "before" caches per IP; "after" uses
+  ``IP_GEOLOCATION_CACHE_KEY=prefix``, sharing one entry per /24.
+
+    PYTHONPATH=src python benchmarks/geo_client.py [--burst N] [--latency S]
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+from collections.abc import Callable
+from time import perf_counter
+
+import httpx
+from payloads import zipf_sample
+
+from app.api.modules.fraud.services.network import IpGeoClient, IpGeoResult
+from app.settings import Config, FraudConfig
+
+
+class _FakeProvider:
+    """ipapi.co stand-in counting requests; ``hang`` makes it never answer in time."""
+
+    def __init__(self, latency: float, hang: bool = False):
+        self.latency = latency
+        self.hang = hang
+        self.calls = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        await asyncio.sleep(3600 if self.hang else self.latency)
+        return httpx.Response(200, json={"country_code": "de", "org": "Example"})
+
+
+class _UncoalescedClient(IpGeoClient):
+    """IpGeoClient without coalescing: each cache miss makes its own request."""
+
+    async def _coalesced_fetch(
+        self, ip: str, keys: tuple[int, ...], flight_key: int
+    ) -> tuple[IpGeoResult | None, int]:
+        return await self._fetch(ip, keys)
+
+
+def _client(
+    provider: _FakeProvider, client_type: type[IpGeoClient] = IpGeoClient, **fraud
+) -> IpGeoClient:
+    config = Config(fraud=FraudConfig(ip_geolocation_enabled=True, **fraud))
+    http = httpx.AsyncClient(transport=httpx.MockTransport(provider))
+    return client_type(http, config)
+
+
+async def _timed(client: IpGeoClient, ips: list[str], concurrency: int) -> list[float]:
+    timings: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(ip: str) -> None:
+        async with semaphore:
+            started = perf_counter()
+            await client.resolve(ip)
+            timings.append(perf_counter() - started)
+
+    await asyncio.gather(*(one(ip) for ip in ips))
+    return timings
+
+
+def _report(label: str, calls: int, lookups: int, timings: list[float]) -> None:
+    cuts = statistics.quantiles(timings, n=100)
+    print(
+        f"  {label:<7} {calls:6} upstream calls for {lookups} lookups"
+        f"  p50 {cuts[49] * 1e3:7.2f} ms  p99 {cuts[98] * 1e3:7.2f} ms"
+    )
+
+
+async def burst(count: int, latency: float) -> None:
+    ips = [f"203.0.113.{host}" for host in range(1, 201)]
+    sample = zipf_sample(ips, count)
+    print(f"burst: {count} concurrent lookups over {len(set(sample))} IPs")
+    for label, client_type in (("before", _UncoalescedClient), ("after", IpGeoClient)):
+        provider = _FakeProvider(latency)
+        # The cap is lifted so only coalescing differs, not queueing for a slot.
+        client = _client(provider, client_type, ip_geolocation_max_concurrency=count)
+        timings = await _timed(client, sample, count)
+        _report(label, provider.calls, count, timings)
+
+
+async def outage(count: int, concurrency: int) -> None:
+    print(f"outage: {count} lookups, {concurrency} at a time, 0.1 s timeout")
+    for label, threshold in (("before", 10**9), ("after", 5)):
+        provider = _FakeProvider(0, hang=True)
+        client = _client(
+            provider,
+            ip_geolocation_timeout_seconds=0.1,
+            ip_geolocation_circuit_failure_threshold=threshold,
+        )
+        ips = [f"198.51.{index >> 8 & 255}.{index & 255}" for index in range(count)]
+        timings = await _timed(client, ips, concurrency)
+        _report(label, provider.calls, count, timings)
+
+
+async def prefix(count: int, networks: int) -> None:
+    rng = random.Random(7)
+    prefixes = [f"10.{index >> 8 & 255}.{index & 255}" for index in range(networks)]
+    ips = [
+        f"{network}.{rng.randint(1, 254)}" for network in zipf_sample(prefixes, count)
+    ]
+    print(f"prefix: {count} lookups from {len(set(ips))} IPs in {networks} /24s")
+    variants: tuple[tuple[str, Callable[[_FakeProvider], IpGeoClient]], ...] = (
+        ("before", lambda provider: _client(provider)),
+        (
+            "after",
+            lambda provider: _client(provider, ip_geolocation_cache_key="prefix"),
+        ),
+    )
+    for label, make_client in variants:
+        provider = _FakeProvider(0)
+        client = make_client(provider)
+        timings = await _timed(client, ips, 1)
+        _report(label, provider.calls, count, timings)
+        print(f"          hit rate {1 - provider.calls / count:.1%}")
+
+
+async def main(burst_size: int, latency: float, lookups: int, networks: int) -> None:
+    # The outage scenario logs every failed lookup.
+    logging.disable(logging.WARNING)
+    await burst(burst_size, latency)
+    await outage(200, 20)
+    await prefix(lookups, networks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--burst", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds")
+    parser.add_argument("--lookups", type=int, default=20_000, help="prefix scenario")
+    parser.add_argument("--networks", type=int, default=2000, help="prefix scenario")
+    args = parser.parse_args()
+    asyncio.run(main(args.burst, args.latency, args.lookups, args.networks))
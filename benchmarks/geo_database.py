@@ -0,0 +1,132 @@
+"""Load time, memory and lookup rate of the offline IP geolocation database.
+
+Writes a seeded synthetic CSV (``--ranges`` start_ip/end_ip rows, 90% IPv4 and
+10% IPv6, in shuffled order, over ``--locations`` distinct locations) to a
+temporary directory and loads it with ``IpGeoDatabase``. Reports the load time,
+the size of the range arrays and the RSS growth (Linux), which also counts
+memory the parser freed but the allocator kept, then lookups per second for
+IPv4 and IPv6 addresses, half of them inside a listed range.
+
+    PYTHONPATH=src python benchmarks/geo_database.py [--ranges N] [--lookups N]
+"""
+
+import argparse
+import gc
+import os
+import random
+import tempfile
+from ipaddress import IPv4Address, IPv6Address
+from pathlib import Path
+from time import perf_counter
+
+from app.api.modules.fraud.services.network import IpGeoDatabase
+
+_COUNTRIES = ("US", "DE", "GB", "FR", "NL", "JP", "BR", "IN", "CA", "AU")
+
+
+def _rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return None
+
+
+def _write_database(
+    path: Path, ranges: int, locations: int, rng: random.Random
+) -> tuple[list[str], list[str]]:
+    """Write disjoint ranges; returns one address inside each IPv4 and IPv6 range."""
+    places = [
+        (
+            rng.choice(_COUNTRIES),
+            f"Example Net {number}",
+            f"{rng.uniform(-60, 60):.4f}",
+            f"{rng.uniform(-180, 180):.4f}",
+        )
+        for number in range(locations)
+    ]
+    v4_count = ranges * 9 // 10
+    v6_count = ranges - v4_count
+    # Evenly spaced blocks, each range filling a random part of its block.
+    v4_step = (1 << 32) // v4_count
+    v6_step = (1 << 128) // v6_count
+    rows = []
+    v4 = []
+    v6 = []
+    for step, count, family, inside in (
+        (v4_step, v4_count, IPv4Address, v4),
+        (v6_step, v6_count, IPv6Address, v6),
+    ):
+        for block in range(count):
+            start = block * step + rng.randrange(step // 2)
+            end = start + rng.randrange(1, step // 2)
+            inside.append(str(family(rng.randint(start, end))))
+            country, org, latitude, longitude = rng.choice(places)
+            rows.append(
+                f"{family(start)},{family(end)},{country},{org},{latitude},{longitude}\n"
+            )
+    rng.shuffle(rows)
+    with path.open("w", encoding="utf-8") as file:
+        file.write("start_ip,end_ip,country_code,org,latitude,longitude\n")
+        file.writelines(rows)
+    return v4, v6
+
+
+def _lookups_per_second(database: IpGeoDatabase, ips: list[str]) -> float:
+    started = perf_counter()
+    for ip in ips:
+        database.lookup(ip)
+    return len(ips) / (perf_counter() - started)
+
+
+def main(ranges: int, locations: int, lookups: int) -> None:
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "geo.csv"
+        v4_inside, v6_inside = _write_database(path, ranges, locations, rng)
+        size = path.stat().st_size
+        gc.collect()
+        rss_before = _rss_bytes()
+        started = perf_counter()
+        database = IpGeoDatabase(path)
+        loaded = perf_counter() - started
+        rss_after = _rss_bytes()
+
+    rss = (
+        "n/a"
+        if rss_before is None or rss_after is None
+        else f"{(rss_after - rss_before) / 2**20:.1f} MiB"
+    )
+    tables = database._tables
+    array_bytes = sum(
+        getattr(tables, name).itemsize * len(getattr(tables, name))
+        for name in tables.__slots__
+        if name != "records"
+    )
+    print(
+        f"{len(database):,} ranges, {len(tables.records):,} locations"
+        f" ({size / 2**20:.0f} MiB CSV)  load {loaded:.2f} s"
+        f"  arrays {array_bytes / 2**20:.1f} MiB  RSS +{rss}"
+    )
+
+    v4 = rng.choices(v4_inside, k=lookups // 2)
+    v4 += [str(IPv4Address(rng.getrandbits(32))) for _ in range(lookups // 2)]
+    v6 = rng.choices(v6_inside, k=lookups // 2)
+    v6 += [str(IPv6Address(rng.getrandbits(128))) for _ in range(lookups // 2)]
+    for label, ips in (("IPv4", v4), ("IPv6", v6)):
+        rng.shuffle(ips)
+        rate = _lookups_per_second(database, ips)
+        found = sum(database.lookup(ip) is not None for ip in ips)
+        print(
+            f"{label} {rate:9,.0f} lookups/s ({1e6 / rate:4.2f} us)"
+            f"  {found / len(ips):.1%} found"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ranges", type=int, default=1_000_000)
+    parser.add_argument("--locations", type=int, default=50_000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    args = parser.parse_args()
+    main(args.ranges, args.locations, args.lookups)
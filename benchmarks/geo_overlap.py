@@ -0,0 +1,121 @@
+"""Per-check latency with the geo lookup overlapped with the client checks.
+
+Runs the evaluation part of ``FraudFacadeService.check`` (context, client
+checks, geo lookup, geo checks) against an in-process fake geo provider that
+answers after ``--latency`` seconds. "before" awaits the lookup and then runs
+the client checks, as ``check`` used to; "after" starts the lookup with
+``start_lookup`` first, as ``check`` does now. Every check uses a new IP, so
+each one is a cache miss; ``--hits`` reuses one IP instead.
+
+    PYTHONPATH=src python benchmarks/geo_overlap.py [--checks N] [--latency S]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+from collections.abc import AsyncIterator
+from time import perf_counter
+
+os.environ.setdefault("APP__FRAUD__IP_GEOLOCATION_ENABLED", "true")
+
+import httpx
+from dishka import Provider, Scope, make_async_container, provide
+from payloads import check_payloads
+
+from app.api.modules.fraud.schema import FraudCheckRequest
+from app.api.modules.fraud.services.collectors import (
+    ClientChecksCollector,
+    NetworkChecksCollector,
+    build_evaluation_context,
+)
+from app.api.modules.fraud.services.network import IpGeoClient
+from app.clients.providers import HttpClientsProvider
+from app.ioc import AppProvider, ServicesProvider
+from app.settings import Config
+
+
+class _FakeGeoProvider(Provider):
+    def __init__(self, latency: float):
+        super().__init__()
+        self._latency = latency
+
+    async def _respond(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self._latency)
+        return httpx.Response(200, json={"country_code": "de", "org": "Example"})
+
+    @provide(scope=Scope.APP)
+    async def get_ip_geo_client(self, config: Config) -> AsyncIterator[IpGeoClient]:
+        transport = httpx.MockTransport(self._respond)
+        async with httpx.AsyncClient(transport=transport) as client:
+            yield IpGeoClient(client, config)
+
+
+async def _before(client_checks, network_checks, geo_client, payload, headers, ip):
+    ip_geo = await geo_client.resolve(ip)
+    context = build_evaluation_context(
+        payload=payload, request_ip=ip, request_headers=headers
+    )
+    signals = client_checks.collect(context)
+    signals.extend(network_checks.evaluate(context=context, ip_geo=ip_geo))
+    return signals
+
+
+async def _after(client_checks, network_checks, geo_client, payload, headers, ip):
+    geo_lookup = network_checks.start_lookup(ip)
+    try:
+        context = build_evaluation_context(
+            payload=payload, request_ip=ip, request_headers=headers
+        )
+        signals = client_checks.collect(context)
+        ip_geo = await geo_lookup
+    finally:
+        geo_lookup.cancel()
+    signals.extend(network_checks.evaluate(context=context, ip_geo=ip_geo))
+    return signals
+
+
+async def main(checks: int, latency: float, hits: bool) -> None:
+    requests = [
+        (FraudCheckRequest.model_validate(payload), headers)
+        for payload, headers, _ in check_payloads(checks)
+    ]
+    container = make_async_container(
+        AppProvider(),
+        ServicesProvider(),
+        HttpClientsProvider(),
+        _FakeGeoProvider(latency),
+    )
+    async with container() as request_container:
+        client_checks = await request_container.get(ClientChecksCollector)
+        network_checks = await request_container.get(NetworkChecksCollector)
+        geo_client = await request_container.get(IpGeoClient)
+        variants = (("before", _before), ("after", _after))
+        timings: dict[str, list[float]] = {label: [] for label, _ in variants}
+        # Alternate the variants check by check so drift affects both alike.
+        for index, (payload, headers) in enumerate(requests):
+            for offset, (label, run) in enumerate(variants):
+                host = 0 if hits else 2 * index + offset
+                ip = f"10.{host >> 16 & 255}.{host >> 8 & 255}.{host & 255}"
+                started = perf_counter()
+                await run(
+                    client_checks, network_checks, geo_client, payload, headers, ip
+                )
+                timings[label].append(perf_counter() - started)
+        for label, samples in timings.items():
+            cuts = statistics.quantiles(samples, n=100)
+            print(
+                f"{label:<7} p50 {cuts[49] * 1e3:8.3f} ms"
+                f"  p99 {cuts[98] * 1e3:8.3f} ms"
+                f"  mean {statistics.fmean(samples) * 1e3:8.3f} ms"
+            )
+    await container.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--checks", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds")
+    parser.add_argument("--hits", action="store_true", help="reuse one cached IP")
+    args = parser.parse_args()
+    asyncio.run(main(args.checks, args.latency, args.hits))
@@ -0,0 +1,90 @@
+"""Load time, memory and lookup latency of HostingRangeIndex over 1M ranges.
+
+Writes a seeded synthetic range file (``--ranges`` lines, 80% IPv4 CIDRs and
+20% IPv6 CIDRs, some overlapping) to a temporary directory, loads it, and
+times ``contains`` for IPv4 and IPv6 addresses, half of them inside a listed
+range. The cost of parsing the
+address alone (``ip_to_int``) is reported for comparison.
+
+    PYTHONPATH=src python benchmarks/hosting_ranges.py [--ranges N] [--lookups N]
+"""
+
+import argparse
+import random
+import tempfile
+from collections.abc import Callable
+from ipaddress import IPv4Address, IPv6Address
+from pathlib import Path
+from time import perf_counter
+
+from app.api.modules.fraud.services.network import HostingRangeIndex
+from app.api.modules.fraud.services.network.common import ip_to_int
+
+
+def _write_ranges(
+    path: Path, count: int, rng: random.Random
+) -> tuple[list[IPv4Address], list[IPv6Address]]:
+    """Write the range file; returns the network addresses of the listed ranges."""
+    v4 = []
+    v6 = []
+    with path.open("w", encoding="utf-8") as file:
+        for _ in range(count * 4 // 5):
+            prefix = rng.randint(20, 32)
+            address = IPv4Address(rng.getrandbits(32) & ~((1 << (32 - prefix)) - 1))
+            file.write(f"{address}/{prefix} AS{rng.randint(1, 65535)}\n")
+            v4.append(address)
+        for _ in range(count - count * 4 // 5):
+            prefix = rng.randint(32, 64)
+            address = IPv6Address(rng.getrandbits(128) & ~((1 << (128 - prefix)) - 1))
+            file.write(f"{address}/{prefix}\n")
+            v6.append(address)
+    return v4, v6
+
+
+def _time_per_call(call: Callable[[str], object], ips: list[str]) -> float:
+    started = perf_counter()
+    for ip in ips:
+        call(ip)
+    return (perf_counter() - started) / len(ips)
+
+
+def main(ranges: int, lookups: int) -> None:
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "ranges.txt"
+        v4_networks, v6_networks = _write_ranges(path, ranges, rng)
+        started = perf_counter()
+        index = HostingRangeIndex([path])
+        loaded = perf_counter() - started
+
+    arrays = index._ranges
+    array_bytes = sum(
+        getattr(arrays, name).itemsize * len(getattr(arrays, name))
+        for name in arrays.__slots__
+    )
+    print(
+        f"{ranges:,} ranges -> {len(index):,} merged"
+        f"  load {loaded:.2f} s  arrays {array_bytes / 1e6:.1f} MB"
+    )
+
+    # Half the lookups fall inside a listed range, half are random addresses.
+    v4 = [str(address) for address in rng.choices(v4_networks, k=lookups // 2)]
+    v4 += [str(IPv4Address(rng.getrandbits(32))) for _ in range(lookups // 2)]
+    v6 = [str(address) for address in rng.choices(v6_networks, k=lookups // 2)]
+    v6 += [str(IPv6Address(rng.getrandbits(128))) for _ in range(lookups // 2)]
+    for label, ips in (("IPv4", v4), ("IPv6", v6)):
+        contains = _time_per_call(index.contains, ips)
+        parse = _time_per_call(ip_to_int, ips)
+        hits = sum(map(index.contains, ips))
+        print(
+            f"{label} contains {contains * 1e6:5.2f} us"
+            f"  (parsing {parse * 1e6:4.2f} us)  {hits / len(ips):.1%} hosting"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ranges", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    args = parser.parse_args()
+    main(args.ranges, args.lookups)
@@ -0,0 +1,208 @@
+"""Connection reuse and latency of the upstream HTTP pools against a local server.
+
+Starts a local uvicorn server (in a subprocess) with a geo route and a
+siteverify route that each answer after ``--delay`` seconds, then sends ``--requests``
+geo GETs and as many siteverify POSTs, ``--concurrency`` at a time for each
+upstream. The server counts the TCP connections it accepts. "before" is the
+original setup: one client shared by both upstreams, 100 connections and 20
+keep-alive. "after" is one ``build_http_client`` pool per upstream with the
+default ``HttpPoolConfig``. uvicorn speaks HTTP/1.1 only, so HTTP/2 is offered
+but not negotiated here; with an HTTP/2 server both pools need far fewer
+connections still. Client and server share the machine, so on few cores req/s
+mostly measures CPU contention (httpcore scans the whole pool for each
+request); the connection count is the number to compare.
+
+``--cold`` also times the first request on a new pool with and without
+``warm_up_connections``.
+
+    PYTHONPATH=src python benchmarks/http_pools.py [--requests N] [--concurrency N]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import socket
+import statistics
+from time import perf_counter, sleep
+
+import httpx
+import uvicorn
+
+from app.api.modules.fraud.services.network.http_pool import (
+    build_http_client,
+    request_with_reconnect,
+    warm_up_connections,
+)
+from app.settings import HttpPoolConfig
+
+
+class _Server:
+    """ASGI app counting the connections it is reached on.
+
+    ``GET /connections`` returns the count and starts a new one; paths under
+    ``/fast`` answer without the delay.
+    """
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.connections: set[tuple[str, int]] = set()
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            return
+        while (await receive()).get("more_body"):
+            pass
+        if scope["path"] == "/connections":
+            payload = {"connections": len(self.connections)}
+            self.connections.clear()
+        else:
+            self.connections.add(tuple(scope["client"]))
+            if not scope["path"].startswith("/fast"):
+                await asyncio.sleep(self.delay)
+            payload = {"success": True, "country_code": "de"}
+        body = b"" if scope["method"] == "HEAD" else json.dumps(payload).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def _serve(sock: socket.socket, delay: float) -> None:
+    config = uvicorn.Config(_Server(delay), log_level="warning", timeout_keep_alive=60)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _start_server(delay: float) -> tuple[multiprocessing.Process, str]:
+    sock = socket.socket()
+    # Accepted connections inherit this; without it replies wait on delayed ACKs.
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    process = multiprocessing.Process(target=_serve, args=(sock, delay), daemon=True)
+    process.start()
+    base_url = f"http://127.0.0.1:{port}"
+    while True:
+        try:
+            httpx.get(f"{base_url}/connections")
+            return process, base_url
+        except httpx.TransportError:
+            sleep(0.05)
+
+
+async def _upstream(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    requests: int,
+    concurrency: int,
+) -> list[float]:
+    timings: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int) -> None:
+        async with semaphore:
+            started = perf_counter()
+            if method == "GET":
+                response = await request_with_reconnect(
+                    client, "GET", f"{url}/10.0.0.{index % 250}/json/"
+                )
+            else:
+                response = await request_with_reconnect(
+                    client, "POST", url, data={"secret": "s", "response": str(index)}
+                )
+            response.raise_for_status()
+            timings.append(perf_counter() - started)
+
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    return timings
+
+
+async def _run(
+    label: str,
+    base_url: str,
+    geo_client: httpx.AsyncClient,
+    turnstile_client: httpx.AsyncClient,
+    requests: int,
+    concurrency: int,
+) -> None:
+    async with httpx.AsyncClient() as control:
+        await control.get(f"{base_url}/connections")
+    started = perf_counter()
+    geo, siteverify = await asyncio.gather(
+        _upstream(geo_client, "GET", f"{base_url}/geo", requests, concurrency),
+        _upstream(
+            turnstile_client, "POST", f"{base_url}/siteverify", requests, concurrency
+        ),
+    )
+    elapsed = perf_counter() - started
+    total = 2 * requests
+    async with httpx.AsyncClient() as control:
+        response = await control.get(f"{base_url}/connections")
+    connections = response.json()["connections"]
+    print(
+        f"{label:<7} {total / elapsed:6.0f} req/s  {connections:5} connections"
+        f" ({1 - connections / total:6.2%} reuse)"
+    )
+    for name, timings in (("geo", geo), ("siteverify", siteverify)):
+        cuts = statistics.quantiles(timings, n=100)
+        print(
+            f"        {name:<10} p50 {cuts[49] * 1e3:6.1f} ms  p99 {cuts[98] * 1e3:6.1f} ms"
+        )
+
+
+async def _first_request(base_url: str, warm: bool) -> float:
+    async with build_http_client(HttpPoolConfig()) as client:
+        if warm:
+            await warm_up_connections(client, f"{base_url}/fast", 1)
+        started = perf_counter()
+        await client.post(f"{base_url}/fast", data={"response": "x"})
+        return perf_counter() - started
+
+
+async def main(requests: int, concurrency: int, delay: float, cold: bool) -> None:
+    server, base_url = _start_server(delay)
+    try:
+        async with httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        ) as shared:
+            await _run("before", base_url, shared, shared, requests, concurrency)
+        async with (
+            build_http_client(HttpPoolConfig()) as geo_client,
+            build_http_client(HttpPoolConfig()) as turnstile_client,
+        ):
+            await _run(
+                "after",
+                base_url,
+                geo_client,
+                turnstile_client,
+                requests,
+                concurrency,
+            )
+        if cold:
+            for warm in (False, True):
+                timings = [await _first_request(base_url, warm) for _ in range(20)]
+                print(
+                    f"first request, {'pre-warmed' if warm else 'cold':<10}"
+                    f" {statistics.median(timings) * 1e3:5.2f} ms"
+                )
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000, help="per upstream")
+    parser.add_argument("--concurrency", type=int, default=32, help="per upstream")
+    parser.add_argument("--delay", type=float, default=0.005, help="server seconds")
+    parser.add_argument("--cold", action="store_true", help="time the first request")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.delay, args.cold))
@@ -0,0 +1,133 @@
+"""Seeded synthetic /fraud/check traffic shared by the benchmarks.
+
+A few browser User-Agents take most of the traffic and a long tail of rarer
+ones (and bots) takes the rest, roughly like production. Payloads mix clean
+browsers with automation, odd screens, bad languages and mismatched headers,
+so most checks run and many of them fire.
+"""
+
+import random
+
+BROWSER_USER_AGENTS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/{v}.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_{v} like Mac OS X) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/{v}.0.0.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/17.{v} Safari/605.1.15",
+    "Mozilla/5.0 (iPad; CPU OS 17_{v} like Mac OS X) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/{v}.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/{v}.0.0.0 Safari/537.36 Edg/{v}.0.0.0",
+    "Mozilla/5.0 (X11; CrOS x86_64 14541.0.0) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/{v}.0.0.0 Safari/537.36",
+)
+BOT_USER_AGENTS = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "HeadlessChrome/{v}.0.0.0 Safari/537.36",
+    "python-requests/2.{v}.0",
+    "curl/8.{v}.0 (x86_64-pc-linux-gnu)",
+    "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html) {v}",
+    "Scrapy/2.{v} (+https://scrapy.org)",
+    "Mozilla/5.0 Selenium/4.{v} webdriver",
+)
+
+
+def user_agents(distinct: int, bot_share: float = 0.1, seed: int = 7) -> list[str]:
+    """``distinct`` different User-Agents: browser versions plus some bots."""
+    rng = random.Random(seed)
+    result = []
+    for index in range(distinct):
+        templates = BOT_USER_AGENTS if rng.random() < bot_share else BROWSER_USER_AGENTS
+        template = templates[index % len(templates)]
+        result.append(template.format(v=index // len(templates)) + f" build/{index}")
+    return result
+
+
+def zipf_sample(
+    population: list[str],
+    count: int,
+    exponent: float = 1.1,
+    seed: int = 7,
+) -> list[str]:
+    """``count`` draws from ``population`` where rank ``k`` has weight 1/k^s."""
+    rng = random.Random(seed)
+    weights = [1 / (rank**exponent) for rank in range(1, len(population) + 1)]
+    return rng.choices(population, weights=weights, k=count)
+
+
+def check_payloads(
+    count: int,
+    distinct_user_agents: int = 2000,
+    seed: int = 7,
+) -> list[tuple[dict, dict[str, str], str]]:
+    """``count`` ``(payload, headers, request_ip)`` triples for /fraud/check."""
+    rng = random.Random(seed)
+    agents = zipf_sample(user_agents(distinct_user_agents, seed=seed), count, seed=seed)
+    triples = []
+    for user_agent in agents:
+        mobile = "Mobile" in user_agent or "iPad" in user_agent
+        payload = {
+            "navigator": {
+                "user_agent": user_agent,
+                "language": rng.choice(["en-US", "de-DE", "fr-FR", "", "xx"]),
+                "languages": rng.sample(
+                    ["en-US", "en", "de", "fr-FR"], rng.randint(0, 3)
+                ),
+                "platform": rng.choice(["Win32", "MacIntel", "iPhone", "Linux x86_64"]),
+                "webdriver": rng.random() < 0.05,
+                "hardware_concurrency": rng.choice([None, 1, 4, 8]),
+                "device_memory": rng.choice([None, 0.25, 8]),
+                "max_touch_points": 5 if mobile else rng.choice([0, 0, 10]),
+                "plugins_count": rng.choice([None, 0, 5]),
+            },
+            "screen": {
+                "width": 390 if mobile else 1920,
+                "height": 844 if mobile else 1080,
+                "avail_width": rng.choice([None, 390, 1920, 3000]),
+                "pixel_ratio": rng.choice([None, 1, 2, 3]),
+            },
+            "viewport": {
+                "width": rng.choice([300, 390, 1200, 1900]),
+                "height": rng.choice([300, 800, 1000]),
+            },
+            "webgl": rng.choice(
+                [
+                    None,
+                    {"vendor": "Google Inc.", "renderer": "ANGLE (NVIDIA GeForce)"},
+                    {"vendor": "Google Inc.", "renderer": "Google SwiftShader"},
+                ]
+            ),
+            "client_hints": rng.choice(
+                [
+                    None,
+                    {
+                        "mobile": mobile,
+                        "platform": rng.choice(["Windows", "macOS", "Android"]),
+                        "brands": ["Chromium", "Google Chrome"],
+                    },
+                ]
+            ),
+            "location": {
+                "timezone": rng.choice(["Europe/Berlin", "America/New_York"]),
+                "utc_offset_minutes": rng.choice([60, -300, 0]),
+            },
+            "behavior": rng.choice(
+                [
+                    None,
+                    {"time_on_page_ms": rng.choice([50, 9000]), "scroll_count": 0},
+                ]
+            ),
+        }
+        headers = {
+            "user-agent": user_agent if rng.random() < 0.9 else "other agent/1.0",
+            "accept-language": rng.choice(["en-US,en;q=0.9", "de-DE", ""]),
+            "sec-ch-ua-platform": rng.choice(['"Windows"', '"macOS"', '"Android"']),
+        }
+        request_ip = f"203.0.{rng.randrange(256)}.{rng.randrange(256)}"
+        triples.append((payload, headers, request_ip))
+    return triples
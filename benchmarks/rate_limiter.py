@@ -0,0 +1,184 @@
+"""Per-call latency of the in-memory rate limiter under a mixed concurrent load.
+
+Preloads idle IPs, then runs concurrent calls over 10k distinct IPs plus one hot
+IP. "before" is the original limiter: one lock and a full scan for stale IPs
+every 512 calls. "after" is ``InMemoryIpRateLimiter`` with incremental purging.
+
+``--memory`` instead fills the original limiter and both
+``InMemoryIpRateLimiter`` algorithms with ``--ips`` distinct IPs making
+``--requests-per-ip`` requests each, and reports traced Python allocations and
+RSS growth. Each limiter is filled in a fresh forked process (Linux), so memory
+freed by one does not hide the growth of the next.
+
+    PYTHONPATH=src python benchmarks/rate_limiter.py [--calls N] [--idle N]
+    PYTHONPATH=src python benchmarks/rate_limiter.py --memory [--ips N]
+"""
+
+import argparse
+import asyncio
+import gc
+import multiprocessing
+import os
+import random
+import statistics
+import tracemalloc
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from ipaddress import IPv4Address
+from time import monotonic, perf_counter
+
+from app.api.modules.fraud.services.network import InMemoryIpRateLimiter
+
+_WINDOW_SECONDS = 60
+_MAX_REQUESTS = 120
+_CONCURRENCY = 1000
+
+
+class _FullScanLimiter:
+    """The original limiter: one lock, full stale scan every 512 calls."""
+
+    def __init__(self, window_seconds: int, max_requests_per_ip: int):
+        self._window_seconds = window_seconds
+        self._max_requests_per_ip = max_requests_per_ip
+        self._events: dict[str, deque[float]] = defaultdict(deque)
+        self._lock = asyncio.Lock()
+        self._call_count = 0
+
+    async def allow(self, ip: str | None) -> bool:
+        now = monotonic()
+        threshold = now - self._window_seconds
+        async with self._lock:
+            self._call_count += 1
+            if self._call_count >= 512:
+                self._call_count = 0
+                stale = [
+                    key
+                    for key, events in self._events.items()
+                    if not events or events[-1] < threshold
+                ]
+                for key in stale:
+                    del self._events[key]
+            events = self._events[ip]
+            while events and events[0] < threshold:
+                events.popleft()
+            if len(events) >= self._max_requests_per_ip:
+                return False
+            events.append(now)
+            return True
+
+
+async def _measure(limiter, calls: int, idle: int) -> tuple[float, list[float]]:
+    for index in range(idle):
+        await limiter.allow(f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}")
+
+    rng = random.Random(7)
+    ips = [
+        "203.0.113.7" if rng.random() < 0.3 else f"198.51.{n >> 8}.{n & 255}"
+        for n in (rng.randrange(10_000) for _ in range(calls))
+    ]
+    timings: list[float] = []
+
+    async def call(ip: str) -> None:
+        started = perf_counter()
+        await limiter.allow(ip)
+        timings.append(perf_counter() - started)
+
+    started = perf_counter()
+    for offset in range(0, calls, _CONCURRENCY):
+        await asyncio.gather(*(call(ip) for ip in ips[offset : offset + _CONCURRENCY]))
+    return perf_counter() - started, timings
+
+
+def _report(label: str, elapsed: float, timings: list[float]) -> None:
+    cuts = statistics.quantiles(timings, n=1000)
+    print(
+        f"{label:<7} {len(timings) / elapsed:9.0f} calls/s"
+        f"  p99 {cuts[989] * 1e6:6.1f} us  p99.9 {cuts[998] * 1e6:7.1f} us"
+        f"  max {max(timings) * 1e3:6.2f} ms"
+    )
+
+
+async def main(calls: int, idle: int) -> None:
+    for label, limiter in (
+        ("before", _FullScanLimiter(_WINDOW_SECONDS, _MAX_REQUESTS)),
+        ("after", InMemoryIpRateLimiter(_WINDOW_SECONDS, _MAX_REQUESTS)),
+    ):
+        _report(label, *await _measure(limiter, calls, idle))
+
+
+_MEMORY_LIMITERS = {
+    "before (sliding log)": lambda: _FullScanLimiter(_WINDOW_SECONDS, _MAX_REQUESTS),
+    "after sliding_log": lambda: InMemoryIpRateLimiter(
+        _WINDOW_SECONDS, _MAX_REQUESTS, "sliding_log"
+    ),
+    "after sliding_window_counter": lambda: InMemoryIpRateLimiter(
+        _WINDOW_SECONDS, _MAX_REQUESTS, "sliding_window_counter"
+    ),
+}
+
+
+def _rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return None
+
+
+def _fill(label: str, ips: int, requests_per_ip: int, traced: bool) -> int | None:
+    """Fill one limiter and return its traced size, or its RSS growth."""
+    limiter = _MEMORY_LIMITERS[label]()
+    addresses = [str(IPv4Address(0x0A000000 + n)) for n in range(ips)]
+
+    async def fill() -> None:
+        for _ in range(requests_per_ip):
+            for ip in addresses:
+                await limiter.allow(ip)
+
+    # The limiters hold no reference cycles; full collections over millions of
+    # deques would dominate the run time without changing the result.
+    gc.disable()
+    if traced:
+        tracemalloc.start()
+    rss_before = _rss_bytes()
+    asyncio.run(fill())
+    if traced:
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return size
+    rss_after = _rss_bytes()
+    if rss_before is None or rss_after is None:
+        return None
+    return rss_after - rss_before
+
+
+def memory(ips: int, requests_per_ip: int) -> None:
+    print(f"{ips} distinct IPs x {requests_per_ip} requests")
+    context = multiprocessing.get_context("fork")
+    for label in _MEMORY_LIMITERS:
+        sizes = []
+        for traced in (True, False):
+            with ProcessPoolExecutor(1, mp_context=context) as pool:
+                sizes.append(
+                    pool.submit(_fill, label, ips, requests_per_ip, traced).result()
+                )
+        traced_size, rss = sizes
+        rss_text = "n/a" if rss is None else f"{rss / 2**20:7.1f} MiB"
+        print(
+            f"{label:<30} traced {traced_size / 2**20:7.1f} MiB"
+            f" ({traced_size / ips:5.0f} B/IP)  rss +{rss_text}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=100_000)
+    parser.add_argument("--idle", type=int, default=200_000, help="preloaded idle IPs")
+    parser.add_argument("--memory", action="store_true", help="measure memory instead")
+    parser.add_argument("--ips", type=int, default=1_000_000)
+    parser.add_argument("--requests-per-ip", type=int, default=3)
+    args = parser.parse_args()
+    if args.memory:
+        memory(args.ips, args.requests_per_ip)
+    else:
+        asyncio.run(main(args.calls, args.idle))
@@ -0,0 +1,60 @@
+"""Cost of building a FraudSignal per hit against reusing the catalogue instance.
+
+"create" calls ``create_signal`` for every fired signal, as the checks did
+before the catalogue; "catalogue" appends the shared instance. Each mode
+collects ``--signals`` signals per simulated request and reports time and
+traced allocations per request.
+
+    PYTHONPATH=src python benchmarks/signal_allocation.py [--requests N]
+"""
+
+import argparse
+import random
+import tracemalloc
+from time import perf_counter
+
+from app.api.modules.fraud.services.core import create_signal, signal_catalogue
+
+
+def _run(requests: list[list], build) -> list:
+    kept = []
+    for signals in requests:
+        kept.append([build(signal) for signal in signals])
+    return kept
+
+
+def main(request_count: int, per_request: int) -> None:
+    catalogue = signal_catalogue()
+    rng = random.Random(7)
+    requests = [
+        rng.sample(list(catalogue.values()), per_request) for _ in range(request_count)
+    ]
+    modes = (
+        (
+            "create",
+            lambda signal: create_signal(signal.code, signal.weight, signal.message),
+        ),
+        ("catalogue", lambda signal: signal),
+    )
+    for label, build in modes:
+        started = perf_counter()
+        _run(requests, build)
+        elapsed = perf_counter() - started
+
+        tracemalloc.start()
+        kept = _run(requests, build)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del kept
+        print(
+            f"{label:<10} {elapsed / request_count * 1e6:6.2f} us/request"
+            f"  {peak / request_count:7.0f} B/request traced"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50_000)
+    parser.add_argument("--signals", type=int, default=6, help="signals per request")
+    args = parser.parse_args()
+    main(args.requests, args.signals)
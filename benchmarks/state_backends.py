@@ -0,0 +1,107 @@
+"""Latency of the in-memory and Redis state backends.
+
+Times rate-limit decisions (single and in batches of 100) and captcha challenge
+create/get/consume for each backend. Without ``--redis-url`` the Redis backend
+runs against an in-process fakeredis server, which shows the client-side cost
+but not the network round trip.
+
+    PYTHONPATH=src python benchmarks/state_backends.py [--redis-url redis://...]
+"""
+
+import argparse
+import asyncio
+from datetime import UTC, datetime
+from time import perf_counter
+
+from app.api.modules.fraud.schema import FraudCheckResponse
+from app.api.modules.fraud.services.core import signal_catalogue
+from app.api.modules.fraud.services.core.challenge_store import (
+    InMemoryCaptchaChallengeStore,
+)
+from app.api.modules.fraud.services.core.redis_challenge_store import (
+    RedisCaptchaChallengeStore,
+)
+from app.api.modules.fraud.services.network import InMemoryIpRateLimiter
+from app.api.modules.fraud.services.network.redis_rate_limit import (
+    RedisIpRateLimiter,
+)
+from app.services.redis import RedisConnection
+from app.settings import RedisConfig
+
+_CALLS = 3000
+_BATCH = 100
+
+
+async def _limiter(label: str, limiter) -> None:
+    ips = [f"10.0.{index // 250}.{index % 250}" for index in range(_CALLS)]
+    started = perf_counter()
+    for ip in ips:
+        await limiter.allow(ip)
+    single = (perf_counter() - started) / _CALLS
+    started = perf_counter()
+    for offset in range(0, _CALLS, _BATCH):
+        await limiter.allow_many(ips[offset : offset + _BATCH])
+    batched = (perf_counter() - started) / _CALLS
+    print(
+        f"{label:<32} allow {single * 1e6:7.1f} us"
+        f"  allow_many({_BATCH}) {batched * 1e6:6.1f} us/IP"
+    )
+
+
+async def _challenges(label: str, store) -> None:
+    catalogue = signal_catalogue()
+    response = FraudCheckResponse(
+        decision="review",
+        risk_score=55,
+        fingerprint_id="0123456789abcdef01234567",
+        request_ip="203.0.113.7",
+        ip_country_iso="DE",
+        signals=[catalogue[code] for code in sorted(catalogue)[:6]],
+        evaluated_at=datetime.now(UTC),
+    )
+    timings = []
+    started = perf_counter()
+    ids = [
+        await store.create(response, "203.0.113.7", "https://shop.example")
+        for _ in range(_CALLS)
+    ]
+    timings.append(perf_counter() - started)
+    for operation in (store.get, store.consume):
+        started = perf_counter()
+        for challenge_id in ids:
+            await operation(challenge_id)
+        timings.append(perf_counter() - started)
+    create, get, consume = (elapsed / _CALLS * 1e6 for elapsed in timings)
+    print(
+        f"{label:<32} create {create:6.1f} us  get {get:6.1f} us"
+        f"  consume {consume:6.1f} us"
+    )
+
+
+async def main(redis_url: str | None) -> None:
+    connection = RedisConnection(RedisConfig(url=redis_url or "redis://unused"))
+    if redis_url is None:
+        from fakeredis import FakeAsyncRedis
+
+        connection._client = FakeAsyncRedis()
+    target = redis_url or "fakeredis"
+
+    for algorithm in ("sliding_log", "sliding_window_counter"):
+        await _limiter(
+            f"memory {algorithm}",
+            InMemoryIpRateLimiter(60, 10**6, algorithm=algorithm),
+        )
+        await _limiter(
+            f"redis {algorithm}",
+            RedisIpRateLimiter(connection, 60, 10**6, algorithm=algorithm),
+        )
+    await _challenges("memory challenges", InMemoryCaptchaChallengeStore(600))
+    await _challenges("redis challenges", RedisCaptchaChallengeStore(connection, 600))
+    await connection.aclose()
+    print(f"(redis backend: {target})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--redis-url", help="real server to use instead of fakeredis")
+    asyncio.run(main(parser.parse_args().redis_url))
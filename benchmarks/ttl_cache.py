@@ -0,0 +1,113 @@
+"""Insert and hit latency of the geo cache at 4k, 100k and 1M entries.
+
+Fills each cache with live entries, then times inserts of new keys into the full
+cache (each one evicts) and hits on existing keys. "before" is the original
+geo cache: a dict whose inserts, once full, scan for stale entries and then
+evict ``min()`` over the expiry times. "after" is ``TtlLruCache``. The old
+cache is slow at large sizes, so it gets ``--scan-inserts`` inserts only.
+
+``--max-bytes`` additionally reports how many entries a byte budget settles at.
+
+    PYTHONPATH=src python benchmarks/ttl_cache.py [--sizes N ...] [--inserts N]
+"""
+
+import argparse
+from collections.abc import Callable
+from time import monotonic, perf_counter
+
+from app.api.modules.fraud.services.core.ttl_cache import TtlLruCache
+from app.api.modules.fraud.services.network import IpGeoResult
+
+_TTL_SECONDS = 300
+_RESULT = IpGeoResult(
+    country_iso="DE",
+    is_hosting=False,
+    timezone="Europe/Berlin",
+    utc_offset_minutes=60,
+    latitude=52.5,
+    longitude=13.4,
+)
+
+
+class _ScanCache:
+    """The geo cache before TtlLruCache, as it was inlined in IpGeoClient."""
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._cache: dict[int, tuple[float, IpGeoResult]] = {}
+
+    def get(self, key: int) -> IpGeoResult | None:
+        cached = self._cache.get(key)
+        if cached and cached[0] > monotonic():
+            return cached[1]
+        return None
+
+    def set(self, key: int, value: IpGeoResult) -> None:
+        now = monotonic()
+        if len(self._cache) >= self._max_size:
+            stale = [k for k, (exp, _) in self._cache.items() if exp <= now]
+            for k in stale:
+                del self._cache[k]
+            if len(self._cache) >= self._max_size:
+                oldest = min(self._cache, key=lambda k: self._cache[k][0])
+                del self._cache[oldest]
+        self._cache[key] = (now + _TTL_SECONDS, value)
+
+
+def _time_per_call(call: Callable[[int], object], keys: range) -> float:
+    started = perf_counter()
+    for key in keys:
+        call(key)
+    return (perf_counter() - started) / len(keys)
+
+
+def _measure(
+    cache: _ScanCache | TtlLruCache, size: int, inserts: int
+) -> tuple[float, float]:
+    for key in range(size):
+        cache.set(key, _RESULT)
+    insert = _time_per_call(
+        lambda key: cache.set(key, _RESULT), range(size, size + inserts)
+    )
+    end = size + inserts
+    hit = _time_per_call(cache.get, range(end - min(size, inserts), end))
+    return insert, hit
+
+
+def _format(seconds: float) -> str:
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:7.1f} ms"
+    return f"{seconds * 1e6:7.2f} us"
+
+
+def main(sizes: list[int], inserts: int, scan_inserts: int, max_bytes: int) -> None:
+    print(f"{'entries':>10}  {'before insert':>13}  {'after insert':>12}  after hit")
+    for size in sizes:
+        before, _ = _measure(_ScanCache(size), size, scan_inserts)
+        after, hit = _measure(TtlLruCache(size, _TTL_SECONDS), size, inserts)
+        print(
+            f"{size:>10,}  {_format(before):>13}  {_format(after):>12}  {_format(hit)}"
+        )
+
+    budgeted: TtlLruCache[int, IpGeoResult] = TtlLruCache(
+        max(sizes), _TTL_SECONDS, max_bytes=max_bytes
+    )
+    for key in range(max(sizes)):
+        budgeted.set(key, _RESULT)
+    stats = budgeted.stats()
+    print(
+        f"{max_bytes / 2**20:.0f} MiB budget: {stats.size:,} entries"
+        f" ({stats.approx_bytes / stats.size:.0f} B/entry) after {max(sizes):,} inserts"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[4096, 100_000, 1_000_000]
+    )
+    parser.add_argument("--inserts", type=int, default=20_000)
+    parser.add_argument("--scan-inserts", type=int, default=20)
+    parser.add_argument("--max-bytes", type=int, default=8 * 2**20)
+    args = parser.parse_args()
+    main(args.sizes, args.inserts, args.scan_inserts, args.max_bytes)
@@ -0,0 +1,122 @@
+"""Upstream siteverify calls saved by the Turnstile verdict cache and coalescing.
+
+Runs TurnstileVerifierService against an in-process fake siteverify with
+``--latency`` seconds per call and single-use tokens, as Cloudflare has. Two
+workloads: each of ``--tokens`` tokens verified ``--retries`` times in a row
+(client retries), and each verified ``--concurrent`` times at once (double
+submits). "before" posts every verify to siteverify, as the service did
+without the cache. Both must give each token exactly one success.
+
+    PYTHONPATH=src python benchmarks/turnstile_cache.py [--tokens N] [--latency S]
+"""
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+from time import perf_counter
+from urllib.parse import parse_qs
+
+import httpx
+
+from app.api.modules.fraud.services.network.turnstile import TurnstileVerifierService
+from app.settings import Config, FraudConfig
+
+_VERIFY_URL = "https://siteverify.test/siteverify"
+
+type Verify = Callable[[str], Awaitable[bool]]
+
+
+class _FakeSiteverify:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self._consumed: set[str] = set()
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        token = parse_qs(request.content.decode())["response"][0]
+        if token in self._consumed:
+            return httpx.Response(
+                200, json={"success": False, "error-codes": ["timeout-or-duplicate"]}
+            )
+        self._consumed.add(token)
+        return httpx.Response(200, json={"success": True})
+
+
+def _before(http: httpx.AsyncClient) -> Verify:
+    async def verify(token: str) -> bool:
+        response = await http.post(
+            _VERIFY_URL, data={"secret": "secret", "response": token}
+        )
+        return bool(response.json().get("success"))
+
+    return verify
+
+
+def _after(http: httpx.AsyncClient) -> Verify:
+    config = Config(
+        fraud=FraudConfig(
+            turnstile_site_key="site",
+            turnstile_secret_key="secret",
+            turnstile_verify_url=_VERIFY_URL,
+            turnstile_max_concurrency=100_000,
+            turnstile_max_queue=100_000,
+            turnstile_timeout_seconds=60,
+        )
+    )
+    service = TurnstileVerifierService(http, config)
+
+    async def verify(token: str) -> bool:
+        return (await service.verify(token, None)).success
+
+    return verify
+
+
+async def _sequential(verify: Verify, tokens: list[str], retries: int) -> list[bool]:
+    async def one(token: str) -> list[bool]:
+        return [await verify(token) for _ in range(retries)]
+
+    per_token = await asyncio.gather(*(one(token) for token in tokens))
+    return [success for results in per_token for success in results]
+
+
+async def _concurrent(verify: Verify, tokens: list[str], concurrent: int) -> list[bool]:
+    return await asyncio.gather(
+        *(verify(token) for token in tokens for _ in range(concurrent))
+    )
+
+
+async def main(tokens: int, retries: int, concurrent: int, latency: float) -> None:
+    workloads = (
+        (f"{retries} sequential retries", lambda v, t: _sequential(v, t, retries)),
+        (
+            f"{concurrent} concurrent verifies",
+            lambda v, t: _concurrent(v, t, concurrent),
+        ),
+    )
+    for workload, run in workloads:
+        print(f"{tokens} tokens x {workload}")
+        for label, make_verify in (("before", _before), ("after", _after)):
+            siteverify = _FakeSiteverify(latency)
+            transport = httpx.MockTransport(siteverify)
+            async with httpx.AsyncClient(transport=transport) as http:
+                names = [f"{label}-{workload}-{n}" for n in range(tokens)]
+                started = perf_counter()
+                results = await run(make_verify(http), names)
+                elapsed = perf_counter() - started
+            assert sum(results) == tokens, "each token must pass exactly once"
+            print(
+                f"  {label:<7} {siteverify.calls:6} upstream calls"
+                f"  {elapsed:6.2f} s  ({len(results)} verifies)"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=300)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--concurrent", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.tokens, args.retries, args.concurrent, args.latency))
@@ -0,0 +1,45 @@
+"""User-Agent classification with and without the LRU table.
+
+Draws ``--lookups`` User-Agents from a Zipf distribution over ``--distinct``
+agents and classifies each one, once through ``classify_user_agent`` and once
+through its uncached ``__wrapped__`` function. Reports the time per lookup and
+the hit rate of the LRU table.
+
+    PYTHONPATH=src python benchmarks/user_agent_cache.py [--lookups N] [--distinct N]
+"""
+
+import argparse
+from time import perf_counter
+
+from payloads import user_agents, zipf_sample
+
+from app.api.modules.fraud.services.network.user_agent import classify_user_agent
+
+
+def main(lookups: int, distinct: int, exponent: float) -> None:
+    sample = zipf_sample(user_agents(distinct), lookups, exponent=exponent)
+    for label, classify in (
+        ("uncached", classify_user_agent.__wrapped__),
+        ("lru", classify_user_agent),
+    ):
+        classify_user_agent.cache_clear()
+        started = perf_counter()
+        for user_agent in sample:
+            classify(user_agent)
+        elapsed = perf_counter() - started
+        print(f"{label:<9} {elapsed / lookups * 1e6:6.2f} us/lookup")
+
+    info = classify_user_agent.cache_info()
+    print(
+        f"hit rate {info.hits / lookups:.1%}  ({info.misses} misses,"
+        f" {info.currsize}/{info.maxsize} entries)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--distinct", type=int, default=3000)
+    parser.add_argument("--exponent", type=float, default=1.1, help="Zipf exponent")
+    args = parser.parse_args()
+    main(args.lookups, args.distinct, args.exponent)
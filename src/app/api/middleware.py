@@ -1,26 +1,61 @@
 import hmac
+from collections.abc import Iterable
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 _EXEMPT_PATHS = frozenset({"/fraud/collector.js", "/openapi.json", "/docs", "/redoc"})
+_EXEMPT_VERSIONED_COLLECTOR = ("/fraud/collector.", ".js")
+_API_KEY_HEADER = b"x-api-key"
 
 
-class ApiKeyMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, api_key: str) -> None:  # noqa: ANN001
-        super().__init__(app)
-        self._api_key = api_key
+def _is_exempt(path: str) -> bool:
+    if path in _EXEMPT_PATHS:
+        return True
+    prefix, suffix = _EXEMPT_VERSIONED_COLLECTOR
+    return (
+        path.startswith(prefix)
+        and path.endswith(suffix)
+        and "/" not in path[len(prefix) :]
+    )
 
-    async def dispatch(self, request: Request, call_next) -> Response:  # noqa: ANN001
-        if request.url.path in _EXEMPT_PATHS:
-            return await call_next(request)
 
-        provided = request.headers.get("X-API-Key", "")
-        if not hmac.compare_digest(provided, self._api_key):
-            return JSONResponse(
+class ApiKeyMiddleware:
+    """Raw ASGI middleware checking X-API-Key against one or more accepted keys.
+
+    Several keys may be active at once so they can be rotated without downtime.
+    """
+
+    def __init__(self, app: ASGIApp, api_keys: Iterable[str]) -> None:
+        self._app = app
+        self._api_keys = tuple(key.encode("utf-8") for key in api_keys if key)
+        if not self._api_keys:
+            raise ValueError("ApiKeyMiddleware requires at least one API key")
+
+    def _is_valid(self, provided: bytes) -> bool:
+        # Compare against every key so timing does not reveal which one matched.
+        valid = False
+        for key in self._api_keys:
+            valid |= hmac.compare_digest(provided, key)
+        return valid
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or _is_exempt(scope["path"]):
+            await self._app(scope, receive, send)
+            return
+
+        provided = b""
+        for name, value in scope["headers"]:
+            if name == _API_KEY_HEADER:
+                provided = value
+                break
+
+        if not self._is_valid(provided):
+            response = JSONResponse(
                 {"detail": "Invalid or missing API key"},
                 status_code=401,
             )
+            await response(scope, receive, send)
+            return
 
-        return await call_next(request)
+        await self._app(scope, receive, send)
@@ -1,18 +1,57 @@
 from dishka import FromDishka
 from dishka.integrations.fastapi import DishkaRoute
-from fastapi import APIRouter, Request, Response
+from fastapi import APIRouter, HTTPException, Request, Response
 
 from app.api.modules.fraud.schema import (
+    CacheStatsResponse,
+    CaptchaChallengeStatsResponse,
     CaptchaVerifyRequest,
+    FraudCheckBatchRequest,
+    FraudCheckBatchResponse,
     FraudCheckRequest,
     FraudCheckResponse,
+    FraudStatsResponse,
+    TurnstileStatsResponse,
 )
 from app.api.modules.fraud.service import FraudFacadeService
-from app.api.modules.fraud.services.public.collector import build_collector_script
+from app.api.modules.fraud.services.core.challenge_store import (
+    CaptchaChallengeStore,
+    InMemoryCaptchaChallengeStore,
+)
+from app.api.modules.fraud.services.network import (
+    IpGeoClient,
+    TurnstileVerifierService,
+)
+from app.api.modules.fraud.services.public import CollectorScript
 from app.settings import Config
 
 router = APIRouter(route_class=DishkaRoute)
 
+_IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def _collector_response(
+    request: Request,
+    script: CollectorScript,
+    cache_control: str,
+) -> Response:
+    headers = {
+        "Cache-Control": cache_control,
+        "ETag": script.etag,
+        "Vary": "Accept-Encoding",
+        "Link": (
+            f"<{request.url_for('get_versioned_collector_script', version=script.version).path}>"
+            '; rel="canonical"'
+        ),
+    }
+    if script.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+
+    body, encoding = script.select(request.headers.get("accept-encoding"))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/javascript", headers=headers)
+
 
 @router.post("/check", response_model=FraudCheckResponse, status_code=200)
 async def check_fraud(
@@ -23,6 +62,14 @@ async def check_fraud(
     return await facade.check_request(request=request, payload=payload)
 
 
+@router.post("/check/batch", response_model=FraudCheckBatchResponse, status_code=200)
+async def check_fraud_batch(
+    payload: FraudCheckBatchRequest,
+    facade: FromDishka[FraudFacadeService],
+) -> FraudCheckBatchResponse:
+    return await facade.check_batch(payload=payload)
+
+
 @router.post("/captcha/verify", response_model=FraudCheckResponse, status_code=200)
 async def verify_captcha(
     request: Request,
@@ -32,9 +79,50 @@ async def verify_captcha(
     return await facade.verify_captcha_request(request=request, payload=payload)
 
 
+@router.get("/stats", response_model=FraudStatsResponse, status_code=200)
+async def get_fraud_stats(
+    ip_geo_client: FromDishka[IpGeoClient],
+    turnstile_verifier: FromDishka[TurnstileVerifierService],
+    captcha_challenges: FromDishka[CaptchaChallengeStore],
+) -> FraudStatsResponse:
+    challenge_stats = None
+    if isinstance(captcha_challenges, InMemoryCaptchaChallengeStore):
+        challenge_stats = CaptchaChallengeStatsResponse.model_validate(
+            captcha_challenges.stats()
+        )
+    return FraudStatsResponse(
+        geo_cache=CacheStatsResponse.model_validate(ip_geo_client.cache_stats()),
+        turnstile=TurnstileStatsResponse.model_validate(turnstile_verifier.stats()),
+        turnstile_cache=CacheStatsResponse.model_validate(
+            turnstile_verifier.cache_stats()
+        ),
+        captcha_challenges=challenge_stats,
+    )
+
+
 @router.get("/collector.js", status_code=200)
-async def get_collector_script(config: FromDishka[Config]) -> Response:
-    script = build_collector_script(
-        turnstile_js_url=config.fraud.turnstile_js_url,
+async def get_collector_script(
+    request: Request,
+    script: FromDishka[CollectorScript],
+    config: FromDishka[Config],
+) -> Response:
+    return _collector_response(
+        request=request,
+        script=script,
+        cache_control=f"public, max-age={config.fraud.collector_cache_max_age_seconds}",
+    )
+
+
+@router.get("/collector.{version}.js", status_code=200)
+async def get_versioned_collector_script(
+    request: Request,
+    version: str,
+    script: FromDishka[CollectorScript],
+) -> Response:
+    if version != script.version:
+        raise HTTPException(status_code=404, detail="collector_version_not_found")
+    return _collector_response(
+        request=request,
+        script=script,
+        cache_control=_IMMUTABLE_CACHE_CONTROL,
     )
-    return Response(content=script, media_type="application/javascript")
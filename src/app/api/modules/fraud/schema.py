@@ -91,8 +91,23 @@ class FraudCheckRequest(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
 
+class FraudCheckBatchItem(BaseModel):
+    payload: FraudCheckRequest
+    request_ip: str | None = Field(default=None, max_length=64)
+    headers: dict[str, str] = Field(default_factory=dict, max_length=100)
+    origin: str | None = Field(default=None, max_length=2048)
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class FraudCheckBatchRequest(BaseModel):
+    items: list[FraudCheckBatchItem] = Field(..., min_length=1, max_length=500)
+
+    model_config = ConfigDict(extra="forbid")
+
+
 class CaptchaVerifyRequest(BaseModel):
-    challenge_id: str = Field(..., min_length=16, max_length=256)
+    challenge_id: str = Field(..., min_length=16, max_length=1024)
     captcha_token: str = Field(..., min_length=16, max_length=8192)
 
     model_config = ConfigDict(extra="forbid")
@@ -104,6 +119,9 @@ class FraudSignal(BaseModel):
     weight: int = Field(..., ge=1, le=100)
     message: str
 
+    # Signals are prebuilt once per code and shared between responses.
+    model_config = ConfigDict(frozen=True)
+
 
 class FraudCheckResponse(BaseModel):
     decision: Literal["allow", "review", "block"]
@@ -121,3 +139,55 @@ class FraudCheckResponse(BaseModel):
     challenge_id: str | None = None
 
     evaluated_at: datetime
+
+
+class FraudCheckBatchResult(BaseModel):
+    index: int = Field(..., ge=0)
+    result: FraudCheckResponse | None = None
+    error: str | None = None
+
+
+class FraudCheckBatchResponse(BaseModel):
+    results: list[FraudCheckBatchResult]
+
+
+class CacheStatsResponse(BaseModel):
+    size: int
+    approx_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TurnstileStatsResponse(BaseModel):
+    in_flight: int
+    queued: int
+    peak_queued: int
+    rejected: int
+    short_circuited: int
+    requests: int
+    failures: int
+    avg_latency_ms: float
+    max_latency_ms: float
+    circuit_state: Literal["closed", "open", "half_open"]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CaptchaChallengeStatsResponse(BaseModel):
+    live: int
+    expired: int
+    evicted: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class FraudStatsResponse(BaseModel):
+    geo_cache: CacheStatsResponse
+    turnstile: TurnstileStatsResponse
+    turnstile_cache: CacheStatsResponse
+    # Only the in-memory challenge store keeps counters.
+    captcha_challenges: CaptchaChallengeStatsResponse | None = None
@@ -1,3 +1,4 @@
+import logging
 from collections.abc import Mapping
 from datetime import UTC, datetime
 
@@ -5,40 +6,57 @@ from fastapi import HTTPException, Request
 
 from app.api.modules.fraud.schema import (
     CaptchaVerifyRequest,
+    FraudCheckBatchItem,
+    FraudCheckBatchRequest,
+    FraudCheckBatchResponse,
+    FraudCheckBatchResult,
     FraudCheckRequest,
     FraudCheckResponse,
+    FraudSignal,
 )
 from app.api.modules.fraud.services.collectors import (
     ClientChecksCollector,
     NetworkChecksCollector,
+    build_evaluation_context,
 )
 from app.api.modules.fraud.services.core import (
+    EvaluationContext,
     build_fingerprint,
-    create_signal,
     decision_for_score,
 )
 from app.api.modules.fraud.services.core.challenge_store import (
-    InMemoryCaptchaChallengeStore,
+    CaptchaChallengeStore,
+    CaptchaChallengeStoreUnavailable,
 )
 from app.api.modules.fraud.services.network import (
-    InMemoryIpRateLimiter,
+    RATE_LIMIT_EXCEEDED,
+    IpGeoResult,
+    IpRateLimiter,
     RequestIpResolver,
     TurnstileVerifierService,
-    normalize_headers,
+    normalize_ip,
 )
 from app.settings import Config
 
+logger = logging.getLogger(__name__)
+
+
+def _challenge_store_unavailable(exc: Exception) -> HTTPException:
+    logger.warning("Captcha challenge store unavailable, rejecting verification")
+    logger.debug("Captcha challenge store call failed: %s", exc)
+    return HTTPException(status_code=503, detail="captcha_challenge_store_unavailable")
+
 
 class FraudFacadeService:
     def __init__(
         self,
         config: Config,
-        rate_limiter: InMemoryIpRateLimiter,
+        rate_limiter: IpRateLimiter,
         ip_resolver: RequestIpResolver,
         client_checks: ClientChecksCollector,
         network_checks: NetworkChecksCollector,
         turnstile_verifier: TurnstileVerifierService,
-        captcha_challenges: InMemoryCaptchaChallengeStore,
+        captcha_challenges: CaptchaChallengeStore,
     ):
         self._config = config
         self._rate_limiter = rate_limiter
@@ -73,36 +91,142 @@ class FraudFacadeService:
     ) -> FraudCheckResponse:
         allowed = await self._rate_limiter.allow(request_ip)
         if not allowed:
-            return FraudCheckResponse(
-                decision="block",
-                risk_score=100,
-                fingerprint_id=build_fingerprint(payload),
+            return self._rate_limited_response(
+                fingerprint_id=self._fingerprint(payload),
                 request_ip=request_ip,
-                signals=[
-                    create_signal(
-                        code="RATE_LIMIT_EXCEEDED",
-                        weight=100,
-                        message="Too many requests from this IP in a short time.",
-                    )
-                ],
-                captcha_required=False,
-                captcha_verified=False,
-                evaluated_at=datetime.now(UTC),
             )
 
-        headers = normalize_headers(request_headers)
-        signals = self._client_checks.collect(
-            payload=payload,
+        # The geo lookup runs while the client checks use the CPU.
+        geo_lookup = self._network_checks.start_lookup(request_ip)
+        try:
+            context = build_evaluation_context(
+                payload=payload,
+                request_ip=request_ip,
+                request_headers=request_headers,
+            )
+            signals = self._client_checks.collect(context)
+            ip_geo = await geo_lookup if geo_lookup is not None else None
+        finally:
+            # No-op once finished; stops the lookup if the request was aborted.
+            if geo_lookup is not None:
+                geo_lookup.cancel()
+        signals.extend(self._network_checks.evaluate(context=context, ip_geo=ip_geo))
+
+        return await self._build_response(
+            context=context,
+            origin=origin,
+            signals=signals,
+            ip_geo=ip_geo,
+        )
+
+    async def check_batch(
+        self, payload: FraudCheckBatchRequest
+    ) -> FraudCheckBatchResponse:
+        """Evaluate a batch of server-to-server checks.
+
+        Rate-limit decisions are taken in one locked pass and geo lookups are
+        deduplicated by IP. A failing item is reported in its own result and does not
+        fail the rest of the batch. An item whose ``request_ip`` does not parse is
+        not evaluated: it would otherwise skip the rate limit and the geo lookup.
+        """
+        request_ips = [normalize_ip(item.request_ip) for item in payload.items]
+        valid = [
+            request_ip is not None or not (item.request_ip or "").strip()
+            for item, request_ip in zip(payload.items, request_ips, strict=True)
+        ]
+        checked_ips = [ip for ip, ok in zip(request_ips, valid, strict=True) if ok]
+        decisions = iter(await self._rate_limiter.allow_many(checked_ips))
+        allowed = [is_valid and next(decisions) for is_valid in valid]
+        ip_geos = await self._network_checks.resolve_many(
+            ip
+            for ip, is_allowed in zip(request_ips, allowed, strict=True)
+            if is_allowed
+        )
+
+        results: list[FraudCheckBatchResult] = []
+        for index, (item, request_ip, is_valid, is_allowed) in enumerate(
+            zip(payload.items, request_ips, valid, allowed, strict=True)
+        ):
+            if not is_valid:
+                results.append(
+                    FraudCheckBatchResult(index=index, error="invalid_request_ip")
+                )
+                continue
+            try:
+                if not is_allowed:
+                    response = self._rate_limited_response(
+                        fingerprint_id=self._fingerprint(item.payload),
+                        request_ip=request_ip,
+                    )
+                else:
+                    response = await self._check_batch_item(
+                        item=item,
+                        request_ip=request_ip,
+                        ip_geo=ip_geos.get(request_ip) if request_ip else None,
+                    )
+            except Exception:  # noqa: BLE001
+                logger.exception(
+                    "Batch fraud check item failed", extra={"index": index}
+                )
+                results.append(FraudCheckBatchResult(index=index, error="check_failed"))
+                continue
+            results.append(FraudCheckBatchResult(index=index, result=response))
+
+        return FraudCheckBatchResponse(results=results)
+
+    async def _check_batch_item(
+        self,
+        item: FraudCheckBatchItem,
+        request_ip: str | None,
+        ip_geo: IpGeoResult | None,
+    ) -> FraudCheckResponse:
+        origin = item.origin
+        if origin and origin.strip().lower() == "null":
+            origin = None
+
+        context = build_evaluation_context(
+            payload=item.payload,
             request_ip=request_ip,
-            headers=headers,
+            request_headers=item.headers,
         )
+        signals = self._client_checks.collect(context)
+        signals.extend(self._network_checks.evaluate(context=context, ip_geo=ip_geo))
 
-        network_signals, ip_geo = await self._network_checks.collect(
-            payload=payload,
+        return await self._build_response(
+            context=context,
+            origin=origin,
+            signals=signals,
+            ip_geo=ip_geo,
+        )
+
+    def _fingerprint(self, payload: FraudCheckRequest) -> str:
+        return build_fingerprint(
+            payload, version=self._config.fraud.fingerprint_version
+        )
+
+    def _rate_limited_response(
+        self,
+        fingerprint_id: str,
+        request_ip: str | None,
+    ) -> FraudCheckResponse:
+        return FraudCheckResponse(
+            decision="block",
+            risk_score=100,
+            fingerprint_id=fingerprint_id,
             request_ip=request_ip,
+            signals=[RATE_LIMIT_EXCEEDED],
+            captcha_required=False,
+            captcha_verified=False,
+            evaluated_at=datetime.now(UTC),
         )
-        signals.extend(network_signals)
 
+    async def _build_response(
+        self,
+        context: EvaluationContext,
+        origin: str | None,
+        signals: list[FraudSignal],
+        ip_geo: IpGeoResult | None,
+    ) -> FraudCheckResponse:
         score = min(sum(signal.weight for signal in signals), 100)
         decision = decision_for_score(
             score=score,
@@ -113,8 +237,8 @@ class FraudFacadeService:
         response = FraudCheckResponse(
             decision=decision,
             risk_score=score,
-            fingerprint_id=build_fingerprint(payload),
-            request_ip=request_ip,
+            fingerprint_id=self._fingerprint(context.payload),
+            request_ip=context.request_ip,
             ip_country_iso=ip_geo.country_iso if ip_geo else None,
             signals=signals,
             captcha_required=False,
@@ -126,11 +250,21 @@ class FraudFacadeService:
             and self._turnstile_verifier.is_configured()
             and self._captcha_challenges.ttl_seconds > 0
         ):
-            challenge_id = await self._captcha_challenges.create(
-                response=response.model_copy(deep=True),
-                request_ip=request_ip,
-                origin=origin,
-            )
+            try:
+                challenge_id = await self._captcha_challenges.create(
+                    response=response,
+                    request_ip=context.request_ip,
+                    origin=origin,
+                )
+            except CaptchaChallengeStoreUnavailable as exc:
+                # Still a review, just one the client cannot clear by captcha.
+                logger.warning(
+                    "Captcha challenge store unavailable, returning review "
+                    "without a challenge"
+                )
+                logger.debug("Captcha challenge store call failed: %s", exc)
+                response.captcha_error_codes = ["challenge_store_unavailable"]
+                return response
             response.captcha_required = True
             response.captcha_provider = self._turnstile_verifier.provider
             response.captcha_site_key = self._turnstile_verifier.site_key
@@ -148,44 +282,37 @@ class FraudFacadeService:
         if origin and origin.strip().lower() == "null":
             origin = None
 
-        challenge = await self._captcha_challenges.get(payload.challenge_id)
+        try:
+            challenge = await self._captcha_challenges.get(payload.challenge_id)
+        except CaptchaChallengeStoreUnavailable as exc:
+            raise _challenge_store_unavailable(exc) from exc
         if not challenge:
             raise HTTPException(status_code=404, detail="captcha_challenge_not_found")
 
         if not await self._rate_limiter.allow(request_ip):
-            return FraudCheckResponse(
-                decision="block",
-                risk_score=100,
-                fingerprint_id=challenge.response.fingerprint_id,
+            return self._rate_limited_response(
+                fingerprint_id=challenge.fingerprint_id,
                 request_ip=request_ip,
-                signals=[
-                    create_signal(
-                        code="RATE_LIMIT_EXCEEDED",
-                        weight=100,
-                        message="Too many requests from this IP in a short time.",
-                    )
-                ],
-                captcha_required=False,
-                captcha_verified=False,
-                evaluated_at=datetime.now(UTC),
             )
 
         if challenge.request_ip:
             if not request_ip:
-                raise HTTPException(status_code=400, detail="captcha_challenge_ip_missing")
+                raise HTTPException(
+                    status_code=400, detail="captcha_challenge_ip_missing"
+                )
             if challenge.request_ip != request_ip:
                 raise HTTPException(
                     status_code=400,
                     detail="captcha_challenge_ip_mismatch",
                 )
 
-        if challenge.origin:
+        if challenge.origin_bound:
             if not origin:
                 raise HTTPException(
                     status_code=400,
                     detail="captcha_challenge_origin_missing",
                 )
-            if challenge.origin.strip().lower() != origin.strip().lower():
+            if not challenge.matches_origin(origin):
                 raise HTTPException(
                     status_code=400,
                     detail="captcha_challenge_origin_mismatch",
@@ -197,18 +324,22 @@ class FraudFacadeService:
         )
 
         if verification.success:
-            consumed = await self._captcha_challenges.consume(payload.challenge_id)
+            try:
+                consumed = await self._captcha_challenges.consume(payload.challenge_id)
+            except CaptchaChallengeStoreUnavailable as exc:
+                raise _challenge_store_unavailable(exc) from exc
             if not consumed:
-                raise HTTPException(status_code=404, detail="captcha_challenge_not_found")
+                raise HTTPException(
+                    status_code=404, detail="captcha_challenge_not_found"
+                )
 
-            base = consumed.response
             return FraudCheckResponse(
                 decision="allow",
-                risk_score=base.risk_score,
-                fingerprint_id=base.fingerprint_id,
+                risk_score=consumed.risk_score,
+                fingerprint_id=consumed.fingerprint_id,
                 request_ip=request_ip,
-                ip_country_iso=base.ip_country_iso,
-                signals=base.signals,
+                ip_country_iso=consumed.ip_country_iso,
+                signals=list(consumed.signals),
                 captcha_required=False,
                 captcha_verified=True,
                 captcha_provider=self._turnstile_verifier.provider,
@@ -218,15 +349,24 @@ class FraudFacadeService:
                 evaluated_at=datetime.now(UTC),
             )
 
-        await self._captcha_challenges.increment_attempts(payload.challenge_id)
-        base = challenge.response
+        # Our own outage must not use up the challenge's attempts.
+        if not verification.unavailable:
+            try:
+                await self._captcha_challenges.increment_attempts(payload.challenge_id)
+            except CaptchaChallengeStoreUnavailable as exc:
+                # The token was rejected either way; only the count is lost.
+                logger.warning(
+                    "Captcha challenge store unavailable, attempt not counted"
+                )
+                logger.debug("Captcha challenge store call failed: %s", exc)
+        # Challenges are only issued for "review" decisions.
         return FraudCheckResponse(
-            decision=base.decision,
-            risk_score=base.risk_score,
-            fingerprint_id=base.fingerprint_id,
+            decision="review",
+            risk_score=challenge.risk_score,
+            fingerprint_id=challenge.fingerprint_id,
             request_ip=request_ip,
-            ip_country_iso=base.ip_country_iso,
-            signals=base.signals,
+            ip_country_iso=challenge.ip_country_iso,
+            signals=list(challenge.signals),
             captcha_required=True,
             captcha_verified=False,
             captcha_provider=self._turnstile_verifier.provider,
@@ -1,8 +1,15 @@
 from app.api.modules.fraud.services.collectors.client_checks import (
     ClientChecksCollector,
 )
+from app.api.modules.fraud.services.collectors.evaluation import (
+    build_evaluation_context,
+)
 from app.api.modules.fraud.services.collectors.network_checks import (
     NetworkChecksCollector,
 )
 
-__all__ = ("ClientChecksCollector", "NetworkChecksCollector")
+__all__ = (
+    "ClientChecksCollector",
+    "NetworkChecksCollector",
+    "build_evaluation_context",
+)
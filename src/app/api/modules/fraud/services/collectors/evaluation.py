@@ -0,0 +1,69 @@
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from app.api.modules.fraud.schema import FraudCheckRequest
+from app.api.modules.fraud.services.context.device import (
+    platform_family_from_client_hints,
+    platform_family_from_navigator,
+)
+from app.api.modules.fraud.services.context.locale import (
+    extract_primary_language,
+    language_base,
+)
+from app.api.modules.fraud.services.core import EvaluationContext
+from app.api.modules.fraud.services.network.common import (
+    normalize_headers,
+    normalize_ip,
+    normalize_text,
+)
+from app.api.modules.fraud.services.network.headers_utils import parse_accept_language
+from app.api.modules.fraud.services.network.user_agent import classify_user_agent
+
+
+def build_evaluation_context(
+    payload: FraudCheckRequest,
+    request_ip: str | None,
+    request_headers: Mapping[str, str] | None,
+) -> EvaluationContext:
+    headers = normalize_headers(request_headers)
+    navigator = payload.navigator
+
+    header_ua = headers.get("user-agent")
+    header_accept_language = headers.get("accept-language")
+    header_primary_language = (
+        extract_primary_language(header_accept_language)
+        if header_accept_language
+        else None
+    )
+    client_hints_platform = (
+        payload.client_hints.platform if payload.client_hints else None
+    )
+    navigator_platform = (navigator.platform or "").lower()
+
+    return EvaluationContext(
+        payload=payload,
+        request_ip=request_ip,
+        client_reported_ip=normalize_ip(payload.client_reported_ip),
+        headers=MappingProxyType(headers),
+        ua=classify_user_agent(navigator.user_agent),
+        header_ua_normalized=normalize_text(header_ua) if header_ua else None,
+        navigator_platform=navigator_platform,
+        navigator_platform_family=platform_family_from_navigator(navigator_platform),
+        client_hints_platform_family=(
+            platform_family_from_client_hints(client_hints_platform)
+            if client_hints_platform
+            else None
+        ),
+        language_base=language_base(navigator.language) if navigator.language else None,
+        language_bases=frozenset(language_base(item) for item in navigator.languages),
+        header_primary_language_base=(
+            language_base(header_primary_language) if header_primary_language else None
+        ),
+        header_language_bases=frozenset(
+            language_base(item)
+            for item in parse_accept_language(header_accept_language)
+        ),
+    )
+
+
+__all__ = ("build_evaluation_context",)
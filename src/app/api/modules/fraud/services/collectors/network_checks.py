@@ -1,5 +1,9 @@
-from app.api.modules.fraud.schema import FraudCheckRequest, FraudSignal
+import asyncio
+from collections.abc import Iterable
+
+from app.api.modules.fraud.schema import FraudSignal
 from app.api.modules.fraud.services.context.geo import GeoConsistencyService
+from app.api.modules.fraud.services.core import EvaluationContext
 from app.api.modules.fraud.services.network import IpGeoClient, IpGeoResult
 
 
@@ -12,17 +16,36 @@ class NetworkChecksCollector:
         self._ip_geo_client = ip_geo_client
         self._geo_checks = geo_checks
 
-    async def collect(
+    def start_lookup(
         self,
-        payload: FraudCheckRequest,
         request_ip: str | None,
-    ) -> tuple[list[FraudSignal], IpGeoResult | None]:
-        ip_geo: IpGeoResult | None = None
-        if request_ip:
-            ip_geo = await self._ip_geo_client.resolve(request_ip)
+    ) -> asyncio.Task[IpGeoResult | None] | None:
+        """Start resolving ``request_ip`` so the lookup overlaps with other checks.
+
+        The task starts eagerly: a cached result is ready before this returns, and a
+        cache miss gets its upstream request underway without waiting for the next
+        event loop iteration. The caller must await or cancel the task.
+        """
+        if not request_ip:
+            return None
+        return asyncio.Task(
+            self._ip_geo_client.resolve(request_ip),
+            loop=asyncio.get_running_loop(),
+            eager_start=True,
+        )
 
-        signals = self._geo_checks.collect(payload=payload, ip_geo=ip_geo)
-        return signals, ip_geo
+    async def resolve_many(
+        self,
+        request_ips: Iterable[str | None],
+    ) -> dict[str, IpGeoResult | None]:
+        return await self._ip_geo_client.resolve_many(request_ips)
+
+    def evaluate(
+        self,
+        context: EvaluationContext,
+        ip_geo: IpGeoResult | None,
+    ) -> list[FraudSignal]:
+        return self._geo_checks.collect(context=context, ip_geo=ip_geo)
 
 
 __all__ = ("NetworkChecksCollector",)
@@ -1,16 +1,33 @@
-from app.api.modules.fraud.schema import FraudCheckRequest, FraudSignal
-from app.api.modules.fraud.services.core import create_signal
+from app.api.modules.fraud.schema import FraudSignal
+from app.api.modules.fraud.services.core import EvaluationContext, define_signal
 
 # Thresholds
 _MIN_TIME_ON_PAGE_MS = 3000  # less than 3 seconds → suspicious
 _MIN_INTERACTION_EVENTS = 3  # at least a few keydowns or mouse/touch events
 
+_TOO_FAST_SUBMISSION = define_signal(
+    code="TOO_FAST_SUBMISSION",
+    weight=25,
+    message="Page was submitted too quickly (under 3 seconds).",
+)
+_NO_SCROLL_BEFORE_SUBMIT = define_signal(
+    code="NO_SCROLL_BEFORE_SUBMIT",
+    weight=18,
+    message="No scroll detected on a page that requires scrolling.",
+)
+_NO_HUMAN_INTERACTION = define_signal(
+    code="NO_HUMAN_INTERACTION",
+    weight=30,
+    message="No keyboard, mouse, or touch events detected.",
+)
+
 
 class BehaviorConsistencyService:
     def collect(
         self,
-        payload: FraudCheckRequest,
+        context: EvaluationContext,
     ) -> list[FraudSignal]:
+        payload = context.payload
         bhv = payload.behavior
         if bhv is None:
             return []
@@ -18,14 +35,11 @@ class BehaviorConsistencyService:
         signals: list[FraudSignal] = []
 
         # Too fast: form submitted in under 3 seconds
-        if bhv.time_on_page_ms is not None and bhv.time_on_page_ms < _MIN_TIME_ON_PAGE_MS:
-            signals.append(
-                create_signal(
-                    code="TOO_FAST_SUBMISSION",
-                    weight=25,
-                    message="Page was submitted too quickly (under 3 seconds).",
-                )
-            )
+        if (
+            bhv.time_on_page_ms is not None
+            and bhv.time_on_page_ms < _MIN_TIME_ON_PAGE_MS
+        ):
+            signals.append(_TOO_FAST_SUBMISSION)
 
         # No scroll on a page that requires scrolling
         if (
@@ -36,13 +50,7 @@ class BehaviorConsistencyService:
         ):
             viewport_h = payload.viewport.height
             if bhv.document_height > viewport_h + 200:
-                signals.append(
-                    create_signal(
-                        code="NO_SCROLL_BEFORE_SUBMIT",
-                        weight=18,
-                        message="No scroll detected on a page that requires scrolling.",
-                    )
-                )
+                signals.append(_NO_SCROLL_BEFORE_SUBMIT)
 
         # No human interaction events at all (no keys, no mouse, no touch)
         keys = bhv.keydown_count or 0
@@ -51,13 +59,7 @@ class BehaviorConsistencyService:
         total_interaction = keys + mouse + touch
 
         if total_interaction < _MIN_INTERACTION_EVENTS:
-            signals.append(
-                create_signal(
-                    code="NO_HUMAN_INTERACTION",
-                    weight=30,
-                    message="No keyboard, mouse, or touch events detected.",
-                )
-            )
+            signals.append(_NO_HUMAN_INTERACTION)
 
         return signals
 
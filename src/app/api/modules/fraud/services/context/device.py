@@ -1,15 +1,105 @@
-from app.api.modules.fraud.schema import FraudCheckRequest, FraudSignal
-from app.api.modules.fraud.services.core import create_signal
-from app.api.modules.fraud.services.network.user_agent import (
-    is_android_ua,
-    is_desktop_mac_ua,
-    is_ios_ua,
-    is_tablet_ua,
-)
+from app.api.modules.fraud.schema import FraudSignal
+from app.api.modules.fraud.services.core import EvaluationContext, define_signal
 
 ANDROID_PLATFORM_MARKERS = ("android", "linux")
 IOS_PLATFORM_MARKERS = ("iphone", "ipad", "ipod", "macintel")
 
+_MOBILE_UA_DESKTOP_VIEWPORT = define_signal(
+    code="MOBILE_UA_DESKTOP_VIEWPORT",
+    weight=30,
+    message="Mobile User-Agent with desktop-sized viewport/screen.",
+)
+_UA_CLIENT_HINTS_MISMATCH = define_signal(
+    code="UA_CLIENT_HINTS_MISMATCH",
+    weight=20,
+    message="Client hints mobile flag is inconsistent with User-Agent.",
+)
+_UA_CH_PLATFORM_MISMATCH = define_signal(
+    code="UA_CH_PLATFORM_MISMATCH",
+    weight=20,
+    message="Client hints platform is inconsistent with User-Agent platform.",
+)
+_NAV_CH_PLATFORM_MISMATCH = define_signal(
+    code="NAV_CH_PLATFORM_MISMATCH",
+    weight=15,
+    message="Client hints platform is inconsistent with navigator.platform.",
+)
+_VIEWPORT_EXCEEDS_SCREEN_WIDTH = define_signal(
+    code="VIEWPORT_EXCEEDS_SCREEN_WIDTH",
+    weight=15,
+    message="Viewport width significantly exceeds screen width.",
+)
+_VIEWPORT_EXCEEDS_SCREEN_HEIGHT = define_signal(
+    code="VIEWPORT_EXCEEDS_SCREEN_HEIGHT",
+    weight=12,
+    message="Viewport height significantly exceeds screen height.",
+)
+_VIEWPORT_EXCEEDS_SCREEN_AVAIL_WIDTH = define_signal(
+    code="VIEWPORT_EXCEEDS_SCREEN_AVAIL_WIDTH",
+    weight=8,
+    message="Viewport width significantly exceeds screen.availWidth.",
+)
+_VIEWPORT_EXCEEDS_SCREEN_AVAIL_HEIGHT = define_signal(
+    code="VIEWPORT_EXCEEDS_SCREEN_AVAIL_HEIGHT",
+    weight=8,
+    message="Viewport height significantly exceeds screen.availHeight.",
+)
+_SCREEN_AVAIL_WIDTH_INVALID = define_signal(
+    code="SCREEN_AVAIL_WIDTH_INVALID",
+    weight=12,
+    message="screen.availWidth is larger than screen.width.",
+)
+_SCREEN_AVAIL_HEIGHT_INVALID = define_signal(
+    code="SCREEN_AVAIL_HEIGHT_INVALID",
+    weight=12,
+    message="screen.availHeight is larger than screen.height.",
+)
+_UNUSUAL_PIXEL_RATIO = define_signal(
+    code="UNUSUAL_PIXEL_RATIO",
+    weight=10,
+    message="Reported device pixel ratio is unusually high.",
+)
+_MOBILE_UA_ZERO_TOUCH_POINTS = define_signal(
+    code="MOBILE_UA_ZERO_TOUCH_POINTS",
+    weight=15,
+    message="Mobile User-Agent reports zero touch points.",
+)
+_DESKTOP_UA_HIGH_TOUCH_POINTS = define_signal(
+    code="DESKTOP_UA_HIGH_TOUCH_POINTS",
+    weight=8,
+    message="Desktop User-Agent reports unusually high touch points.",
+)
+_TINY_VIEWPORT_DESKTOP = define_signal(
+    code="TINY_VIEWPORT_DESKTOP",
+    weight=6,
+    message="Desktop-like UA with an unusually small viewport.",
+)
+_UA_PLATFORM_MISMATCH_ANDROID = define_signal(
+    code="UA_PLATFORM_MISMATCH_ANDROID",
+    weight=15,
+    message="UA claims Android but navigator.platform differs.",
+)
+_UA_PLATFORM_MISMATCH_IOS = define_signal(
+    code="UA_PLATFORM_MISMATCH_IOS",
+    weight=15,
+    message="UA claims iOS but navigator.platform differs.",
+)
+_UA_PLATFORM_MISMATCH_WINDOWS = define_signal(
+    code="UA_PLATFORM_MISMATCH_WINDOWS",
+    weight=15,
+    message="UA claims Windows but navigator.platform differs.",
+)
+_UA_PLATFORM_MISMATCH_MAC = define_signal(
+    code="UA_PLATFORM_MISMATCH_MAC",
+    weight=15,
+    message="UA claims desktop macOS but navigator.platform differs.",
+)
+_UA_PLATFORM_MISMATCH_LINUX = define_signal(
+    code="UA_PLATFORM_MISMATCH_LINUX",
+    weight=15,
+    message="UA claims Linux but navigator.platform differs.",
+)
+
 
 def exceeds_screen(value: int, screen_value: int, tolerance: int) -> bool:
     return value > screen_value + tolerance
@@ -21,23 +111,6 @@ def invalid_available_dimension(avail_value: int | None, screen_value: int) -> b
     return avail_value > screen_value + 20
 
 
-def platform_family_from_user_agent(ua: str) -> str | None:
-    marker = ua.lower()
-    if "android" in marker:
-        return "android"
-    if "iphone" in marker or "ipad" in marker or "ipod" in marker:
-        return "apple"
-    if "windows" in marker:
-        return "windows"
-    if "macintosh" in marker:
-        return "apple"
-    if "cros" in marker:
-        return "chromeos"
-    if "linux" in marker:
-        return "linux"
-    return None
-
-
 def platform_family_from_navigator(platform: str) -> str | None:
     marker = platform.lower()
     if not marker:
@@ -75,216 +148,115 @@ def platform_family_from_client_hints(platform: str) -> str | None:
 class DeviceConsistencyService:
     def collect(
         self,
-        payload: FraudCheckRequest,
-        ua: str,
-        platform: str,
-        is_mobile_ua: bool,
+        context: EvaluationContext,
     ) -> list[FraudSignal]:
+        payload = context.payload
+        ua = context.ua
+        platform = context.navigator_platform
+        is_mobile_ua = ua.is_mobile
         signals: list[FraudSignal] = []
 
-        tablet_ua = is_tablet_ua(ua)
+        tablet_ua = ua.is_tablet
         max_width = max(payload.viewport.width, payload.screen.width)
         if is_mobile_ua and not tablet_ua and max_width >= 1280:
-            signals.append(
-                create_signal(
-                    code="MOBILE_UA_DESKTOP_VIEWPORT",
-                    weight=30,
-                    message="Mobile User-Agent with desktop-sized viewport/screen.",
-                )
-            )
+            signals.append(_MOBILE_UA_DESKTOP_VIEWPORT)
 
         if (
             payload.client_hints
             and payload.client_hints.mobile is not None
             and bool(payload.client_hints.mobile) != (is_mobile_ua and not tablet_ua)
         ):
-            signals.append(
-                create_signal(
-                    code="UA_CLIENT_HINTS_MISMATCH",
-                    weight=20,
-                    message="Client hints mobile flag is inconsistent with User-Agent.",
-                )
-            )
+            signals.append(_UA_CLIENT_HINTS_MISMATCH)
 
         if payload.client_hints and payload.client_hints.platform:
-            ua_family = platform_family_from_user_agent(ua)
-            ch_family = platform_family_from_client_hints(payload.client_hints.platform)
+            ua_family = ua.platform_family
+            ch_family = context.client_hints_platform_family
             if ua_family and ch_family and ua_family != ch_family:
-                signals.append(
-                    create_signal(
-                        code="UA_CH_PLATFORM_MISMATCH",
-                        weight=20,
-                        message="Client hints platform is inconsistent with User-Agent platform.",
-                    )
-                )
+                signals.append(_UA_CH_PLATFORM_MISMATCH)
 
-            nav_family = platform_family_from_navigator(platform)
+            nav_family = context.navigator_platform_family
             if (
                 nav_family
                 and ch_family
-                and not (ua_family == "android" and nav_family == "linux" and ch_family == "android")
+                and not (
+                    ua_family == "android"
+                    and nav_family == "linux"
+                    and ch_family == "android"
+                )
                 and nav_family != ch_family
             ):
-                signals.append(
-                    create_signal(
-                        code="NAV_CH_PLATFORM_MISMATCH",
-                        weight=15,
-                        message=(
-                            "Client hints platform is inconsistent with navigator.platform."
-                        ),
-                    )
-                )
+                signals.append(_NAV_CH_PLATFORM_MISMATCH)
 
         if exceeds_screen(payload.viewport.width, payload.screen.width, 120):
-            signals.append(
-                create_signal(
-                    code="VIEWPORT_EXCEEDS_SCREEN_WIDTH",
-                    weight=15,
-                    message="Viewport width significantly exceeds screen width.",
-                )
-            )
+            signals.append(_VIEWPORT_EXCEEDS_SCREEN_WIDTH)
 
         if exceeds_screen(payload.viewport.height, payload.screen.height, 160):
-            signals.append(
-                create_signal(
-                    code="VIEWPORT_EXCEEDS_SCREEN_HEIGHT",
-                    weight=12,
-                    message="Viewport height significantly exceeds screen height.",
-                )
-            )
+            signals.append(_VIEWPORT_EXCEEDS_SCREEN_HEIGHT)
 
-        if (
-            payload.screen.avail_width is not None
-            and exceeds_screen(payload.viewport.width, payload.screen.avail_width, 240)
+        if payload.screen.avail_width is not None and exceeds_screen(
+            payload.viewport.width, payload.screen.avail_width, 240
         ):
-            signals.append(
-                create_signal(
-                    code="VIEWPORT_EXCEEDS_SCREEN_AVAIL_WIDTH",
-                    weight=8,
-                    message="Viewport width significantly exceeds screen.availWidth.",
-                )
-            )
+            signals.append(_VIEWPORT_EXCEEDS_SCREEN_AVAIL_WIDTH)
 
-        if (
-            payload.screen.avail_height is not None
-            and exceeds_screen(payload.viewport.height, payload.screen.avail_height, 320)
+        if payload.screen.avail_height is not None and exceeds_screen(
+            payload.viewport.height, payload.screen.avail_height, 320
         ):
-            signals.append(
-                create_signal(
-                    code="VIEWPORT_EXCEEDS_SCREEN_AVAIL_HEIGHT",
-                    weight=8,
-                    message="Viewport height significantly exceeds screen.availHeight.",
-                )
-            )
-
-        if invalid_available_dimension(payload.screen.avail_width, payload.screen.width):
-            signals.append(
-                create_signal(
-                    code="SCREEN_AVAIL_WIDTH_INVALID",
-                    weight=12,
-                    message="screen.availWidth is larger than screen.width.",
-                )
-            )
-
-        if invalid_available_dimension(payload.screen.avail_height, payload.screen.height):
-            signals.append(
-                create_signal(
-                    code="SCREEN_AVAIL_HEIGHT_INVALID",
-                    weight=12,
-                    message="screen.availHeight is larger than screen.height.",
-                )
-            )
+            signals.append(_VIEWPORT_EXCEEDS_SCREEN_AVAIL_HEIGHT)
+
+        if invalid_available_dimension(
+            payload.screen.avail_width, payload.screen.width
+        ):
+            signals.append(_SCREEN_AVAIL_WIDTH_INVALID)
+
+        if invalid_available_dimension(
+            payload.screen.avail_height, payload.screen.height
+        ):
+            signals.append(_SCREEN_AVAIL_HEIGHT_INVALID)
 
         if payload.screen.pixel_ratio and payload.screen.pixel_ratio > 5:
-            signals.append(
-                create_signal(
-                    code="UNUSUAL_PIXEL_RATIO",
-                    weight=10,
-                    message="Reported device pixel ratio is unusually high.",
-                )
-            )
+            signals.append(_UNUSUAL_PIXEL_RATIO)
 
         if is_mobile_ua and payload.navigator.max_touch_points == 0:
-            signals.append(
-                create_signal(
-                    code="MOBILE_UA_ZERO_TOUCH_POINTS",
-                    weight=15,
-                    message="Mobile User-Agent reports zero touch points.",
-                )
-            )
+            signals.append(_MOBILE_UA_ZERO_TOUCH_POINTS)
 
         if not is_mobile_ua and (payload.navigator.max_touch_points or 0) >= 10:
-            signals.append(
-                create_signal(
-                    code="DESKTOP_UA_HIGH_TOUCH_POINTS",
-                    weight=8,
-                    message="Desktop User-Agent reports unusually high touch points.",
-                )
-            )
-
-        if not is_mobile_ua and payload.viewport.width <= 420 and payload.viewport.height <= 420:
-            signals.append(
-                create_signal(
-                    code="TINY_VIEWPORT_DESKTOP",
-                    weight=6,
-                    message="Desktop-like UA with an unusually small viewport.",
-                )
-            )
+            signals.append(_DESKTOP_UA_HIGH_TOUCH_POINTS)
 
-        if is_android_ua(ua) and platform and not any(
-            marker in platform for marker in ANDROID_PLATFORM_MARKERS
+        if (
+            not is_mobile_ua
+            and payload.viewport.width <= 420
+            and payload.viewport.height <= 420
         ):
-            signals.append(
-                create_signal(
-                    code="UA_PLATFORM_MISMATCH_ANDROID",
-                    weight=15,
-                    message="UA claims Android but navigator.platform differs.",
-                )
-            )
+            signals.append(_TINY_VIEWPORT_DESKTOP)
 
-        if is_ios_ua(ua) and platform and not any(
-            marker in platform for marker in IOS_PLATFORM_MARKERS
+        if (
+            ua.is_android
+            and platform
+            and not any(marker in platform for marker in ANDROID_PLATFORM_MARKERS)
         ):
-            signals.append(
-                create_signal(
-                    code="UA_PLATFORM_MISMATCH_IOS",
-                    weight=15,
-                    message="UA claims iOS but navigator.platform differs.",
-                )
-            )
-
-        if "windows" in ua and platform and "win" not in platform:
-            signals.append(
-                create_signal(
-                    code="UA_PLATFORM_MISMATCH_WINDOWS",
-                    weight=15,
-                    message="UA claims Windows but navigator.platform differs.",
-                )
-            )
-
-        if is_desktop_mac_ua(ua) and platform and "mac" not in platform:
-            signals.append(
-                create_signal(
-                    code="UA_PLATFORM_MISMATCH_MAC",
-                    weight=15,
-                    message="UA claims desktop macOS but navigator.platform differs.",
-                )
-            )
+            signals.append(_UA_PLATFORM_MISMATCH_ANDROID)
+
+        if (
+            ua.is_ios
+            and platform
+            and not any(marker in platform for marker in IOS_PLATFORM_MARKERS)
+        ):
+            signals.append(_UA_PLATFORM_MISMATCH_IOS)
+
+        if ua.is_windows and platform and "win" not in platform:
+            signals.append(_UA_PLATFORM_MISMATCH_WINDOWS)
+
+        if ua.is_desktop_mac and platform and "mac" not in platform:
+            signals.append(_UA_PLATFORM_MISMATCH_MAC)
 
         if (
-            "linux" in ua
-            and not is_android_ua(ua)
+            ua.is_linux
+            and not ua.is_android
             and platform
             and "linux" not in platform
             and "x11" not in platform
         ):
-            signals.append(
-                create_signal(
-                    code="UA_PLATFORM_MISMATCH_LINUX",
-                    weight=15,
-                    message="UA claims Linux but navigator.platform differs.",
-                )
-            )
+            signals.append(_UA_PLATFORM_MISMATCH_LINUX)
 
         return signals
 
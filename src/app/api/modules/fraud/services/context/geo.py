@@ -1,8 +1,36 @@
 from math import asin, cos, radians, sin, sqrt
 
-from app.api.modules.fraud.schema import FraudCheckRequest, FraudSignal
-from app.api.modules.fraud.services.core import create_signal
-from app.api.modules.fraud.services.network import IpGeoResult
+from app.api.modules.fraud.schema import FraudSignal
+from app.api.modules.fraud.services.core import EvaluationContext, define_signal
+from app.api.modules.fraud.services.network import HostingRangeIndex, IpGeoResult
+
+_HOSTING_PROVIDER_IP = define_signal(
+    code="HOSTING_PROVIDER_IP",
+    weight=20,
+    message="IP appears to belong to a hosting/data-center provider.",
+)
+_IP_COUNTRY_MISMATCH = define_signal(
+    code="IP_COUNTRY_MISMATCH",
+    weight=35,
+    message="Location country does not match IP geolocation country.",
+)
+_IP_TIMEZONE_MISMATCH = define_signal(
+    code="IP_TIMEZONE_MISMATCH",
+    weight=15,
+    message="Reported timezone does not match IP geolocation timezone.",
+)
+_IP_UTC_OFFSET_MISMATCH = define_signal(
+    code="IP_UTC_OFFSET_MISMATCH",
+    weight=18,
+    message="Reported UTC offset does not match IP geolocation UTC offset.",
+)
+_GEOLOCATION_DISTANCE_MISMATCH = define_signal(
+    code="GEOLOCATION_DISTANCE_MISMATCH",
+    weight=25,
+    message=(
+        "Browser geolocation is too far from IP geolocation for the reported accuracy."
+    ),
+)
 
 
 def haversine_distance_km(
@@ -15,65 +43,57 @@ def haversine_distance_km(
     r = 6371.0
     dlat = radians(lat2 - lat1)
     dlon = radians(lon2 - lon1)
-    a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
+    a = (
+        sin(dlat / 2) ** 2
+        + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
+    )
     return 2 * r * asin(sqrt(a))
 
 
 class GeoConsistencyService:
+    def __init__(self, hosting_ranges: HostingRangeIndex | None = None):
+        # Local hosting range lists; they work even without IP geolocation.
+        self._hosting_ranges = hosting_ranges
+
+    def _is_hosting(self, request_ip: str | None, ip_geo: IpGeoResult | None) -> bool:
+        if ip_geo is not None and ip_geo.is_hosting:
+            return True
+        if self._hosting_ranges is None or not request_ip:
+            return False
+        self._hosting_ranges.reload_if_changed()
+        return self._hosting_ranges.contains(request_ip)
+
     def collect(
         self,
-        payload: FraudCheckRequest,
+        context: EvaluationContext,
         ip_geo: IpGeoResult | None,
     ) -> list[FraudSignal]:
-        if ip_geo is None:
-            return []
-
         signals: list[FraudSignal] = []
+        if self._is_hosting(context.request_ip, ip_geo):
+            signals.append(_HOSTING_PROVIDER_IP)
 
-        if ip_geo.is_hosting:
-            signals.append(
-                create_signal(
-                    code="HOSTING_PROVIDER_IP",
-                    weight=20,
-                    message="IP appears to belong to a hosting/data-center provider.",
-                )
-            )
+        if ip_geo is None:
+            return signals
 
+        payload = context.payload
         if not payload.location:
             return signals
 
         if payload.location.country_iso and ip_geo.country_iso:
             if payload.location.country_iso.upper() != ip_geo.country_iso.upper():
-                signals.append(
-                    create_signal(
-                        code="IP_COUNTRY_MISMATCH",
-                        weight=35,
-                        message="Location country does not match IP geolocation country.",
-                    )
-                )
+                signals.append(_IP_COUNTRY_MISMATCH)
 
         if payload.location.timezone and ip_geo.timezone:
             if payload.location.timezone != ip_geo.timezone:
-                signals.append(
-                    create_signal(
-                        code="IP_TIMEZONE_MISMATCH",
-                        weight=15,
-                        message="Reported timezone does not match IP geolocation timezone.",
-                    )
-                )
+                signals.append(_IP_TIMEZONE_MISMATCH)
 
         if (
             payload.location.utc_offset_minutes is not None
             and ip_geo.utc_offset_minutes is not None
-            and abs(payload.location.utc_offset_minutes - ip_geo.utc_offset_minutes) > 60
+            and abs(payload.location.utc_offset_minutes - ip_geo.utc_offset_minutes)
+            > 60
         ):
-            signals.append(
-                create_signal(
-                    code="IP_UTC_OFFSET_MISMATCH",
-                    weight=18,
-                    message="Reported UTC offset does not match IP geolocation UTC offset.",
-                )
-            )
+            signals.append(_IP_UTC_OFFSET_MISMATCH)
 
         if (
             payload.location.latitude is not None
@@ -90,16 +110,7 @@ class GeoConsistencyService:
                 ip_geo.longitude,
             )
             if distance_km >= 800:
-                signals.append(
-                    create_signal(
-                        code="GEOLOCATION_DISTANCE_MISMATCH",
-                        weight=25,
-                        message=(
-                            "Browser geolocation is too far from IP geolocation for the"
-                            " reported accuracy."
-                        ),
-                    )
-                )
+                signals.append(_GEOLOCATION_DISTANCE_MISMATCH)
 
         return signals
 
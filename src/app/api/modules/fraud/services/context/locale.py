@@ -1,15 +1,33 @@
 from datetime import UTC, datetime
 from zoneinfo import ZoneInfo
 
-from app.api.modules.fraud.schema import FraudCheckRequest, FraudSignal
-from app.api.modules.fraud.services.core import create_signal
+from app.api.modules.fraud.schema import FraudSignal
+from app.api.modules.fraud.services.core import EvaluationContext, define_signal
+
+_MISSING_LANGUAGE_DATA = define_signal(
+    code="MISSING_LANGUAGE_DATA",
+    weight=10,
+    message="Browser language signals are missing.",
+)
+_LANGUAGE_MISMATCH = define_signal(
+    code="LANGUAGE_MISMATCH",
+    weight=10,
+    message="navigator.language is inconsistent with navigator.languages.",
+)
+_TIMEZONE_OFFSET_MISMATCH = define_signal(
+    code="TIMEZONE_OFFSET_MISMATCH",
+    weight=20,
+    message="Reported timezone and UTC offset are inconsistent.",
+)
 
 
 def language_base(language: str) -> str:
     return language.split("-", 1)[0].lower()
 
 
-def timezone_offset_minutes(timezone_name: str, at: datetime | None = None) -> int | None:
+def timezone_offset_minutes(
+    timezone_name: str, at: datetime | None = None
+) -> int | None:
     try:
         tz = ZoneInfo(timezone_name)
     except Exception:  # noqa: BLE001
@@ -34,48 +52,32 @@ def extract_primary_language(accept_language: str) -> str | None:
 
 
 class LocaleConsistencyService:
-    def collect(self, payload: FraudCheckRequest) -> list[FraudSignal]:
+    def collect(self, context: EvaluationContext) -> list[FraudSignal]:
+        payload = context.payload
         signals: list[FraudSignal] = []
 
         language = payload.navigator.language
         languages = payload.navigator.languages
 
         if not language and not languages:
-            signals.append(
-                create_signal(
-                    code="MISSING_LANGUAGE_DATA",
-                    weight=10,
-                    message="Browser language signals are missing.",
-                )
-            )
-
-        if language and languages:
-            language_bases = {language_base(item) for item in languages}
-            if language_base(language) not in language_bases:
-                signals.append(
-                    create_signal(
-                        code="LANGUAGE_MISMATCH",
-                        weight=10,
-                        message="navigator.language is inconsistent with navigator.languages.",
-                    )
-                )
+            signals.append(_MISSING_LANGUAGE_DATA)
+
+        if context.language_base is not None and languages:
+            if context.language_base not in context.language_bases:
+                signals.append(_LANGUAGE_MISMATCH)
 
         location = payload.location
         if not location or not location.timezone or location.utc_offset_minutes is None:
             return signals
 
-        expected_offset = timezone_offset_minutes(location.timezone, at=payload.collected_at)
+        expected_offset = timezone_offset_minutes(
+            location.timezone, at=payload.collected_at
+        )
         if expected_offset is None:
             return signals
 
         if abs(expected_offset - location.utc_offset_minutes) > 60:
-            signals.append(
-                create_signal(
-                    code="TIMEZONE_OFFSET_MISMATCH",
-                    weight=20,
-                    message="Reported timezone and UTC offset are inconsistent.",
-                )
-            )
+            signals.append(_TIMEZONE_OFFSET_MISMATCH)
 
         return signals
 
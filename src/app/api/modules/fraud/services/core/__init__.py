@@ -1,3 +1,15 @@
+from app.api.modules.fraud.services.core.evaluation import (
+    EvaluationContext,
+    UserAgentFacts,
+)
+from app.api.modules.fraud.services.core.markers import MarkerMatcher
+from app.api.modules.fraud.services.core.signals import (
+    SIGNAL_CATALOGUE,
+    SIGNAL_MODULES,
+    define_signal,
+    signal_catalogue,
+)
+from app.api.modules.fraud.services.core.ttl_cache import CacheStats, TtlLruCache
 from app.api.modules.fraud.services.core.utils import (
     build_fingerprint,
     create_signal,
@@ -6,8 +18,17 @@ from app.api.modules.fraud.services.core.utils import (
 )
 
 __all__ = (
+    "SIGNAL_CATALOGUE",
+    "SIGNAL_MODULES",
+    "CacheStats",
+    "EvaluationContext",
+    "MarkerMatcher",
+    "TtlLruCache",
+    "UserAgentFacts",
     "build_fingerprint",
     "create_signal",
     "decision_for_score",
+    "define_signal",
     "severity_for_weight",
+    "signal_catalogue",
 )
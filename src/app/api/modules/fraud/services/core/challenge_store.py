@@ -1,18 +1,101 @@
 import asyncio
 import secrets
+from base64 import urlsafe_b64encode
+from collections import OrderedDict
 from dataclasses import dataclass
+from hashlib import sha256
 from time import monotonic
+from typing import Protocol
 
-from app.api.modules.fraud.schema import FraudCheckResponse
+from app.api.modules.fraud.schema import FraudCheckResponse, FraudSignal
+
+
+def _normalize_origin(origin: str) -> str:
+    return origin.strip().lower()
+
+
+def hash_origin(origin: str) -> str:
+    """Short, fixed-length digest of an Origin, normalized like origin comparison."""
+    digest = sha256(_normalize_origin(origin).encode("utf-8")).digest()
+    return urlsafe_b64encode(digest[:12]).decode("ascii")
 
 
 @dataclass(slots=True)
 class CaptchaChallenge:
-    response: FraudCheckResponse
+    """Compact snapshot of a review decision awaiting captcha verification.
+
+    Only the fields needed to rebuild the response are kept; signals are the shared
+    catalogue instances, so a pending challenge does not copy the response.
+
+    A challenge is bound to either the raw ``origin`` or, when carried in a token
+    that must stay short, only its ``origin_digest``.
+    """
+
+    fingerprint_id: str
+    risk_score: int
+    ip_country_iso: str | None
+    signals: tuple[FraudSignal, ...]
     request_ip: str | None
     origin: str | None
     expires_at: float
     attempts: int = 0
+    origin_digest: str | None = None
+
+    @property
+    def origin_bound(self) -> bool:
+        return bool(self.origin or self.origin_digest)
+
+    def matches_origin(self, origin: str) -> bool:
+        if self.origin:
+            return _normalize_origin(self.origin) == _normalize_origin(origin)
+        return self.origin_digest == hash_origin(origin)
+
+    @classmethod
+    def from_response(
+        cls,
+        response: FraudCheckResponse,
+        request_ip: str | None,
+        origin: str | None,
+        expires_at: float,
+    ) -> "CaptchaChallenge":
+        return cls(
+            fingerprint_id=response.fingerprint_id,
+            risk_score=response.risk_score,
+            ip_country_iso=response.ip_country_iso,
+            signals=tuple(response.signals),
+            request_ip=request_ip,
+            origin=origin,
+            expires_at=expires_at,
+        )
+
+
+class CaptchaChallengeStoreUnavailable(Exception):
+    """The store's backend could not be reached, so the challenge state is unknown."""
+
+
+@dataclass(slots=True)
+class CaptchaChallengeStoreStats:
+    live: int
+    expired: int
+    evicted: int
+
+
+class CaptchaChallengeStore(Protocol):
+    @property
+    def ttl_seconds(self) -> int: ...
+
+    async def create(
+        self,
+        response: FraudCheckResponse,
+        request_ip: str | None,
+        origin: str | None,
+    ) -> str: ...
+
+    async def get(self, challenge_id: str) -> CaptchaChallenge | None: ...
+
+    async def increment_attempts(self, challenge_id: str) -> int | None: ...
+
+    async def consume(self, challenge_id: str) -> CaptchaChallenge | None: ...
 
 
 class InMemoryCaptchaChallengeStore:
@@ -23,14 +106,24 @@ class InMemoryCaptchaChallengeStore:
     2) /fraud/captcha/verify verifies captcha token and finalizes the decision
        without re-evaluating fraud
 
-    Note: per-process memory store. For multi-replica deployments, replace with Redis.
+    All challenges share one TTL, so insertion order is also expiry order:
+    expired challenges are popped from the front of an OrderedDict in O(1), and when
+    ``max_items`` is reached the oldest challenge is evicted.
+
+    Note: per-process memory store. For multi-replica deployments, use
+    RedisCaptchaChallengeStore (state_backend="redis").
     """
 
-    def __init__(self, ttl_seconds: int, max_attempts: int = 5):
+    def __init__(
+        self, ttl_seconds: int, max_attempts: int = 5, max_items: int = 100_000
+    ):
         self._ttl_seconds = max(1, int(ttl_seconds))
         self._max_attempts = max(1, int(max_attempts))
-        self._items: dict[str, CaptchaChallenge] = {}
+        self._max_items = max(1, int(max_items))
+        self._items: OrderedDict[str, CaptchaChallenge] = OrderedDict()
         self._lock = asyncio.Lock()
+        self._expired_count = 0
+        self._evicted_count = 0
 
     @property
     def ttl_seconds(self) -> int:
@@ -40,11 +133,28 @@ class InMemoryCaptchaChallengeStore:
         return item.expires_at <= now or item.attempts >= self._max_attempts
 
     def _purge_expired(self, now: float) -> None:
-        if not self._items:
-            return
-        expired_ids = [cid for cid, item in self._items.items() if self._is_expired(item, now)]
-        for cid in expired_ids:
-            self._items.pop(cid, None)
+        while self._items:
+            cid = next(iter(self._items))
+            if self._items[cid].expires_at > now:
+                return
+            del self._items[cid]
+            self._expired_count += 1
+
+    def _evict_oldest(self) -> None:
+        while len(self._items) >= self._max_items:
+            self._items.popitem(last=False)
+            self._evicted_count += 1
+
+    def _drop(self, challenge_id: str) -> None:
+        if self._items.pop(challenge_id, None) is not None:
+            self._expired_count += 1
+
+    def stats(self) -> CaptchaChallengeStoreStats:
+        return CaptchaChallengeStoreStats(
+            live=len(self._items),
+            expired=self._expired_count,
+            evicted=self._evicted_count,
+        )
 
     async def create(
         self,
@@ -54,8 +164,8 @@ class InMemoryCaptchaChallengeStore:
     ) -> str:
         challenge_id = secrets.token_urlsafe(24)
         now = monotonic()
-        item = CaptchaChallenge(
-            response=response,
+        item = CaptchaChallenge.from_response(
+            response,
             request_ip=request_ip,
             origin=origin,
             expires_at=now + self._ttl_seconds,
@@ -63,6 +173,7 @@ class InMemoryCaptchaChallengeStore:
 
         async with self._lock:
             self._purge_expired(now)
+            self._evict_oldest()
             self._items[challenge_id] = item
 
         return challenge_id
@@ -74,7 +185,7 @@ class InMemoryCaptchaChallengeStore:
             if not item:
                 return None
             if self._is_expired(item, now):
-                self._items.pop(challenge_id, None)
+                self._drop(challenge_id)
                 return None
             return item
 
@@ -85,11 +196,11 @@ class InMemoryCaptchaChallengeStore:
             if not item:
                 return None
             if self._is_expired(item, now):
-                self._items.pop(challenge_id, None)
+                self._drop(challenge_id)
                 return None
             item.attempts += 1
             if self._is_expired(item, now):
-                self._items.pop(challenge_id, None)
+                self._drop(challenge_id)
             return item.attempts
 
     async def consume(self, challenge_id: str) -> CaptchaChallenge | None:
@@ -103,9 +214,16 @@ class InMemoryCaptchaChallengeStore:
             if not item:
                 return None
             if self._is_expired(item, now):
-                self._items.pop(challenge_id, None)
+                self._drop(challenge_id)
                 return None
             return self._items.pop(challenge_id, None)
 
 
-__all__ = ("CaptchaChallenge", "InMemoryCaptchaChallengeStore")
+__all__ = (
+    "CaptchaChallenge",
+    "CaptchaChallengeStore",
+    "CaptchaChallengeStoreStats",
+    "CaptchaChallengeStoreUnavailable",
+    "InMemoryCaptchaChallengeStore",
+    "hash_origin",
+)
@@ -0,0 +1,50 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from app.api.modules.fraud.schema import FraudCheckRequest
+
+
+@dataclass(frozen=True, slots=True)
+class UserAgentFacts:
+    """Facts parsed once from the payload User-Agent."""
+
+    lowered: str
+    normalized: str
+    is_mobile: bool
+    is_tablet: bool
+    is_android: bool
+    is_ios: bool
+    is_desktop_mac: bool
+    is_windows: bool
+    is_linux: bool
+    is_chromium: bool
+    platform_family: str | None
+    has_automation_marker: bool
+    has_bot_marker: bool
+    has_strong_bot_marker: bool
+
+
+@dataclass(frozen=True, slots=True)
+class EvaluationContext:
+    """Immutable per-request view shared by all check services.
+
+    Built once per request so normalization and parsing are not repeated by every
+    check. ``request_ip`` is expected to be normalized already.
+    """
+
+    payload: FraudCheckRequest
+    request_ip: str | None
+    client_reported_ip: str | None
+    headers: Mapping[str, str]
+    ua: UserAgentFacts
+    header_ua_normalized: str | None
+    navigator_platform: str
+    navigator_platform_family: str | None
+    client_hints_platform_family: str | None
+    language_base: str | None
+    language_bases: frozenset[str]
+    header_primary_language_base: str | None
+    header_language_bases: frozenset[str]
+
+
+__all__ = ("EvaluationContext", "UserAgentFacts")
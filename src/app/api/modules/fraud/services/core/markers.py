@@ -0,0 +1,99 @@
+import json
+import re
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+
+MARKERS_PATH = Path(__file__).with_name("markers.json")
+
+
+def load_marker_families(path: Path = MARKERS_PATH) -> dict[str, tuple[str, ...]]:
+    """Load ``{family: [marker, ...]}`` from a JSON data file, lower-cased."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return {
+        str(family): tuple(dict.fromkeys(str(item).lower() for item in markers if item))
+        for family, markers in data.items()
+    }
+
+
+def _trie_pattern(markers: Iterable[str]) -> str:
+    trie: dict = {}
+    for marker in markers:
+        node = trie
+        for char in marker:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        terminal = "" in node
+        branches = [
+            re.escape(char) + emit(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            # Optional and greedy: the longest marker starting here wins.
+            return ("(?:" + body + ")?") if len(branches) == 1 else body + "?"
+        return body
+
+    return emit(trie)
+
+
+class MarkerMatcher:
+    """Precompiled multi-pattern substring matcher.
+
+    The markers are compiled into one trie-shaped regular expression probed at every
+    position of the input, so each value is scanned once and matching cost follows
+    marker length rather than marker count. ``scan`` reports every family with at
+    least one marker occurring in the value.
+    """
+
+    def __init__(self, families: Mapping[str, Iterable[str]]):
+        owners: dict[str, set[str]] = {}
+        for family, markers in families.items():
+            for marker in markers:
+                if marker:
+                    owners.setdefault(marker, set()).add(family)
+
+        # The longest marker at a position hides shorter ones it contains,
+        # so each marker also reports the families of its sub-markers.
+        self._families: dict[str, frozenset[str]] = {
+            marker: frozenset(
+                family
+                for start in range(len(marker))
+                for end in range(start + 1, len(marker) + 1)
+                for family in owners.get(marker[start:end], ())
+            )
+            for marker in owners
+        }
+        self._pattern = (
+            re.compile("(?=(" + _trie_pattern(owners) + "))") if owners else None
+        )
+
+    def scan(self, value: str) -> frozenset[str]:
+        if not value or self._pattern is None:
+            return frozenset()
+        found: set[str] = set()
+        for match in self._pattern.finditer(value):
+            found |= self._families[match.group(1)]
+        return frozenset(found)
+
+
+MARKER_FAMILIES = load_marker_families()
+
+
+def marker_matcher(*families: str) -> MarkerMatcher:
+    return MarkerMatcher(
+        {family: MARKER_FAMILIES.get(family, ()) for family in families}
+    )
+
+
+__all__ = (
+    "MARKERS_PATH",
+    "MARKER_FAMILIES",
+    "MarkerMatcher",
+    "load_marker_families",
+    "marker_matcher",
+)
@@ -0,0 +1,226 @@
+import json
+import math
+import secrets
+from collections.abc import Iterator
+from contextlib import contextmanager
+from time import time
+from typing import TYPE_CHECKING, cast
+
+from app.api.modules.fraud.schema import FraudCheckResponse
+from app.api.modules.fraud.services.core.challenge_store import (
+    CaptchaChallenge,
+    CaptchaChallengeStoreUnavailable,
+)
+from app.api.modules.fraud.services.core.signals import signal_catalogue
+from app.services.redis import RedisConnection
+
+if TYPE_CHECKING:
+    from redis.commands.core import AsyncScript
+
+# KEYS[1] = challenge hash; ARGV[1] = max attempts.
+# Deletes the challenge once it runs out of attempts; returns nil if it is gone.
+_INCREMENT_ATTEMPTS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return false
+end
+local attempts = redis.call('HINCRBY', KEYS[1], 'a', 1)
+if attempts >= tonumber(ARGV[1]) then
+    redis.call('DEL', KEYS[1])
+end
+return attempts
+"""
+
+# KEYS[1] = spent token counter; ARGV = max attempts, token expiry (unix seconds).
+# Both return nil once the token has used up its attempts or been consumed.
+_ADD_TOKEN_ATTEMPT_SCRIPT = """
+if tonumber(redis.call('GET', KEYS[1]) or '0') >= tonumber(ARGV[1]) then
+    return false
+end
+local attempts = redis.call('INCR', KEYS[1])
+redis.call('EXPIREAT', KEYS[1], ARGV[2])
+return attempts
+"""
+_SPEND_TOKEN_SCRIPT = """
+if tonumber(redis.call('GET', KEYS[1]) or '0') >= tonumber(ARGV[1]) then
+    return false
+end
+redis.call('SET', KEYS[1], ARGV[1])
+redis.call('EXPIREAT', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+@contextmanager
+def _unavailable_on_redis_error() -> Iterator[None]:
+    """Raise Redis failures as ``CaptchaChallengeStoreUnavailable``."""
+    # redis is optional; it is installed whenever a Redis-backed store is in use.
+    from redis.exceptions import RedisError
+
+    try:
+        yield
+    except RedisError as exc:
+        raise CaptchaChallengeStoreUnavailable(str(exc)) from exc
+
+
+class RedisCaptchaChallengeStore:
+    """Captcha challenges shared by every replica through Redis.
+
+    Each challenge is a hash holding the compact challenge snapshot and an attempt
+    counter, written with a native key TTL so Redis expires it. Consuming reads and
+    deletes the key in one transaction, so a challenge can be consumed only once
+    across replicas. If Redis cannot be reached, every method raises
+    ``CaptchaChallengeStoreUnavailable``.
+    """
+
+    def __init__(
+        self,
+        connection: RedisConnection,
+        ttl_seconds: int,
+        max_attempts: int = 5,
+    ):
+        self._connection = connection
+        self._ttl_seconds = max(1, int(ttl_seconds))
+        self._max_attempts = max(1, int(max_attempts))
+        self._increment_script: AsyncScript | None = None
+
+    @property
+    def ttl_seconds(self) -> int:
+        return self._ttl_seconds
+
+    def _key(self, challenge_id: str) -> str:
+        return self._connection.key("challenge", challenge_id)
+
+    def _load(self, fields: dict[bytes, bytes]) -> CaptchaChallenge | None:
+        if not fields:
+            return None
+        attempts = int(fields.get(b"a", 0))
+        if attempts >= self._max_attempts:
+            return None
+        (
+            fingerprint_id,
+            risk_score,
+            country_iso,
+            codes,
+            request_ip,
+            origin,
+            expires_at,
+        ) = json.loads(fields[b"d"])
+        catalogue = signal_catalogue()
+        return CaptchaChallenge(
+            fingerprint_id=fingerprint_id,
+            risk_score=risk_score,
+            ip_country_iso=country_iso,
+            # Codes unknown to this replica's catalogue are dropped; the score stands.
+            signals=tuple(catalogue[code] for code in codes if code in catalogue),
+            request_ip=request_ip,
+            origin=origin,
+            expires_at=expires_at,
+            attempts=attempts,
+        )
+
+    async def create(
+        self,
+        response: FraudCheckResponse,
+        request_ip: str | None,
+        origin: str | None,
+    ) -> str:
+        challenge_id = secrets.token_urlsafe(24)
+        data = json.dumps(
+            [
+                response.fingerprint_id,
+                response.risk_score,
+                response.ip_country_iso,
+                [signal.code for signal in response.signals],
+                request_ip,
+                origin,
+                time() + self._ttl_seconds,
+            ],
+            separators=(",", ":"),
+        )
+
+        pipeline = self._connection.client.pipeline(transaction=True)
+        pipeline.hset(self._key(challenge_id), mapping={"d": data, "a": 0})
+        pipeline.expire(self._key(challenge_id), self._ttl_seconds)
+        with _unavailable_on_redis_error():
+            await pipeline.execute()
+        return challenge_id
+
+    async def get(self, challenge_id: str) -> CaptchaChallenge | None:
+        with _unavailable_on_redis_error():
+            fields = await self._connection.client.hgetall(self._key(challenge_id))
+        return self._load(cast(dict[bytes, bytes], fields))
+
+    async def increment_attempts(self, challenge_id: str) -> int | None:
+        if self._increment_script is None:
+            self._increment_script = self._connection.client.register_script(
+                _INCREMENT_ATTEMPTS_SCRIPT
+            )
+        with _unavailable_on_redis_error():
+            attempts = await self._increment_script(
+                keys=[self._key(challenge_id)],
+                args=[self._max_attempts],
+            )
+        return None if attempts is None else int(attempts)
+
+    async def consume(self, challenge_id: str) -> CaptchaChallenge | None:
+        """Remove and return an active challenge.
+
+        Used after successful captcha verification (single-use).
+        """
+        pipeline = self._connection.client.pipeline(transaction=True)
+        pipeline.hgetall(self._key(challenge_id))
+        pipeline.delete(self._key(challenge_id))
+        with _unavailable_on_redis_error():
+            fields, _ = await pipeline.execute()
+        return self._load(fields)
+
+
+class RedisReplayFilter:
+    """Replay filter for signed challenges shared by every replica through Redis.
+
+    Each verified token gets an attempt counter that expires with the token, and
+    the check-and-update runs as one script, so a token can be consumed only once
+    and ``max_attempts`` holds across replicas. If Redis cannot be reached, every
+    method raises ``CaptchaChallengeStoreUnavailable``.
+    """
+
+    def __init__(self, connection: RedisConnection):
+        self._connection = connection
+        self._add_attempt_script: AsyncScript | None = None
+        self._spend_script: AsyncScript | None = None
+
+    def _key(self, token_id: str) -> str:
+        return self._connection.key("spent", token_id)
+
+    async def attempts(self, token_id: str) -> int:
+        with _unavailable_on_redis_error():
+            return int(await self._connection.client.get(self._key(token_id)) or 0)
+
+    async def add_attempt(
+        self, token_id: str, expires_at: float, max_attempts: int
+    ) -> int | None:
+        if self._add_attempt_script is None:
+            self._add_attempt_script = self._connection.client.register_script(
+                _ADD_TOKEN_ATTEMPT_SCRIPT
+            )
+        with _unavailable_on_redis_error():
+            attempts = await self._add_attempt_script(
+                keys=[self._key(token_id)],
+                args=[max_attempts, math.ceil(expires_at)],
+            )
+        return None if attempts is None else int(attempts)
+
+    async def spend(self, token_id: str, expires_at: float, max_attempts: int) -> bool:
+        if self._spend_script is None:
+            self._spend_script = self._connection.client.register_script(
+                _SPEND_TOKEN_SCRIPT
+            )
+        with _unavailable_on_redis_error():
+            spent = await self._spend_script(
+                keys=[self._key(token_id)],
+                args=[max_attempts, math.ceil(expires_at)],
+            )
+        return spent is not None
+
+
+__all__ = ("RedisCaptchaChallengeStore", "RedisReplayFilter")
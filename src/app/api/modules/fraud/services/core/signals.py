@@ -0,0 +1,56 @@
+from collections.abc import Mapping
+from functools import cache
+from importlib import import_module
+
+from app.api.modules.fraud.schema import FraudSignal
+from app.api.modules.fraud.services.core.utils import create_signal
+
+SIGNAL_CATALOGUE: dict[str, FraudSignal] = {}
+
+# Every module that calls ``define_signal`` at import time. Challenge stores
+# encode signals by code, so the full catalogue must not depend on which of
+# these modules happen to have been imported already.
+SIGNAL_MODULES = (
+    "app.api.modules.fraud.services.automation.automation",
+    "app.api.modules.fraud.services.context.behavior",
+    "app.api.modules.fraud.services.context.device",
+    "app.api.modules.fraud.services.context.geo",
+    "app.api.modules.fraud.services.context.ip",
+    "app.api.modules.fraud.services.context.locale",
+    "app.api.modules.fraud.services.network.headers",
+    "app.api.modules.fraud.services.network.rate_limit",
+    "app.api.modules.fraud.services.platform.system",
+    "app.api.modules.fraud.services.platform.timestamp",
+)
+
+
+def define_signal(code: str, weight: int, message: str) -> FraudSignal:
+    """Build an immutable signal once and register it in the catalogue by code.
+
+    Check services define their signals at import time and append the shared
+    instances on every hit instead of constructing and validating new models.
+    """
+    existing = SIGNAL_CATALOGUE.get(code)
+    if existing is not None:
+        if existing.weight != weight or existing.message != message:
+            raise ValueError(f"Signal {code!r} is already defined differently")
+        return existing
+
+    signal = create_signal(code=code, weight=weight, message=message)
+    SIGNAL_CATALOGUE[code] = signal
+    return signal
+
+
+@cache
+def _import_signal_modules() -> None:
+    for module in SIGNAL_MODULES:
+        import_module(module)
+
+
+def signal_catalogue() -> Mapping[str, FraudSignal]:
+    """Return every defined signal by code, importing ``SIGNAL_MODULES`` first."""
+    _import_signal_modules()
+    return SIGNAL_CATALOGUE
+
+
+__all__ = ("SIGNAL_CATALOGUE", "SIGNAL_MODULES", "define_signal", "signal_catalogue")
@@ -0,0 +1,263 @@
+import hmac
+import json
+import logging
+import secrets
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from hashlib import sha256
+from heapq import heappop, heappush
+from time import time
+from typing import Protocol
+
+from app.api.modules.fraud.schema import FraudCheckResponse
+from app.api.modules.fraud.services.core.challenge_store import (
+    CaptchaChallenge,
+    hash_origin,
+)
+from app.api.modules.fraud.services.core.signals import signal_catalogue
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_VERSION = 1
+_SIGNATURE_BYTES = 16
+
+
+def _b64encode(value: bytes) -> str:
+    return urlsafe_b64encode(value).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(value: str) -> bytes:
+    return urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+class ReplayFilter(Protocol):
+    """Attempt counts of signed challenge tokens, kept until the tokens expire."""
+
+    async def attempts(self, token_id: str) -> int: ...
+
+    async def add_attempt(
+        self, token_id: str, expires_at: float, max_attempts: int
+    ) -> int | None: ...
+
+    async def spend(
+        self, token_id: str, expires_at: float, max_attempts: int
+    ) -> bool: ...
+
+
+class InMemoryReplayFilter:
+    """Per-process replay filter; entries leave it only once their token expires.
+
+    Tokens are spent in any order but expire in token order, so expiry times are
+    kept in a heap and expired entries are popped from its top. Live entries are
+    never evicted, since that would make their tokens usable again: when
+    ``max_entries`` live tokens are tracked, new tokens are refused until some expire.
+    """
+
+    def __init__(self, max_entries: int = 100_000):
+        self._max_entries = max(1, int(max_entries))
+        self._attempts: dict[str, int] = {}
+        self._expiry: list[tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._attempts)
+
+    def _purge_expired(self, now: float) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            _, token_id = heappop(self._expiry)
+            del self._attempts[token_id]
+
+    def _track(self, token_id: str, expires_at: float) -> bool:
+        if token_id in self._attempts:
+            return True
+        self._purge_expired(time())
+        if len(self._attempts) >= self._max_entries:
+            logger.warning(
+                "Signed challenge replay filter is full; refusing new tokens"
+            )
+            return False
+        self._attempts[token_id] = 0
+        heappush(self._expiry, (expires_at, token_id))
+        return True
+
+    async def attempts(self, token_id: str) -> int:
+        return self._attempts.get(token_id, 0)
+
+    async def add_attempt(
+        self, token_id: str, expires_at: float, max_attempts: int
+    ) -> int | None:
+        if self._attempts.get(token_id, 0) >= max_attempts:
+            return None
+        if not self._track(token_id, expires_at):
+            return None
+        self._attempts[token_id] += 1
+        return self._attempts[token_id]
+
+    async def spend(self, token_id: str, expires_at: float, max_attempts: int) -> bool:
+        if self._attempts.get(token_id, 0) >= max_attempts:
+            return False
+        if not self._track(token_id, expires_at):
+            return False
+        self._attempts[token_id] = max_attempts
+        return True
+
+
+class SignedCaptchaChallengeStore:
+    """Stateless captcha challenges carried in an HMAC-signed, expiring token.
+
+    The challenge_id itself encodes the fingerprint, score, IP country, signal codes,
+    request IP and a digest of the origin, so any replica sharing the secret can
+    verify it and memory does not grow with pending challenges. Signals are encoded,
+    in order, as small integer positions in the sorted signal catalogue, tagged with
+    a digest of that catalogue so tokens minted by a replica with a different
+    catalogue are rejected. Every field has a bounded size, so tokens always fit
+    ``CaptchaVerifyRequest.challenge_id``.
+
+    Only the attempts on tokens that were verified are remembered, in
+    ``replay_filter``. The default ``InMemoryReplayFilter`` is per process, so
+    single use and ``max_attempts`` then hold per replica; a shared filter such as
+    ``RedisReplayFilter`` enforces them across replicas.
+    """
+
+    def __init__(
+        self,
+        secret: str,
+        ttl_seconds: int,
+        max_attempts: int = 5,
+        replay_filter: ReplayFilter | None = None,
+    ):
+        self._key = secret.encode("utf-8")
+        self._ttl_seconds = max(1, int(ttl_seconds))
+        self._max_attempts = max(1, int(max_attempts))
+        self._replay_filter = replay_filter or InMemoryReplayFilter()
+        self._codes: tuple[str, ...] = ()
+        self._positions: dict[str, int] = {}
+        self._catalogue_tag = ""
+
+    @property
+    def ttl_seconds(self) -> int:
+        return self._ttl_seconds
+
+    def _catalogue(self) -> tuple[tuple[str, ...], str]:
+        catalogue = signal_catalogue()
+        if len(self._codes) != len(catalogue):
+            self._codes = tuple(sorted(catalogue))
+            self._positions = {
+                code: position for position, code in enumerate(self._codes)
+            }
+            digest = sha256(",".join(self._codes).encode("utf-8")).digest()
+            self._catalogue_tag = _b64encode(digest[:6])
+        return self._codes, self._catalogue_tag
+
+    def _sign(self, body: bytes) -> bytes:
+        return hmac.new(self._key, body, sha256).digest()[:_SIGNATURE_BYTES]
+
+    def _encode(self, claims: list[object]) -> str:
+        body = json.dumps(claims, separators=(",", ":")).encode("utf-8")
+        return f"{_b64encode(body)}.{_b64encode(self._sign(body))}"
+
+    def _decode(
+        self,
+        challenge_id: str,
+        now: float,
+    ) -> tuple[CaptchaChallenge, str] | None:
+        """Verify the signature and expiry; attempts are left at zero."""
+        body_part, _, signature_part = challenge_id.partition(".")
+        try:
+            body = _b64decode(body_part)
+            signature = _b64decode(signature_part)
+        except ValueError:
+            return None
+        if not hmac.compare_digest(signature, self._sign(body)):
+            return None
+
+        try:
+            (
+                version,
+                token_id,
+                expires_at,
+                fingerprint_id,
+                risk_score,
+                country_iso,
+                catalogue_tag,
+                signal_positions,
+                request_ip,
+                origin_digest,
+            ) = json.loads(body)
+        except ValueError:
+            return None
+
+        codes, expected_tag = self._catalogue()
+        if (
+            version != _TOKEN_VERSION
+            or catalogue_tag != expected_tag
+            or expires_at <= now
+        ):
+            return None
+
+        catalogue = signal_catalogue()
+        return CaptchaChallenge(
+            fingerprint_id=fingerprint_id,
+            risk_score=risk_score,
+            ip_country_iso=country_iso,
+            signals=tuple(catalogue[codes[position]] for position in signal_positions),
+            request_ip=request_ip,
+            origin=None,
+            expires_at=expires_at,
+            origin_digest=origin_digest,
+        ), token_id
+
+    async def create(
+        self,
+        response: FraudCheckResponse,
+        request_ip: str | None,
+        origin: str | None,
+    ) -> str:
+        _, catalogue_tag = self._catalogue()
+
+        return self._encode(
+            [
+                _TOKEN_VERSION,
+                _b64encode(secrets.token_bytes(9)),
+                int(time()) + self._ttl_seconds,
+                response.fingerprint_id,
+                response.risk_score,
+                response.ip_country_iso,
+                catalogue_tag,
+                [self._positions[signal.code] for signal in response.signals],
+                request_ip,
+                hash_origin(origin) if origin else None,
+            ]
+        )
+
+    async def get(self, challenge_id: str) -> CaptchaChallenge | None:
+        decoded = self._decode(challenge_id, time())
+        if decoded is None:
+            return None
+        challenge, token_id = decoded
+        challenge.attempts = await self._replay_filter.attempts(token_id)
+        if challenge.attempts >= self._max_attempts:
+            return None
+        return challenge
+
+    async def increment_attempts(self, challenge_id: str) -> int | None:
+        decoded = self._decode(challenge_id, time())
+        if decoded is None:
+            return None
+        challenge, token_id = decoded
+        return await self._replay_filter.add_attempt(
+            token_id, challenge.expires_at, self._max_attempts
+        )
+
+    async def consume(self, challenge_id: str) -> CaptchaChallenge | None:
+        """Verify a token and mark it spent so it cannot be used again."""
+        decoded = self._decode(challenge_id, time())
+        if decoded is None:
+            return None
+        challenge, token_id = decoded
+        if not await self._replay_filter.spend(
+            token_id, challenge.expires_at, self._max_attempts
+        ):
+            return None
+        return challenge
+
+
+__all__ = ("InMemoryReplayFilter", "ReplayFilter", "SignedCaptchaChallengeStore")
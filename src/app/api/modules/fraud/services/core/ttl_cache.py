@@ -0,0 +1,152 @@
+import sys
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from time import monotonic
+
+# Measured per-entry cost of the OrderedDict slot and link plus the entry tuple.
+_ENTRY_OVERHEAD_BYTES = 210
+# Expired entries inspected per write; keeps expiry incremental instead of full scans.
+_PURGE_BATCH = 4
+
+
+@dataclass(slots=True)
+class CacheStats:
+    size: int
+    approx_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+
+
+def approximate_size(key: object, value: object) -> int:
+    """Shallow size of a cache entry: key, value object and bookkeeping overhead."""
+    return sys.getsizeof(key) + sys.getsizeof(value) + _ENTRY_OVERHEAD_BYTES
+
+
+class TtlLruCache[K, V]:
+    """Bounded LRU cache with lazy per-entry TTL expiry; every operation is O(1).
+
+    Entries live in an OrderedDict kept in least-to-most recently used order: a hit
+    moves the entry to the end, and eviction pops from the front. Unlike a plain
+    dict, popping the front never has to skip deleted slots. Expired entries are
+    dropped when read, and a few stale entries at the front are dropped on each
+    write, so expiry never scans the whole cache.
+
+    ``max_size`` caps the entry count, and ``max_bytes``, when set, caps the
+    approximate memory footprint as measured by ``approximate_size``.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        max_bytes: int | None = None,
+    ):
+        self._max_size = max(1, int(max_size))
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[K, tuple[float, V, int]] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get[D](self, key: K, default: D = None) -> V | D:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return default
+        if entry[0] <= monotonic():
+            del self._entries[key]
+            self._bytes -= entry[2]
+            self._expirations += 1
+            self._misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry[1]
+
+    def get_first[D](self, keys: Iterable[K], default: D = None) -> V | D:
+        """Value of the first live key in ``keys``; counts as one hit or one miss."""
+        now = monotonic()
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            if entry[0] <= now:
+                del self._entries[key]
+                self._bytes -= entry[2]
+                self._expirations += 1
+                continue
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+        self._misses += 1
+        return default
+
+    def set(self, key: K, value: V, ttl_seconds: float | None = None) -> None:
+        now = monotonic()
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous[2]
+
+        size = approximate_size(key, value)
+        ttl = self._ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (now + ttl, value, size)
+        self._bytes += size
+
+        self._purge_expired(now)
+        while len(self._entries) > self._max_size or (
+            self._max_bytes is not None and self._bytes > self._max_bytes
+        ):
+            self._drop_oldest(now)
+
+    def _drop_oldest(self, now: float) -> None:
+        _, (expires_at, _, size) = self._entries.popitem(last=False)
+        self._bytes -= size
+        if expires_at <= now:
+            self._expirations += 1
+        else:
+            self._evictions += 1
+
+    def _purge_expired(self, now: float) -> None:
+        for _ in range(_PURGE_BATCH):
+            key = next(iter(self._entries), None)
+            if key is None or self._entries[key][0] > now:
+                return
+            self._drop_oldest(now)
+
+    def snapshot(self) -> list[tuple[K, V, float]]:
+        """Live entries as ``(key, value, remaining_ttl_seconds)``, least recently used first.
+
+        Re-inserting them in this order with ``set`` restores the LRU order.
+        """
+        now = monotonic()
+        return [
+            (key, value, expires_at - now)
+            for key, (expires_at, value, _) in self._entries.items()
+            if expires_at > now
+        ]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            size=len(self._entries),
+            approx_bytes=self._bytes,
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            expirations=self._expirations,
+        )
+
+
+__all__ = ("CacheStats", "TtlLruCache", "approximate_size")
@@ -1,3 +1,4 @@
+from app.api.modules.fraud.services.network.circuit_breaker import CircuitBreaker
 from app.api.modules.fraud.services.network.client import IpGeoClient, IpGeoResult
 from app.api.modules.fraud.services.network.common import (
     RequestIpResolver,
@@ -5,20 +6,43 @@ from app.api.modules.fraud.services.network.common import (
     normalize_ip,
     normalize_text,
 )
-from app.api.modules.fraud.services.network.rate_limit import InMemoryIpRateLimiter
+from app.api.modules.fraud.services.network.geo_database import IpGeoDatabase
+from app.api.modules.fraud.services.network.geo_snapshot import (
+    persist_geo_cache,
+    persist_geo_cache_periodically,
+    restore_geo_cache,
+)
+from app.api.modules.fraud.services.network.hosting_ranges import HostingRangeIndex
+from app.api.modules.fraud.services.network.http_pool import build_http_client
+from app.api.modules.fraud.services.network.rate_limit import (
+    RATE_LIMIT_EXCEEDED,
+    InMemoryIpRateLimiter,
+    IpRateLimiter,
+)
 from app.api.modules.fraud.services.network.turnstile import (
+    TurnstileStats,
     TurnstileVerificationResult,
     TurnstileVerifierService,
 )
 
 __all__ = (
+    "RATE_LIMIT_EXCEEDED",
+    "CircuitBreaker",
+    "HostingRangeIndex",
     "InMemoryIpRateLimiter",
     "IpGeoClient",
+    "IpGeoDatabase",
     "IpGeoResult",
+    "IpRateLimiter",
     "RequestIpResolver",
+    "TurnstileStats",
     "TurnstileVerificationResult",
     "TurnstileVerifierService",
+    "build_http_client",
     "normalize_headers",
     "normalize_ip",
     "normalize_text",
+    "persist_geo_cache",
+    "persist_geo_cache_periodically",
+    "restore_geo_cache",
 )
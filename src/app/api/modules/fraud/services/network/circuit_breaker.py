@@ -0,0 +1,83 @@
+import logging
+from time import monotonic
+from typing import Literal
+
+logger = logging.getLogger(__name__)
+
+CircuitState = Literal["closed", "open", "half_open"]
+# What ``allow_request`` grants: an ordinary call, or the single half-open probe.
+CallPermit = Literal["call", "probe"]
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one upstream dependency.
+
+    While closed, every call is allowed. ``failure_threshold`` consecutive failures
+    open the circuit, and calls then fail fast for ``reset_timeout_seconds``. After
+    that the circuit is half-open: one probe call is allowed, and its outcome closes
+    the circuit or re-opens it for another timeout. A probe turned away before it
+    reaches the upstream should call ``release_probe`` so the next caller can probe;
+    one that never reports back (e.g. cancelled) only blocks further probes until
+    the next timeout elapses.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout_seconds: float,
+    ):
+        self._name = name
+        self._failure_threshold = max(1, int(failure_threshold))
+        self._reset_timeout_seconds = max(0.0, float(reset_timeout_seconds))
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> CircuitState:
+        if self._opened_at is None:
+            return "closed"
+        if (
+            self._probing
+            or monotonic() - self._opened_at >= self._reset_timeout_seconds
+        ):
+            return "half_open"
+        return "open"
+
+    def allow_request(self) -> CallPermit | None:
+        """Permit for one call, or None to fail fast while the circuit is open."""
+        if self._opened_at is None:
+            return "call"
+        now = monotonic()
+        if now - self._opened_at < self._reset_timeout_seconds:
+            return None
+        # Re-arm the timeout so only this caller probes the upstream.
+        self._opened_at = now
+        self._probing = True
+        return "probe"
+
+    def release_probe(self) -> None:
+        """Give up a probe that never reached the upstream; the next caller probes."""
+        if self._probing:
+            self._opened_at = monotonic() - self._reset_timeout_seconds
+            self._probing = False
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info("Circuit closed", extra={"upstream": self._name})
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._probing or (
+            self._opened_at is None and self._failures >= self._failure_threshold
+        ):
+            logger.warning("Circuit opened", extra={"upstream": self._name})
+            self._opened_at = monotonic()
+            self._probing = False
+
+
+__all__ = ("CallPermit", "CircuitBreaker", "CircuitState")
@@ -1,32 +1,46 @@
+import asyncio
+import enum
+import ipaddress
 import logging
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
-from time import monotonic
+from typing import TYPE_CHECKING
 
 import httpx
 
+from app.api.modules.fraud.services.core.markers import marker_matcher
+from app.api.modules.fraud.services.core.ttl_cache import CacheStats, TtlLruCache
+from app.api.modules.fraud.services.network.circuit_breaker import CircuitBreaker
+from app.api.modules.fraud.services.network.common import ip_to_int
+from app.api.modules.fraud.services.network.http_pool import (
+    request_with_reconnect,
+    warm_up_connections,
+)
 from app.settings import Config
 
+if TYPE_CHECKING:
+    from app.api.modules.fraud.services.network.geo_database import IpGeoDatabase
+
 logger = logging.getLogger(__name__)
 
+_HOSTING_MARKER_MATCHER = marker_matcher("hosting")
+_ADDRESS_BITS = {4: 32, 6: 128}
+
+
+class _Missing(enum.Enum):
+    """Cache-miss sentinel; an enum member so the type checker can narrow it away."""
+
+    MISSING = enum.auto()
+
 
 def looks_like_hosting_provider(org: str) -> bool:
     if not org:
         return False
 
-    marker = org.lower()
-    signatures = (
-        "hosting",
-        "data center",
-        "datacenter",
-        "cloud",
-        "colo",
-        "vpn",
-        "proxy",
-    )
-    return any(item in marker for item in signatures)
+    return bool(_HOSTING_MARKER_MATCHER.scan(org.lower()))
 
 
-def _parse_float(value: object) -> float | None:
+def parse_float(value: object) -> float | None:
     try:
         return float(value)  # type: ignore[arg-type]
     except (TypeError, ValueError):
@@ -50,6 +64,45 @@ def parse_utc_offset_minutes(value: object) -> int | None:
     return sign * (hours * 60 + minutes)
 
 
+def _pack_cache_key(version: int, value: int, prefix_length: int) -> int:
+    """Pack a network into one int: its prefix bits, the prefix length and the version."""
+    host_bits = _ADDRESS_BITS[version] - prefix_length
+    return ((value >> host_bits) << 8 | prefix_length) << 1 | (version == 6)
+
+
+def _format_cache_key(key: int) -> str:
+    version = 6 if key & 1 else 4
+    prefix_length = key >> 1 & 0xFF
+    bits = _ADDRESS_BITS[version]
+    network_type = ipaddress.IPv6Network if version == 6 else ipaddress.IPv4Network
+    network = network_type(((key >> 9) << (bits - prefix_length), prefix_length))
+    return str(network.network_address) if prefix_length == bits else str(network)
+
+
+def _parse_cache_key(text: str) -> int:
+    address, _, prefix = text.partition("/")
+    version, value = ip_to_int(address)
+    prefix_length = int(prefix) if prefix else _ADDRESS_BITS[version]
+    if not 0 <= prefix_length <= _ADDRESS_BITS[version]:
+        raise ValueError(f"invalid prefix length in {text!r}")
+    return _pack_cache_key(version, value, prefix_length)
+
+
+def _is_more_specific(data: dict[str, object], cache_key: int) -> bool:
+    """Whether the provider placed the IP in a network narrower than the cache prefix.
+
+    Such a result is precise for that IP and must not be shared across the prefix.
+    """
+    network = data.get("network")
+    if not isinstance(network, str):
+        return False
+    try:
+        prefix_length = ipaddress.ip_network(network, strict=False).prefixlen
+    except ValueError:
+        return False
+    return prefix_length > cache_key >> 1 & 0xFF
+
+
 @dataclass(slots=True)
 class IpGeoResult:
     country_iso: str | None
@@ -60,45 +113,245 @@ class IpGeoResult:
     longitude: float | None
 
 
-_GEO_CACHE_MAX_SIZE = 4096
+def format_cache_entries(
+    entries: Iterable[tuple[int, IpGeoResult | None, float]],
+) -> Iterator[tuple[str, IpGeoResult | None, float]]:
+    """Turn ``cache_snapshot`` entries into ``(ip_or_network, result, remaining)``."""
+    for key, result, remaining in entries:
+        yield _format_cache_key(key), result, remaining
 
 
 class IpGeoClient:
-    def __init__(self, client: httpx.AsyncClient, config: Config):
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        config: Config,
+        database: "IpGeoDatabase | None" = None,
+    ):
         self._enabled = config.fraud.ip_geolocation_enabled
         self._client = client
+        # When set, lookups are answered locally and never reach the HTTP provider.
+        self._database = database
         self._base_url = config.fraud.ip_geolocation_base_url.rstrip("/")
         self._timeout = config.fraud.ip_geolocation_timeout_seconds
+        self._prewarm_connections = config.fraud.ip_geolocation_http.prewarm_connections
         self._cache_ttl_seconds = config.fraud.ip_geolocation_cache_ttl_seconds
-        self._cache: dict[str, tuple[float, IpGeoResult]] = {}
+        self._negative_cache_ttl_seconds = (
+            config.fraud.ip_geolocation_negative_cache_ttl_seconds
+        )
+        # "prefix" shares one entry per network (e.g. a carrier's rotating /24 or /48).
+        self._prefix_keys = config.fraud.ip_geolocation_cache_key == "prefix"
+        self._prefix_lengths = {
+            4: min(max(config.fraud.ip_geolocation_cache_ipv4_prefix, 0), 32),
+            6: min(max(config.fraud.ip_geolocation_cache_ipv6_prefix, 0), 128),
+        }
+        # Keyed by packed network ints; failed lookups are cached as None for the
+        # shorter negative TTL.
+        self._cache: TtlLruCache[int, IpGeoResult | None] = TtlLruCache(
+            max_size=config.fraud.ip_geolocation_cache_max_size,
+            ttl_seconds=self._cache_ttl_seconds,
+            max_bytes=config.fraud.ip_geolocation_cache_max_bytes,
+        )
+        # One shared lookup per cache key while it is in flight; concurrent callers
+        # await it. Each task returns its result and the cache key it applies to.
+        self._in_flight: dict[int, asyncio.Task[tuple[IpGeoResult | None, int]]] = {}
+        self._semaphore = asyncio.Semaphore(
+            max(1, config.fraud.ip_geolocation_max_concurrency)
+        )
+        self._breaker = CircuitBreaker(
+            name="ip_geolocation",
+            failure_threshold=config.fraud.ip_geolocation_circuit_failure_threshold,
+            reset_timeout_seconds=config.fraud.ip_geolocation_circuit_reset_seconds,
+        )
 
     async def resolve(self, ip: str) -> IpGeoResult | None:
         if not self._enabled:
             return None
 
-        now = monotonic()
+        if self._database is not None:
+            self._database.reload_if_changed()
+            return self._database.lookup(ip)
+
+        keys = self._cache_keys(ip)
+        if keys is None:
+            return None
+        if len(keys) == 1:
+            cached = self._cache.get(keys[0], _Missing.MISSING)
+        else:
+            cached = self._cache.get_first(keys, _Missing.MISSING)
+        if cached is not _Missing.MISSING:
+            return cached
+
+        # In prefix mode, IPs of one network share the lookup as they share the entry.
+        result, result_key = await self._coalesced_fetch(ip, keys, keys[-1])
+        if result_key not in keys:
+            # Another IP's lookup placed it in a network narrower than the prefix (or
+            # failed), so its answer is not ours: look this IP up on its own.
+            result, _ = await self._coalesced_fetch(ip, keys, keys[0])
+        return result
+
+    async def _coalesced_fetch(
+        self,
+        ip: str,
+        keys: tuple[int, ...],
+        flight_key: int,
+    ) -> tuple[IpGeoResult | None, int]:
+        task = self._in_flight.get(flight_key)
+        if task is None:
+            # Eager, so the upstream request is underway before control returns to
+            # a caller that overlaps the lookup with other work (see start_lookup).
+            task = asyncio.Task(
+                self._fetch(ip, keys),
+                loop=asyncio.get_running_loop(),
+                eager_start=True,
+            )
+            self._in_flight[flight_key] = task
+            task.add_done_callback(lambda done: self._finish_lookup(flight_key, done))
+        # A cancelled caller must not cancel the lookup other callers are awaiting.
+        return await asyncio.shield(task)
+
+    async def warm_up(self) -> None:
+        """Connect to the HTTP provider before the first lookup needs it."""
+        if not self._enabled or self._database is not None:
+            return
+        await warm_up_connections(
+            self._client, self._base_url, self._prewarm_connections
+        )
+
+    def _cache_keys(self, ip: str) -> tuple[int, ...] | None:
+        """Cache keys to try for ``ip``, most specific first; None if it is not an IP."""
+        try:
+            version, value = ip_to_int(ip)
+        except (OSError, ValueError):
+            return None
+        exact_key = _pack_cache_key(version, value, _ADDRESS_BITS[version])
+        if not self._prefix_keys:
+            return (exact_key,)
+        return exact_key, _pack_cache_key(version, value, self._prefix_lengths[version])
+
+    def cache_stats(self) -> CacheStats:
+        return self._cache.stats()
+
+    def cache_snapshot(self) -> list[tuple[int, IpGeoResult | None, float]]:
+        """Cached lookups as ``(packed_key, result, remaining_ttl_seconds)``, oldest first.
+
+        This only copies the entries; ``format_cache_entries`` turns the keys into
+        text and can run off the event loop.
+        """
+        return self._cache.snapshot()
+
+    def restore_cache(
+        self,
+        entries: Iterable[tuple[str, IpGeoResult | None, float]],
+    ) -> int:
+        """Insert snapshot entries, capping their TTLs at the configured ones."""
+        restored = 0
+        for text, result, remaining in entries:
+            try:
+                key = _parse_cache_key(text)
+            except (OSError, ValueError):
+                continue
+            max_ttl = (
+                self._cache_ttl_seconds
+                if result is not None
+                else self._negative_cache_ttl_seconds
+            )
+            ttl = min(remaining, max_ttl)
+            if ttl > 0:
+                self._cache.set(key, result, ttl_seconds=ttl)
+                restored += 1
+        return restored
+
+    def _finish_lookup(
+        self,
+        flight_key: int,
+        task: asyncio.Task[tuple[IpGeoResult | None, int]],
+    ) -> None:
+        if self._in_flight.get(flight_key) is task:
+            del self._in_flight[flight_key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller was cancelled.
+            task.exception()
+
+    async def _fetch(
+        self,
+        ip: str,
+        keys: tuple[int, ...],
+    ) -> tuple[IpGeoResult | None, int]:
+        """Look ``ip`` up; returns the result and the cache key it applies to."""
+        exact_key, cache_key = keys[0], keys[-1]
+        # Fail fast while the provider is known to be down.
+        permit = self._breaker.allow_request()
+        if permit is None:
+            return None, exact_key
+
+        # One deadline covers both waiting for a slot and the request itself.
+        deadline = asyncio.get_running_loop().time() + self._timeout
+        try:
+            async with asyncio.timeout_at(deadline):
+                await self._semaphore.acquire()
+        except TimeoutError:
+            if permit == "probe":
+                self._breaker.release_probe()
+            logger.warning("IP geolocation concurrency limit reached", extra={"ip": ip})
+            return None, exact_key
+        # The circuit may have opened while this lookup was queued. Until it closes
+        # again, only the half-open probe may reach the provider.
+        if permit != "probe" and self._breaker.state != "closed":
+            self._semaphore.release()
+            return None, exact_key
+
+        try:
+            data = await self._request(ip, deadline)
+        finally:
+            self._semaphore.release()
+
+        if data is None:
+            if self._negative_cache_ttl_seconds > 0:
+                self._cache.set(
+                    exact_key, None, ttl_seconds=self._negative_cache_ttl_seconds
+                )
+            return None, exact_key
+
+        result = self._parse(data)
+        if cache_key != exact_key and _is_more_specific(data, cache_key):
+            cache_key = exact_key
         if self._cache_ttl_seconds > 0:
-            cached = self._cache.get(ip)
-            if cached and cached[0] > now:
-                return cached[1]
+            self._cache.set(cache_key, result)
+        return result, cache_key
 
+    async def _request(self, ip: str, deadline: float) -> dict[str, object] | None:
+        """Fetch the provider's JSON for ``ip``, feeding the outcome to the breaker."""
         url = f"{self._base_url}/{ip}/json/"
         try:
-            response = await self._client.get(
-                url,
-                timeout=self._timeout,
-                follow_redirects=True,
-            )
+            # The client's timeouts are per phase; the deadline bounds the whole call.
+            async with asyncio.timeout_at(deadline):
+                response = await request_with_reconnect(
+                    self._client, "GET", url, follow_redirects=True
+                )
             response.raise_for_status()
+            data = response.json()
         except Exception as exc:  # noqa: BLE001
+            # Client errors other than 429 are about the IP, not the provider's health.
+            status_code = (
+                exc.response.status_code
+                if isinstance(exc, httpx.HTTPStatusError)
+                else None
+            )
+            if status_code is None or status_code >= 500 or status_code == 429:
+                self._breaker.record_failure()
+            else:
+                self._breaker.record_success()
             logger.warning("Failed to resolve IP geolocation", extra={"ip": ip})
             logger.debug("IP geolocation lookup failed: %s", exc)
             return None
 
-        data = response.json()
-        if data.get("error"):
+        self._breaker.record_success()
+        if not isinstance(data, dict) or data.get("error"):
             return None
+        return data
 
+    def _parse(self, data: dict[str, object]) -> IpGeoResult:
         country_iso = data.get("country_code")
         if isinstance(country_iso, str):
             country_iso = country_iso.upper()
@@ -113,10 +366,10 @@ class IpGeoClient:
             timezone = None
 
         utc_offset_minutes = parse_utc_offset_minutes(data.get("utc_offset"))
-        latitude = _parse_float(data.get("latitude"))
-        longitude = _parse_float(data.get("longitude"))
+        latitude = parse_float(data.get("latitude"))
+        longitude = parse_float(data.get("longitude"))
 
-        result = IpGeoResult(
+        return IpGeoResult(
             country_iso=country_iso,
             is_hosting=is_hosting,
             timezone=timezone,
@@ -125,18 +378,23 @@ class IpGeoClient:
             longitude=longitude,
         )
 
-        if self._cache_ttl_seconds > 0:
-            if len(self._cache) >= _GEO_CACHE_MAX_SIZE:
-                cutoff = now
-                stale = [k for k, (exp, _) in self._cache.items() if exp <= cutoff]
-                for k in stale:
-                    del self._cache[k]
-                if len(self._cache) >= _GEO_CACHE_MAX_SIZE:
-                    oldest = min(self._cache, key=lambda k: self._cache[k][0])
-                    del self._cache[oldest]
-            self._cache[ip] = (now + self._cache_ttl_seconds, result)
+    async def resolve_many(
+        self,
+        ips: Iterable[str | None],
+    ) -> dict[str, IpGeoResult | None]:
+        """Resolve a batch of IPs, issuing one lookup per distinct address."""
+        unique_ips = list(dict.fromkeys(ip for ip in ips if ip))
+        if not self._enabled or not unique_ips:
+            return dict.fromkeys(unique_ips)
 
-        return result
+        results = await asyncio.gather(
+            *(self.resolve(ip) for ip in unique_ips),
+            return_exceptions=True,
+        )
+        return {
+            ip: None if isinstance(result, BaseException) else result
+            for ip, result in zip(unique_ips, results, strict=True)
+        }
 
 
 __all__ = ("IpGeoClient", "IpGeoResult")
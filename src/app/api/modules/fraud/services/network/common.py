@@ -1,3 +1,4 @@
+import socket
 from collections.abc import Mapping
 from ipaddress import ip_address
 
@@ -5,6 +6,18 @@ from fastapi import Request
 
 from app.settings import Config
 
+_IPV4_MAPPED_PREFIX = 0xFFFF << 32
+
+
+def ip_to_int(ip: str) -> tuple[int, int]:
+    """Return ``(version, value)``; IPv4-mapped IPv6 addresses are returned as IPv4."""
+    if ":" in ip:
+        value = int.from_bytes(socket.inet_pton(socket.AF_INET6, ip))
+        if value >> 32 == 0xFFFF:
+            return 4, value - _IPV4_MAPPED_PREFIX
+        return 6, value
+    return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, ip))
+
 
 def normalize_headers(headers: Mapping[str, str] | None) -> dict[str, str]:
     if not headers:
@@ -47,6 +60,7 @@ class RequestIpResolver:
 
 __all__ = (
     "RequestIpResolver",
+    "ip_to_int",
     "normalize_headers",
     "normalize_ip",
     "normalize_text",
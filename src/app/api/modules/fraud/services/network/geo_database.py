@@ -0,0 +1,305 @@
+import csv
+import ipaddress
+import logging
+from array import array
+from bisect import bisect_right
+from collections.abc import Callable
+from pathlib import Path
+
+from app.api.modules.fraud.services.network.client import (
+    IpGeoResult,
+    looks_like_hosting_provider,
+    parse_float,
+    parse_utc_offset_minutes,
+)
+from app.api.modules.fraud.services.network.common import ip_to_int
+from app.api.modules.fraud.services.network.ip_ranges import (
+    LOW_64,
+    ReloadingIndex,
+    file_signature,
+    find_v6_range,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _GeoTables:
+    """Sorted, non-overlapping IP ranges as parallel integer arrays.
+
+    IPv4 bounds are 32-bit; IPv6 bounds are split into high and low 64-bit halves.
+    Each range points into ``records``, which holds one shared ``IpGeoResult`` per
+    distinct location. The loader drops any range overlapping an earlier one.
+    """
+
+    __slots__ = (
+        "records",
+        "v4_ends",
+        "v4_records",
+        "v4_starts",
+        "v6_ends_hi",
+        "v6_ends_lo",
+        "v6_records",
+        "v6_starts_hi",
+        "v6_starts_lo",
+    )
+
+    def __init__(self) -> None:
+        self.records: list[IpGeoResult] = []
+        self.v4_starts = array("I")
+        self.v4_ends = array("I")
+        self.v4_records = array("I")
+        self.v6_starts_hi = array("Q")
+        self.v6_starts_lo = array("Q")
+        self.v6_ends_hi = array("Q")
+        self.v6_ends_lo = array("Q")
+        self.v6_records = array("I")
+
+    def __len__(self) -> int:
+        return len(self.v4_starts) + len(self.v6_starts_hi)
+
+    def _v6_start(self, index: int) -> int:
+        return self.v6_starts_hi[index] << 64 | self.v6_starts_lo[index]
+
+    def _v6_end(self, index: int) -> int:
+        return self.v6_ends_hi[index] << 64 | self.v6_ends_lo[index]
+
+    def _v6_columns(self) -> tuple[array, ...]:
+        return (
+            self.v6_starts_hi,
+            self.v6_starts_lo,
+            self.v6_ends_hi,
+            self.v6_ends_lo,
+            self.v6_records,
+        )
+
+    def sort(self) -> None:
+        """Order ranges by start; database files are usually sorted already."""
+        v4_columns = (self.v4_starts, self.v4_ends, self.v4_records)
+        _sort_columns(self.v4_starts.__getitem__, v4_columns)
+        _sort_columns(self._v6_start, self._v6_columns())
+
+    def drop_overlapping(self) -> int:
+        """Drop sorted ranges that overlap an earlier one; returns how many were dropped.
+
+        The binary search assumes disjoint ranges: with a nested or overlapping
+        range it could return the wrong row or none at all.
+        """
+        v4_columns = (self.v4_starts, self.v4_ends, self.v4_records)
+        return _drop_overlapping(
+            self.v4_starts.__getitem__, self.v4_ends.__getitem__, v4_columns
+        ) + _drop_overlapping(self._v6_start, self._v6_end, self._v6_columns())
+
+    def lookup_v4(self, value: int) -> IpGeoResult | None:
+        index = bisect_right(self.v4_starts, value) - 1
+        if index < 0 or self.v4_ends[index] < value:
+            return None
+        return self.records[self.v4_records[index]]
+
+    def lookup_v6(self, value: int) -> IpGeoResult | None:
+        index = find_v6_range(
+            self.v6_starts_hi,
+            self.v6_starts_lo,
+            self.v6_ends_hi,
+            self.v6_ends_lo,
+            value,
+        )
+        if index < 0:
+            return None
+        return self.records[self.v6_records[index]]
+
+
+_LOCATION_COLUMNS = (
+    "country_code",
+    "org",
+    "timezone",
+    "utc_offset",
+    "latitude",
+    "longitude",
+)
+
+
+def _range_bounds(start_ip: str, end_ip: str) -> tuple[int, int, int]:
+    version, start = ip_to_int(start_ip.strip())
+    end_version, end = ip_to_int(end_ip.strip())
+    if version != end_version or start > end:
+        raise ValueError("invalid range")
+    return version, start, end
+
+
+def _network_bounds(network: str) -> tuple[int, int, int]:
+    parsed = ipaddress.ip_network(network.strip(), strict=False)
+    return parsed.version, int(parsed.network_address), int(parsed.broadcast_address)
+
+
+def _location_record(
+    country_code: str | None,
+    org: str | None,
+    timezone: str | None,
+    utc_offset: str | None,
+    latitude: str | None,
+    longitude: str | None,
+) -> IpGeoResult:
+    return IpGeoResult(
+        country_iso=(country_code or "").strip().upper() or None,
+        is_hosting=looks_like_hosting_provider((org or "").lower()),
+        timezone=(timezone or "").strip() or None,
+        utc_offset_minutes=parse_utc_offset_minutes(utc_offset),
+        latitude=parse_float(latitude or None),
+        longitude=parse_float(longitude or None),
+    )
+
+
+def load_geo_tables(path: Path) -> _GeoTables:
+    """Parse a CSV of IP ranges into lookup tables.
+
+    The header names the columns: either ``network`` (CIDR) or ``start_ip`` and
+    ``end_ip``, plus any of ``country_code``, ``org``, ``timezone``, ``utc_offset``,
+    ``latitude`` and ``longitude`` (the ipapi.co field names). Rows that cannot be
+    parsed are skipped.
+
+    Ranges must not overlap, so databases with nested networks have to be flattened
+    first. A range that overlaps an earlier one (by start address) is dropped with a
+    warning.
+    """
+    tables = _GeoTables()
+    # Raw location columns -> record position, so each location is parsed once.
+    record_index: dict[tuple[str | None, ...], int] = {}
+    skipped = 0
+
+    with path.open(newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        header = [column.strip().lower() for column in next(reader, [])]
+        columns = {name: position for position, name in enumerate(header)}
+        location_columns = [columns.get(name) for name in _LOCATION_COLUMNS]
+        network_column = columns.get("network")
+        start_column = columns.get("start_ip")
+        end_column = columns.get("end_ip")
+        if network_column is None and (start_column is None or end_column is None):
+            raise ValueError(f"{path}: expected a network or start_ip/end_ip column")
+
+        for row in reader:
+            try:
+                if network_column is not None:
+                    version, start, end = _network_bounds(row[network_column])
+                else:
+                    version, start, end = _range_bounds(
+                        row[start_column], row[end_column]
+                    )
+            except (IndexError, ValueError, OSError):
+                skipped += 1
+                continue
+
+            key = tuple(
+                row[column] if column is not None and column < len(row) else None
+                for column in location_columns
+            )
+            position = record_index.get(key)
+            if position is None:
+                position = record_index[key] = len(tables.records)
+                tables.records.append(_location_record(*key))
+            if version == 4:
+                tables.v4_starts.append(start)
+                tables.v4_ends.append(end)
+                tables.v4_records.append(position)
+            else:
+                tables.v6_starts_hi.append(start >> 64)
+                tables.v6_starts_lo.append(start & LOW_64)
+                tables.v6_ends_hi.append(end >> 64)
+                tables.v6_ends_lo.append(end & LOW_64)
+                tables.v6_records.append(position)
+
+    tables.sort()
+    overlapping = tables.drop_overlapping()
+    if skipped:
+        logger.warning("Skipped %d unparsable rows in %s", skipped, path)
+    if overlapping:
+        logger.warning(
+            "Dropped %d ranges overlapping an earlier range in %s; "
+            "flatten the database to non-overlapping ranges",
+            overlapping,
+            path,
+        )
+    return tables
+
+
+def _select(columns: tuple[array, ...], indexes: list[int]) -> None:
+    for column in columns:
+        column[:] = array(column.typecode, map(column.__getitem__, indexes))
+
+
+def _sort_columns(key: Callable[[int], int], columns: tuple[array, ...]) -> None:
+    size = len(columns[0])
+    if all(key(index - 1) <= key(index) for index in range(1, size)):
+        return
+    _select(columns, sorted(range(size), key=key))
+
+
+def _drop_overlapping(
+    start: Callable[[int], int],
+    end: Callable[[int], int],
+    columns: tuple[array, ...],
+) -> int:
+    keep: list[int] = []
+    last_end = -1
+    for index in range(len(columns[0])):
+        if start(index) > last_end:
+            keep.append(index)
+            last_end = end(index)
+    dropped = len(columns[0]) - len(keep)
+    if dropped:
+        _select(columns, keep)
+    return dropped
+
+
+class IpGeoDatabase(ReloadingIndex):
+    """Offline IP geolocation from a local range database, answered by binary search.
+
+    The CSV file is parsed once into sorted integer arrays (see ``load_geo_tables``),
+    so a lookup is two bisections over compact arrays with no I/O. Locations are
+    deduplicated, and every range sharing one returns the same ``IpGeoResult``.
+
+    The file is checked for changes at most every ``reload_interval_seconds``. A
+    changed file is parsed in a worker thread and swapped in with a single reference
+    assignment, so lookups see either the old or the new tables, never a mix. If the
+    new file fails to parse or has no valid ranges, the old tables are kept. Replace
+    the file atomically (write elsewhere, then rename) so a half-written file is never
+    read.
+    """
+
+    def __init__(self, path: str | Path, reload_interval_seconds: float = 60.0):
+        self._path = Path(path)
+        super().__init__(reload_interval_seconds)
+        self._tables = load_geo_tables(self._path)
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+    def _source_signature(self) -> tuple[int, int, int] | None:
+        return file_signature(self._path)
+
+    def lookup(self, ip: str) -> IpGeoResult | None:
+        try:
+            version, value = ip_to_int(ip)
+        except (OSError, ValueError):
+            return None
+        if version == 4:
+            return self._tables.lookup_v4(value)
+        return self._tables.lookup_v6(value)
+
+    def reload(self) -> bool:
+        """Reparse the file and swap it in; returns False if it could not be loaded."""
+        self._signature = self._source_signature()
+        try:
+            tables = load_geo_tables(self._path)
+        except (OSError, UnicodeDecodeError, ValueError, csv.Error):
+            logger.exception("Failed to reload IP geolocation database %s", self._path)
+            return False
+        if not len(tables):
+            logger.error("IP geolocation database %s has no valid ranges", self._path)
+            return False
+        self._tables = tables
+        logger.info("Reloaded IP geolocation database: %d ranges", len(tables))
+        return True
+
+
+__all__ = ("IpGeoDatabase", "load_geo_tables")
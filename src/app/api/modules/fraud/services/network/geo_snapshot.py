@@ -0,0 +1,177 @@
+import asyncio
+import json
+import logging
+import os
+from collections.abc import Iterable
+from pathlib import Path
+from time import time
+
+from app.api.modules.fraud.services.network.client import (
+    IpGeoClient,
+    IpGeoResult,
+    format_cache_entries,
+)
+
+logger = logging.getLogger(__name__)
+
+_SNAPSHOT_FORMAT = "ip-geo-cache"
+_SNAPSHOT_VERSION = 1
+
+# (ip, result or None for a cached failure, remaining TTL in seconds)
+GeoSnapshotEntry = tuple[str, IpGeoResult | None, float]
+
+
+def save_geo_snapshot(
+    path: str | Path,
+    entries: Iterable[GeoSnapshotEntry],
+    now: float,
+) -> int:
+    """Write cache entries as NDJSON with absolute (wall-clock) expiry times.
+
+    The first line is a format header. Each following line is
+    ``[ip, expires_at, country_iso, is_hosting, timezone, utc_offset_minutes,
+    latitude, longitude]``, or ``[ip, expires_at]`` for a cached failure. The file
+    is written next to the target and renamed over it, so readers never see a
+    partial snapshot.
+    """
+    path = Path(path)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    count = 0
+    try:
+        with temp_path.open("w", encoding="utf-8") as file:
+            file.write(
+                json.dumps({"format": _SNAPSHOT_FORMAT, "version": _SNAPSHOT_VERSION})
+            )
+            file.write("\n")
+            for ip, result, remaining in entries:
+                row: list[object] = [ip, round(now + remaining, 3)]
+                if result is not None:
+                    row.extend(
+                        (
+                            result.country_iso,
+                            result.is_hosting,
+                            result.timezone,
+                            result.utc_offset_minutes,
+                            result.latitude,
+                            result.longitude,
+                        )
+                    )
+                file.write(json.dumps(row, separators=(",", ":")))
+                file.write("\n")
+                count += 1
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return count
+
+
+def load_geo_snapshot(path: str | Path, now: float) -> list[GeoSnapshotEntry]:
+    """Read a snapshot written by ``save_geo_snapshot``, dropping expired entries.
+
+    A missing file yields no entries; malformed lines are skipped.
+    """
+    path = Path(path)
+    try:
+        file = path.open(encoding="utf-8")
+    except FileNotFoundError:
+        return []
+
+    entries: list[GeoSnapshotEntry] = []
+    skipped = 0
+    with file:
+        try:
+            header = json.loads(file.readline() or "null")
+        except ValueError:
+            header = None
+        if not isinstance(header, dict) or header.get("format") != _SNAPSHOT_FORMAT:
+            raise ValueError(f"{path}: not an IP geolocation cache snapshot")
+        if header.get("version") != _SNAPSHOT_VERSION:
+            raise ValueError(
+                f"{path}: unsupported snapshot version {header.get('version')}"
+            )
+
+        for line in file:
+            try:
+                ip, expires_at, *fields = json.loads(line)
+                remaining = float(expires_at) - now
+                result = IpGeoResult(*fields) if fields else None
+            except (TypeError, ValueError):
+                skipped += 1
+                continue
+            if remaining > 0 and isinstance(ip, str):
+                entries.append((ip, result, remaining))
+
+    if skipped:
+        logger.warning("Skipped %d malformed lines in %s", skipped, path)
+    return entries
+
+
+async def restore_geo_cache(client: IpGeoClient, path: str | Path) -> int:
+    """Load a snapshot into the client's cache; a bad snapshot is logged and ignored."""
+    try:
+        entries = await asyncio.to_thread(load_geo_snapshot, path, time())
+    except (OSError, ValueError) as exc:
+        logger.warning("Failed to load IP geolocation cache snapshot: %s", exc)
+        return 0
+    restored = client.restore_cache(entries)
+    logger.info("Restored %d IP geolocation cache entries from %s", restored, path)
+    return restored
+
+
+async def persist_geo_cache(client: IpGeoClient, path: str | Path) -> int:
+    """Save the client's cache; only copying the entries runs on the event loop."""
+    entries = client.cache_snapshot()
+    # The generator formats the keys lazily, inside the worker thread.
+    return await asyncio.to_thread(
+        save_geo_snapshot, path, format_cache_entries(entries), time()
+    )
+
+
+async def persist_geo_cache_periodically(
+    client: IpGeoClient,
+    path: str | Path,
+    interval_seconds: float,
+) -> None:
+    """Snapshot the cache every ``interval_seconds`` until cancelled.
+
+    A failed snapshot is logged and retried on the next tick, so one bad write
+    cannot end the task.
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await persist_geo_cache(client, path)
+        except Exception:  # noqa: BLE001
+            logger.exception("Failed to save IP geolocation cache snapshot")
+
+
+async def prewarm_geo_cache(
+    client: IpGeoClient,
+    ips: Iterable[str],
+    concurrency: int,
+) -> int:
+    """Resolve ``ips`` with at most ``concurrency`` lookups in flight; returns hits."""
+    pending = iter(ips)
+    resolved = 0
+
+    async def worker() -> None:
+        nonlocal resolved
+        # Workers share one iterator, so each IP is taken exactly once.
+        for ip in pending:
+            if await client.resolve(ip) is not None:
+                resolved += 1
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return resolved
+
+
+__all__ = (
+    "GeoSnapshotEntry",
+    "load_geo_snapshot",
+    "persist_geo_cache",
+    "persist_geo_cache_periodically",
+    "prewarm_geo_cache",
+    "restore_geo_cache",
+    "save_geo_snapshot",
+)
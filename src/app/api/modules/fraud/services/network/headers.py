@@ -1,81 +1,84 @@
-from app.api.modules.fraud.schema import FraudCheckRequest, FraudSignal
-from app.api.modules.fraud.services.context.locale import (
-    extract_primary_language,
-    language_base,
-)
-from app.api.modules.fraud.services.core import create_signal
+from app.api.modules.fraud.schema import FraudSignal
+from app.api.modules.fraud.services.core import EvaluationContext, define_signal
 from app.api.modules.fraud.services.network.common import normalize_text
 from app.api.modules.fraud.services.network.headers_utils import (
     jaccard_similarity,
     normalize_brand,
-    parse_accept_language,
     parse_sec_ch_ua_brands,
 )
-from app.api.modules.fraud.services.network.user_agent import is_chromium_ua
+
+_UA_HEADER_PAYLOAD_MISMATCH = define_signal(
+    code="UA_HEADER_PAYLOAD_MISMATCH",
+    weight=40,
+    message="Request User-Agent does not match payload user_agent.",
+)
+_ACCEPT_LANGUAGE_MISMATCH = define_signal(
+    code="ACCEPT_LANGUAGE_MISMATCH",
+    weight=15,
+    message="Request Accept-Language does not match payload language.",
+)
+_ACCEPT_LANGUAGE_LIST_MISMATCH = define_signal(
+    code="ACCEPT_LANGUAGE_LIST_MISMATCH",
+    weight=8,
+    message="Accept-Language header is inconsistent with navigator.languages.",
+)
+_CH_MOBILE_MISMATCH = define_signal(
+    code="CH_MOBILE_MISMATCH",
+    weight=20,
+    message="sec-ch-ua-mobile header does not match payload client hints.",
+)
+_CH_PLATFORM_MISMATCH = define_signal(
+    code="CH_PLATFORM_MISMATCH",
+    weight=15,
+    message="sec-ch-ua-platform header does not match payload client hints.",
+)
+_CH_BRANDS_MISMATCH = define_signal(
+    code="CH_BRANDS_MISMATCH",
+    weight=25,
+    message="sec-ch-ua brands do not match payload client hints brands.",
+)
+_CH_BRANDS_PARTIAL_MISMATCH = define_signal(
+    code="CH_BRANDS_PARTIAL_MISMATCH",
+    weight=10,
+    message="sec-ch-ua brands partially mismatch payload client hints brands.",
+)
+_CH_HEADERS_MISSING = define_signal(
+    code="CH_HEADERS_MISSING",
+    weight=8,
+    message="User-AgentData is present but sec-ch-ua headers are missing.",
+)
 
 
 class HeaderConsistencyService:
     def collect(
         self,
-        payload: FraudCheckRequest,
-        headers: dict[str, str],
+        context: EvaluationContext,
     ) -> list[FraudSignal]:
+        payload = context.payload
+        headers = context.headers
         signals: list[FraudSignal] = []
 
-        header_ua = headers.get("user-agent")
-        if header_ua and normalize_text(header_ua) != normalize_text(
-            payload.navigator.user_agent
-        ):
-            signals.append(
-                create_signal(
-                    code="UA_HEADER_PAYLOAD_MISMATCH",
-                    weight=40,
-                    message="Request User-Agent does not match payload user_agent.",
-                )
-            )
+        header_ua = context.header_ua_normalized
+        if header_ua is not None and header_ua != context.ua.normalized:
+            signals.append(_UA_HEADER_PAYLOAD_MISMATCH)
 
-        header_accept_language = headers.get("accept-language")
-        payload_language = payload.navigator.language
-        if header_accept_language and payload_language:
-            primary_header_language = extract_primary_language(header_accept_language)
-            if primary_header_language and language_base(primary_header_language) != language_base(
-                payload_language
-            ):
-                signals.append(
-                    create_signal(
-                        code="ACCEPT_LANGUAGE_MISMATCH",
-                        weight=15,
-                        message="Request Accept-Language does not match payload language.",
-                    )
-                )
+        header_language_base = context.header_primary_language_base
+        payload_language_base = context.language_base
+        if header_language_base is not None and payload_language_base is not None:
+            if header_language_base != payload_language_base:
+                signals.append(_ACCEPT_LANGUAGE_MISMATCH)
 
-        if header_accept_language and payload.navigator.languages:
-            header_languages = parse_accept_language(header_accept_language)
-            header_bases = {language_base(item) for item in header_languages}
-            payload_bases = {language_base(item) for item in payload.navigator.languages}
-            if header_bases and payload_bases and not (header_bases & payload_bases):
-                signals.append(
-                    create_signal(
-                        code="ACCEPT_LANGUAGE_LIST_MISMATCH",
-                        weight=8,
-                        message="Accept-Language header is inconsistent with navigator.languages.",
-                    )
-                )
+        header_bases = context.header_language_bases
+        payload_bases = context.language_bases
+        if header_bases and payload_bases and not (header_bases & payload_bases):
+            signals.append(_ACCEPT_LANGUAGE_LIST_MISMATCH)
 
         if payload.client_hints and payload.client_hints.mobile is not None:
             header_mobile = headers.get("sec-ch-ua-mobile")
             if header_mobile in {"?0", "?1"}:
                 is_header_mobile = header_mobile == "?1"
                 if is_header_mobile != payload.client_hints.mobile:
-                    signals.append(
-                        create_signal(
-                            code="CH_MOBILE_MISMATCH",
-                            weight=20,
-                            message=(
-                                "sec-ch-ua-mobile header does not match payload client hints."
-                            ),
-                        )
-                    )
+                    signals.append(_CH_MOBILE_MISMATCH)
 
         if payload.client_hints and payload.client_hints.platform:
             header_platform = headers.get("sec-ch-ua-platform")
@@ -83,17 +86,11 @@ class HeaderConsistencyService:
                 normalized_header_platform = normalize_text(
                     header_platform.strip().strip('"')
                 )
-                normalized_payload_platform = normalize_text(payload.client_hints.platform)
+                normalized_payload_platform = normalize_text(
+                    payload.client_hints.platform
+                )
                 if normalized_header_platform != normalized_payload_platform:
-                    signals.append(
-                        create_signal(
-                            code="CH_PLATFORM_MISMATCH",
-                            weight=15,
-                            message=(
-                                "sec-ch-ua-platform header does not match payload client hints."
-                            ),
-                        )
-                    )
+                    signals.append(_CH_PLATFORM_MISMATCH)
 
         header_ch_ua = headers.get("sec-ch-ua")
         if payload.client_hints and payload.client_hints.brands:
@@ -107,31 +104,16 @@ class HeaderConsistencyService:
             if payload_brands and header_brands:
                 similarity = jaccard_similarity(payload_brands, header_brands)
                 if similarity < 0.5:
-                    signals.append(
-                        create_signal(
-                            code="CH_BRANDS_MISMATCH",
-                            weight=25,
-                            message="sec-ch-ua brands do not match payload client hints brands.",
-                        )
-                    )
+                    signals.append(_CH_BRANDS_MISMATCH)
                 elif similarity < 1.0:
-                    signals.append(
-                        create_signal(
-                            code="CH_BRANDS_PARTIAL_MISMATCH",
-                            weight=10,
-                            message="sec-ch-ua brands partially mismatch payload client hints brands.",
-                        )
-                    )
+                    signals.append(_CH_BRANDS_PARTIAL_MISMATCH)
 
-        ua = payload.navigator.user_agent.lower()
-        if is_chromium_ua(ua) and not header_ch_ua and payload.client_hints is not None:
-            signals.append(
-                create_signal(
-                    code="CH_HEADERS_MISSING",
-                    weight=8,
-                    message="User-AgentData is present but sec-ch-ua headers are missing.",
-                )
-            )
+        if (
+            context.ua.is_chromium
+            and not header_ch_ua
+            and payload.client_hints is not None
+        ):
+            signals.append(_CH_HEADERS_MISSING)
 
         return signals
 
@@ -0,0 +1,190 @@
+import logging
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+
+from app.api.modules.fraud.services.network.common import ip_to_int
+from app.api.modules.fraud.services.network.ip_ranges import (
+    LOW_64,
+    ReloadingIndex,
+    file_signature,
+    find_v6_range,
+)
+
+logger = logging.getLogger(__name__)
+
+_ADDRESS_BITS = {4: 32, 6: 128}
+
+
+class _RangeSet:
+    """Merged, sorted, non-overlapping IP ranges as parallel integer arrays.
+
+    IPv6 bounds are split into high and low 64-bit halves, as in the geo database.
+    """
+
+    __slots__ = (
+        "v4_ends",
+        "v4_starts",
+        "v6_ends_hi",
+        "v6_ends_lo",
+        "v6_starts_hi",
+        "v6_starts_lo",
+    )
+
+    def __init__(self) -> None:
+        self.v4_starts = array("I")
+        self.v4_ends = array("I")
+        self.v6_starts_hi = array("Q")
+        self.v6_starts_lo = array("Q")
+        self.v6_ends_hi = array("Q")
+        self.v6_ends_lo = array("Q")
+
+    def __len__(self) -> int:
+        return len(self.v4_starts) + len(self.v6_starts_hi)
+
+    def contains_v4(self, value: int) -> bool:
+        index = bisect_right(self.v4_starts, value) - 1
+        return index >= 0 and self.v4_ends[index] >= value
+
+    def contains_v6(self, value: int) -> bool:
+        index = find_v6_range(
+            self.v6_starts_hi,
+            self.v6_starts_lo,
+            self.v6_ends_hi,
+            self.v6_ends_lo,
+            value,
+        )
+        return index >= 0
+
+
+def _parse_range(entry: str) -> tuple[int, int, int]:
+    """Parse ``a.b.c.d/nn``, a bare address or ``start-end`` into bounds."""
+    if "-" in entry:
+        start_ip, _, end_ip = entry.partition("-")
+        version, start = ip_to_int(start_ip.strip())
+        end_version, end = ip_to_int(end_ip.strip())
+        if version != end_version or start > end:
+            raise ValueError("invalid range")
+        return version, start, end
+
+    address, _, prefix = entry.partition("/")
+    version, value = ip_to_int(address)
+    bits = _ADDRESS_BITS[version]
+    prefix_length = int(prefix) if prefix else bits
+    if not 0 <= prefix_length <= bits:
+        raise ValueError("invalid prefix length")
+    host_mask = (1 << (bits - prefix_length)) - 1
+    return version, value & ~host_mask, value | host_mask
+
+
+def _merge(packed: list[int], shift: int) -> Iterable[tuple[int, int]]:
+    """Coalesce ``start << shift | end`` ranges into sorted, disjoint ones."""
+    packed.sort()
+    mask = (1 << shift) - 1
+    current_start = current_end = -1
+    for item in packed:
+        start, end = item >> shift, item & mask
+        if current_end >= 0 and start <= current_end + 1:
+            current_end = max(current_end, end)
+            continue
+        if current_end >= 0:
+            yield current_start, current_end
+        current_start, current_end = start, end
+    if current_end >= 0:
+        yield current_start, current_end
+
+
+def load_hosting_ranges(paths: Sequence[Path]) -> _RangeSet:
+    """Parse range files into one merged range set.
+
+    Each line holds a CIDR (``203.0.113.0/24``, ``2001:db8::/32``), a single address
+    or an inclusive ``start-end`` range. Anything after the first whitespace, and
+    lines starting with ``#``, are ignored, so lists can carry provider names or
+    ASNs as comments. Overlapping and adjacent ranges are merged. Lines that cannot
+    be parsed are skipped.
+    """
+    v4: list[int] = []
+    v6: list[int] = []
+    skipped = 0
+    for path in paths:
+        with path.open(encoding="utf-8") as file:
+            for line in file:
+                fields = line.split(None, 1)
+                if not fields or fields[0].startswith("#"):
+                    continue
+                try:
+                    version, start, end = _parse_range(fields[0])
+                except (OSError, ValueError):
+                    skipped += 1
+                    continue
+                if version == 4:
+                    v4.append(start << 32 | end)
+                else:
+                    v6.append(start << 128 | end)
+
+    ranges = _RangeSet()
+    for start, end in _merge(v4, 32):
+        ranges.v4_starts.append(start)
+        ranges.v4_ends.append(end)
+    for start, end in _merge(v6, 128):
+        ranges.v6_starts_hi.append(start >> 64)
+        ranges.v6_starts_lo.append(start & LOW_64)
+        ranges.v6_ends_hi.append(end >> 64)
+        ranges.v6_ends_lo.append(end & LOW_64)
+
+    if skipped:
+        logger.warning("Skipped %d unparsable hosting range lines", skipped)
+    return ranges
+
+
+class HostingRangeIndex(ReloadingIndex):
+    """In-process index of hosting, cloud, VPN and proxy IP ranges.
+
+    The files are merged into sorted interval arrays (see ``load_hosting_ranges``),
+    so ``contains`` is a binary search with no I/O, independent of IP geolocation.
+    Reloading works as in ``IpGeoDatabase``, through ``ReloadingIndex``: the files
+    are checked for changes at most every ``reload_interval_seconds``, reparsed in a
+    worker thread and swapped in whole, and a failed or empty reload keeps the old
+    ranges.
+    """
+
+    def __init__(
+        self, paths: Iterable[str | Path], reload_interval_seconds: float = 60.0
+    ):
+        self._paths = tuple(Path(path) for path in paths)
+        super().__init__(reload_interval_seconds)
+        self._ranges = load_hosting_ranges(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._ranges)
+
+    def _source_signature(self) -> tuple[tuple[int, int, int] | None, ...]:
+        return tuple(file_signature(path) for path in self._paths)
+
+    def contains(self, ip: str) -> bool:
+        try:
+            version, value = ip_to_int(ip)
+        except (OSError, ValueError):
+            return False
+        if version == 4:
+            return self._ranges.contains_v4(value)
+        return self._ranges.contains_v6(value)
+
+    def reload(self) -> bool:
+        """Reparse the files and swap them in; returns False if they could not be loaded."""
+        self._signature = self._source_signature()
+        try:
+            ranges = load_hosting_ranges(self._paths)
+        except (OSError, UnicodeDecodeError):
+            logger.exception("Failed to reload hosting ranges")
+            return False
+        if not len(ranges):
+            logger.error("Hosting range files have no valid ranges")
+            return False
+        self._ranges = ranges
+        logger.info("Reloaded hosting ranges: %d merged ranges", len(ranges))
+        return True
+
+
+__all__ = ("HostingRangeIndex", "load_hosting_ranges")
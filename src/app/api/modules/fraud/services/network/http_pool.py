@@ -0,0 +1,89 @@
+import asyncio
+import logging
+from typing import Any
+
+import httpx
+
+from app.settings import HttpPoolConfig
+
+logger = logging.getLogger(__name__)
+
+# Raised when the server closes a pooled connection with requests still on it, e.g.
+# after its per-connection request limit (an HTTP/2 GOAWAY). Connect errors and
+# timeouts are not included: retrying those would only wait again.
+_CLOSED_CONNECTION_ERRORS = (
+    httpx.ReadError,
+    httpx.WriteError,
+    httpx.RemoteProtocolError,
+)
+
+
+def build_http_client(config: HttpPoolConfig) -> httpx.AsyncClient:
+    """An ``httpx.AsyncClient`` with its own connection pool for one upstream.
+
+    Each upstream gets a separate pool, so a slow one cannot hold the connections
+    another needs. The timeouts apply per phase (connect, read, write, waiting for
+    a pooled connection); callers bound the whole request with their own deadline.
+    """
+    return httpx.AsyncClient(
+        http2=config.http2,
+        timeout=httpx.Timeout(
+            connect=config.connect_timeout_seconds,
+            read=config.read_timeout_seconds,
+            write=config.write_timeout_seconds,
+            pool=config.pool_timeout_seconds,
+        ),
+        limits=httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry_seconds,
+        ),
+    )
+
+
+async def request_with_reconnect(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    **kwargs: Any,
+) -> httpx.Response:
+    """Send a request, once more on a fresh connection if the pooled one was closed.
+
+    With HTTP/2 many requests share one connection, so a server rotating it fails
+    all of them at once. The retry is also used for siteverify POSTs: if the first
+    attempt did reach Cloudflare, the retry is answered ``timeout-or-duplicate``,
+    no worse for the user than the network error it replaces.
+    """
+    try:
+        return await client.request(method, url, **kwargs)
+    except _CLOSED_CONNECTION_ERRORS as exc:
+        logger.debug("Retrying on a new connection after: %r", exc)
+        return await client.request(method, url, **kwargs)
+
+
+async def warm_up_connections(
+    client: httpx.AsyncClient,
+    url: str,
+    connections: int,
+) -> int:
+    """Open up to ``connections`` pooled connections to ``url`` with HEAD requests.
+
+    Any response, even an error status, leaves a connection in the pool. Failures
+    are logged and ignored: the first real request simply connects itself. Returns
+    the number of requests that got a response.
+    """
+
+    async def head() -> bool:
+        try:
+            await client.head(url)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Failed to pre-warm HTTP connection", extra={"url": url})
+            logger.debug("HTTP connection pre-warm error: %s", exc)
+            return False
+        return True
+
+    results = await asyncio.gather(*(head() for _ in range(max(0, connections))))
+    return sum(results)
+
+
+__all__ = ("build_http_client", "request_with_reconnect", "warm_up_connections")
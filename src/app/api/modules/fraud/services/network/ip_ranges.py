@@ -0,0 +1,77 @@
+import asyncio
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from time import monotonic
+
+LOW_64 = (1 << 64) - 1
+
+
+def find_v6_range(
+    starts_hi: array,
+    starts_lo: array,
+    ends_hi: array,
+    ends_lo: array,
+    value: int,
+) -> int:
+    """Index of the range holding ``value``, or -1.
+
+    IPv6 bounds are stored as high and low 64-bit halves in parallel arrays of
+    sorted, non-overlapping ranges.
+    """
+    high, low = value >> 64, value & LOW_64
+    right = bisect_right(starts_hi, high)
+    left = bisect_left(starts_hi, high, 0, right)
+    # Ranges in [left, right) share the high half and are ordered by the low half.
+    index = bisect_right(starts_lo, low, left, right) - 1
+    if index < 0 or (ends_hi[index], ends_lo[index]) < (high, low):
+        return -1
+    return index
+
+
+def file_signature(path: Path) -> tuple[int, int, int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+class ReloadingIndex:
+    """Base for indexes loaded from files that reload when the files change.
+
+    Subclasses implement ``_source_signature`` and ``reload``; ``reload`` must
+    record the signature of what it read in ``_signature``. The files are
+    checked at most every ``reload_interval_seconds``, and a changed file is
+    reloaded in a worker thread.
+    """
+
+    def __init__(self, reload_interval_seconds: float):
+        self._reload_interval_seconds = reload_interval_seconds
+        self._signature = self._source_signature()
+        self._next_check = monotonic() + reload_interval_seconds
+        self._reload_task: asyncio.Task | None = None
+
+    def _source_signature(self) -> object:
+        raise NotImplementedError
+
+    def reload(self) -> bool:
+        raise NotImplementedError
+
+    def reload_if_changed(self) -> None:
+        """Schedule a background reload when a file changed; cheap to call often."""
+        now = monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self._reload_interval_seconds
+        if self._reload_task is not None and not self._reload_task.done():
+            return
+        if self._source_signature() == self._signature:
+            return
+        self._reload_task = asyncio.get_running_loop().create_task(
+            asyncio.to_thread(self.reload)
+        )
+
+
+__all__ = ("LOW_64", "ReloadingIndex", "file_signature", "find_v6_range")
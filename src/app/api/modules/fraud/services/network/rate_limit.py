@@ -1,47 +1,168 @@
-import asyncio
-from collections import defaultdict, deque
+from collections import OrderedDict, deque
+from collections.abc import Sequence
 from time import monotonic
+from typing import Protocol
 
-_PURGE_EVERY = 512
+from app.api.modules.fraud.services.core import define_signal
+from app.settings import RateLimitAlgorithm
 
+# Returned alone, in place of the check, to rate-limited requests.
+RATE_LIMIT_EXCEEDED = define_signal(
+    code="RATE_LIMIT_EXCEEDED",
+    weight=100,
+    message="Too many requests from this IP in a short time.",
+)
 
-class InMemoryIpRateLimiter:
+# Stale IPs inspected per call; keeps purging incremental instead of periodic full scans.
+_PURGE_BATCH = 4
 
-    def __init__(self, window_seconds: int, max_requests_per_ip: int):
-        self._window_seconds = window_seconds
-        self._max_requests_per_ip = max_requests_per_ip
-        self._events: dict[str, deque[float]] = defaultdict(deque)
-        self._lock = asyncio.Lock()
-        self._call_count = 0
 
-    def _purge_stale(self, threshold: float) -> None:
-        stale = [ip for ip, evts in self._events.items() if not evts or evts[-1] < threshold]
-        for ip in stale:
-            del self._events[ip]
+class _SlidingLog:
+    """Exact sliding log: one timestamp per accepted request, per IP.
 
-    async def allow(self, ip: str | None) -> bool:
-        if not ip:
-            return True
+    The events dict is ordered from least to most recently seen IP. It is an
+    OrderedDict because a plain dict slows down as entries are popped from its front.
+    """
 
-        now = monotonic()
-        threshold = now - self._window_seconds
+    __slots__ = ("events", "max_requests", "window_seconds")
+
+    def __init__(self, window_seconds: int, max_requests: int) -> None:
+        self.window_seconds = window_seconds
+        self.max_requests = max_requests
+        self.events: OrderedDict[str, deque[float]] = OrderedDict()
+
+    def purge_stale(self, threshold: float) -> None:
+        for _ in range(_PURGE_BATCH):
+            ip = next(iter(self.events), None)
+            if ip is None:
+                return
+            events = self.events[ip]
+            if events and events[-1] >= threshold:
+                return
+            del self.events[ip]
+
+    def allow(self, ip: str, now: float) -> bool:
+        threshold = now - self.window_seconds
+        self.purge_stale(threshold)
+
+        # Keep the dict ordered by last access for purge_stale.
+        events = self.events.get(ip)
+        if events is None:
+            events = self.events[ip] = deque()
+        else:
+            self.events.move_to_end(ip)
+
+        while events and events[0] < threshold:
+            events.popleft()
+
+        if len(events) >= self.max_requests:
+            return False
+
+        events.append(now)
+        return True
+
+
+class _WindowCounter:
+    __slots__ = ("current", "previous", "window")
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.current = 0
+        self.previous = 0
+
+
+class _SlidingWindowCounter:
+    """Approximate sliding window from two fixed-window counters per IP.
+
+    The previous window's count is weighted by how much of it still overlaps the
+    sliding window, which assumes its requests were evenly spread. Memory per IP is
+    constant regardless of ``max_requests``.
+    """
+
+    __slots__ = ("counters", "max_requests", "window_seconds")
+
+    def __init__(self, window_seconds: int, max_requests: int) -> None:
+        self.window_seconds = window_seconds
+        self.max_requests = max_requests
+        self.counters: OrderedDict[str, _WindowCounter] = OrderedDict()
 
-        async with self._lock:
-            self._call_count += 1
-            if self._call_count >= _PURGE_EVERY:
-                self._call_count = 0
-                self._purge_stale(threshold)
+    def purge_stale(self, window: int) -> None:
+        for _ in range(_PURGE_BATCH):
+            ip = next(iter(self.counters), None)
+            if ip is None or self.counters[ip].window >= window - 1:
+                return
+            del self.counters[ip]
 
-            events = self._events[ip]
-            while events and events[0] < threshold:
-                events.popleft()
+    def allow(self, ip: str, now: float) -> bool:
+        window, offset = divmod(now, self.window_seconds)
+        window = int(window)
+        self.purge_stale(window)
 
-            if len(events) >= self._max_requests_per_ip:
-                return False
+        counter = self.counters.get(ip)
+        if counter is None:
+            counter = self.counters[ip] = _WindowCounter(window)
+        else:
+            self.counters.move_to_end(ip)
 
-            events.append(now)
+        if counter.window != window:
+            counter.previous = counter.current if counter.window == window - 1 else 0
+            counter.current = 0
+            counter.window = window
+
+        overlap = 1.0 - offset / self.window_seconds
+        if counter.previous * overlap + counter.current >= self.max_requests:
+            return False
+
+        counter.current += 1
+        return True
+
+
+class IpRateLimiter(Protocol):
+    async def allow(self, ip: str | None) -> bool: ...
+
+    async def allow_many(self, ips: Sequence[str | None]) -> list[bool]: ...
+
+
+_Algorithm = _SlidingLog | _SlidingWindowCounter
+
+_ALGORITHMS: dict[str, type[_Algorithm]] = {
+    "sliding_log": _SlidingLog,
+    "sliding_window_counter": _SlidingWindowCounter,
+}
+
+
+class InMemoryIpRateLimiter:
+    """Sliding-window per-IP limiter kept in process memory.
+
+    IPs are kept in least-to-most recently seen order, and every call drops a few
+    stale IPs from the front, so no call ever scans the whole table. A decision
+    contains no ``await``, so it runs atomically on the event loop without a lock.
+
+    ``algorithm`` selects the exact ``"sliding_log"`` (memory grows with
+    ``max_requests_per_ip``) or the approximate, constant-memory
+    ``"sliding_window_counter"``.
+    """
+
+    def __init__(
+        self,
+        window_seconds: int,
+        max_requests_per_ip: int,
+        algorithm: RateLimitAlgorithm = "sliding_log",
+    ):
+        self._limiter = _ALGORITHMS[algorithm](window_seconds, max_requests_per_ip)
+
+    async def allow(self, ip: str | None) -> bool:
+        if not ip:
             return True
+        return self._limiter.allow(ip, monotonic())
 
+    async def allow_many(self, ips: Sequence[str | None]) -> list[bool]:
+        """Take rate-limit decisions for a batch of IPs in one pass.
+
+        Decisions are returned in input order; repeated IPs consume successive slots.
+        """
+        now = monotonic()
+        return [self._limiter.allow(ip, now) if ip else True for ip in ips]
 
-__all__ = ("InMemoryIpRateLimiter",)
 
+__all__ = ("RATE_LIMIT_EXCEEDED", "InMemoryIpRateLimiter", "IpRateLimiter")
@@ -0,0 +1,140 @@
+import logging
+import secrets
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+from app.services.redis import RedisConnection
+from app.settings import RateLimitAlgorithm
+
+if TYPE_CHECKING:
+    from redis.commands.core import AsyncScript
+
+logger = logging.getLogger(__name__)
+
+# Both scripts read the server clock, so replicas need not agree on the time.
+# replicate_commands() lets pre-7.0 servers accept writes after TIME; later servers
+# always replicate effects.
+
+# KEYS[1] = sorted set of accepted request timestamps (milliseconds)
+# ARGV = window in milliseconds, max requests, unique member for this request
+_SLIDING_LOG_SCRIPT = """
+if redis.replicate_commands then redis.replicate_commands() end
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local window = tonumber(ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', '(' .. (now - window))
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now, ARGV[3])
+redis.call('PEXPIRE', KEYS[1], window)
+return 1
+"""
+
+# KEYS[1] = hash {w: current window number, c: its count, p: previous window count}
+# ARGV = window in seconds, max requests
+_SLIDING_WINDOW_COUNTER_SCRIPT = """
+if redis.replicate_commands then redis.replicate_commands() end
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local window_seconds = tonumber(ARGV[1])
+local window = math.floor(now / window_seconds)
+local offset = now - window * window_seconds
+local state = redis.call('HMGET', KEYS[1], 'w', 'c', 'p')
+local last = tonumber(state[1])
+local current = tonumber(state[2]) or 0
+local previous = tonumber(state[3]) or 0
+if last ~= window then
+    if last == window - 1 then previous = current else previous = 0 end
+    current = 0
+end
+if previous * (1 - offset / window_seconds) + current >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'w', window, 'c', current + 1, 'p', previous)
+redis.call('EXPIRE', KEYS[1], window_seconds * 2)
+return 1
+"""
+
+_SCRIPTS = {
+    "sliding_log": _SLIDING_LOG_SCRIPT,
+    "sliding_window_counter": _SLIDING_WINDOW_COUNTER_SCRIPT,
+}
+
+
+class RedisIpRateLimiter:
+    """Per-IP limiter shared by every replica through Redis.
+
+    Each decision is a single server-side script call, so a check costs one round
+    trip and concurrent replicas cannot race between reading and updating a
+    counter. ``algorithm`` has the same meaning as for ``InMemoryIpRateLimiter``.
+    If Redis is unreachable the limiter fails open and logs a warning.
+    """
+
+    def __init__(
+        self,
+        connection: RedisConnection,
+        window_seconds: int,
+        max_requests_per_ip: int,
+        algorithm: RateLimitAlgorithm = "sliding_log",
+    ):
+        self._connection = connection
+        self._window_seconds = max(1, int(window_seconds))
+        self._max_requests = max_requests_per_ip
+        self._algorithm = algorithm
+        self._script: AsyncScript | None = None
+
+    def _args(self) -> list[int | str]:
+        if self._algorithm == "sliding_log":
+            return [
+                self._window_seconds * 1000,
+                self._max_requests,
+                secrets.token_hex(8),
+            ]
+        return [self._window_seconds, self._max_requests]
+
+    async def _run(self, ip: str, client=None):
+        if self._script is None:
+            self._script = self._connection.client.register_script(
+                _SCRIPTS[self._algorithm]
+            )
+        return await self._script(
+            keys=[self._connection.key("rl", self._algorithm, ip)],
+            args=self._args(),
+            client=client,
+        )
+
+    async def allow(self, ip: str | None) -> bool:
+        if not ip:
+            return True
+
+        try:
+            return bool(await self._run(ip))
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Rate limit backend unavailable, allowing request")
+            logger.debug("Redis rate limit call failed: %s", exc)
+            return True
+
+    async def allow_many(self, ips: Sequence[str | None]) -> list[bool]:
+        """Take rate-limit decisions for a batch of IPs in one pipeline.
+
+        Decisions are returned in input order; repeated IPs consume successive slots.
+        """
+        if not any(ips):
+            return [True] * len(ips)
+
+        try:
+            pipeline = self._connection.client.pipeline(transaction=False)
+            for ip in ips:
+                if ip:
+                    await self._run(ip, client=pipeline)
+            results = iter(await pipeline.execute())
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Rate limit backend unavailable, allowing batch")
+            logger.debug("Redis rate limit pipeline failed: %s", exc)
+            return [True] * len(ips)
+
+        return [bool(next(results)) if ip else True for ip in ips]
+
+
+__all__ = ("RedisIpRateLimiter",)
@@ -1,12 +1,34 @@
+import asyncio
 import logging
 from dataclasses import dataclass
+from hashlib import sha256
+from time import perf_counter
 
 import httpx
 
+from app.api.modules.fraud.services.core.ttl_cache import CacheStats, TtlLruCache
+from app.api.modules.fraud.services.network.circuit_breaker import (
+    CircuitBreaker,
+    CircuitState,
+)
+from app.api.modules.fraud.services.network.http_pool import (
+    request_with_reconnect,
+    warm_up_connections,
+)
 from app.settings import Config
 
 logger = logging.getLogger(__name__)
 
+# What siteverify answers for a token it has already seen.
+_DUPLICATE_ERROR_CODE = "timeout-or-duplicate"
+# Failures that are final for the token. Others (network errors, HTTP errors,
+# "internal-error", secret problems) may pass on retry and are not cached.
+_FINAL_ERROR_CODES = frozenset({"invalid-input-response", _DUPLICATE_ERROR_CODE})
+# Returned without calling siteverify while the circuit is open.
+_UNAVAILABLE_ERROR_CODE = "turnstile_unavailable"
+# Returned when no verification slot frees up in time.
+_BUSY_ERROR_CODE = "turnstile_busy"
+
 
 @dataclass(slots=True)
 class TurnstileVerificationResult:
@@ -15,6 +37,30 @@ class TurnstileVerificationResult:
     hostname: str | None = None
     action: str | None = None
 
+    @property
+    def unavailable(self) -> bool:
+        """Turned away locally (busy or circuit open); the token was never checked."""
+        return any(
+            code in {_UNAVAILABLE_ERROR_CODE, _BUSY_ERROR_CODE}
+            for code in self.error_codes
+        )
+
+
+@dataclass(slots=True)
+class TurnstileStats:
+    in_flight: int
+    queued: int
+    peak_queued: int
+    # Verifies turned away because the queue was full or no slot freed up in time.
+    rejected: int
+    # Verifies answered with turnstile_unavailable while the circuit was open.
+    short_circuited: int
+    requests: int
+    failures: int
+    avg_latency_ms: float
+    max_latency_ms: float
+    circuit_state: CircuitState
+
 
 class TurnstileVerifierService:
     def __init__(self, client: httpx.AsyncClient, config: Config):
@@ -23,6 +69,36 @@ class TurnstileVerifierService:
         self._secret_key = config.fraud.turnstile_secret_key
         self._verify_url = config.fraud.turnstile_verify_url
         self._timeout = config.fraud.turnstile_timeout_seconds
+        self._prewarm_connections = config.fraud.turnstile_http.prewarm_connections
+        self._cache_ttl_seconds = config.fraud.turnstile_token_cache_ttl_seconds
+        # Final verdicts keyed by the token's SHA-256, so the tokens themselves are
+        # not kept in memory.
+        self._verdicts: TtlLruCache[bytes, TurnstileVerificationResult] = TtlLruCache(
+            max_size=config.fraud.turnstile_token_cache_max_size,
+            ttl_seconds=self._cache_ttl_seconds,
+        )
+        # One siteverify call per token while it is in flight.
+        self._in_flight: dict[bytes, asyncio.Task[TurnstileVerificationResult]] = {}
+        # Caps siteverify calls so a slow Cloudflare cannot take over the shared
+        # HTTP pool; at most max_queue verifies wait for a slot, the rest fail fast.
+        self._max_queue = max(0, config.fraud.turnstile_max_queue)
+        self._semaphore = asyncio.Semaphore(
+            max(1, config.fraud.turnstile_max_concurrency)
+        )
+        self._breaker = CircuitBreaker(
+            name="turnstile",
+            failure_threshold=config.fraud.turnstile_circuit_failure_threshold,
+            reset_timeout_seconds=config.fraud.turnstile_circuit_reset_seconds,
+        )
+        self._active = 0
+        self._queued = 0
+        self._peak_queued = 0
+        self._rejected = 0
+        self._short_circuited = 0
+        self._requests = 0
+        self._failures = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
 
     @property
     def provider(self) -> str:
@@ -46,6 +122,134 @@ class TurnstileVerifierService:
                 error_codes=["turnstile_not_configured"],
             )
 
+        key = sha256(token.encode("utf-8")).digest()
+        cached = self._verdicts.get(key)
+        if cached is not None:
+            return _replayed(cached)
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            # Only the caller that started the call can pass with this token.
+            return _replayed(await asyncio.shield(task))
+
+        task = asyncio.create_task(self._verify_upstream(token, remote_ip))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda done: self._finish_verify(key, done))
+        # A cancelled caller must not cancel the call other callers are awaiting.
+        return await asyncio.shield(task)
+
+    async def warm_up(self) -> None:
+        """Connect to siteverify before the first captcha needs it."""
+        if not self.is_configured():
+            return
+        await warm_up_connections(
+            self._client, self._verify_url, self._prewarm_connections
+        )
+
+    def cache_stats(self) -> CacheStats:
+        return self._verdicts.stats()
+
+    def stats(self) -> TurnstileStats:
+        return TurnstileStats(
+            in_flight=self._active,
+            queued=self._queued,
+            peak_queued=self._peak_queued,
+            rejected=self._rejected,
+            short_circuited=self._short_circuited,
+            requests=self._requests,
+            failures=self._failures,
+            avg_latency_ms=(
+                self._latency_total / self._requests * 1000 if self._requests else 0.0
+            ),
+            max_latency_ms=self._latency_max * 1000,
+            circuit_state=self._breaker.state,
+        )
+
+    def _finish_verify(
+        self,
+        key: bytes,
+        task: asyncio.Task[TurnstileVerificationResult],
+    ) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        if self._cache_ttl_seconds > 0 and _is_final(result):
+            self._verdicts.set(key, result)
+
+    async def _verify_upstream(
+        self,
+        token: str,
+        remote_ip: str | None,
+    ) -> TurnstileVerificationResult:
+        """Call siteverify within one deadline that also covers waiting for a slot."""
+        permit = self._breaker.allow_request()
+        if permit is None:
+            return self._short_circuit()
+        probe = permit == "probe"
+
+        if self._semaphore.locked() and self._queued >= self._max_queue:
+            return self._reject("Turnstile verification queue is full", probe)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._timeout
+        self._queued += 1
+        self._peak_queued = max(self._peak_queued, self._queued)
+        try:
+            async with asyncio.timeout_at(deadline):
+                await self._semaphore.acquire()
+        except TimeoutError:
+            return self._reject("Turnstile verification slot wait timed out", probe)
+        finally:
+            self._queued -= 1
+        # The circuit may have opened while this verify was queued. Until it closes
+        # again, only the half-open probe may call siteverify.
+        if not probe and self._breaker.state != "closed":
+            self._semaphore.release()
+            return self._short_circuit()
+
+        self._active += 1
+        started = perf_counter()
+        try:
+            result = await self._post(token, remote_ip, deadline)
+        finally:
+            self._active -= 1
+            self._semaphore.release()
+            elapsed = perf_counter() - started
+            self._requests += 1
+            self._latency_total += elapsed
+            self._latency_max = max(self._latency_max, elapsed)
+
+        if _is_upstream_failure(result):
+            self._failures += 1
+            self._breaker.record_failure()
+        else:
+            self._breaker.record_success()
+        return result
+
+    def _short_circuit(self) -> TurnstileVerificationResult:
+        self._short_circuited += 1
+        return TurnstileVerificationResult(
+            success=False, error_codes=[_UNAVAILABLE_ERROR_CODE]
+        )
+
+    def _reject(self, message: str, probe: bool) -> TurnstileVerificationResult:
+        if probe:
+            # The probe never reached siteverify; let the next verify probe instead.
+            self._breaker.release_probe()
+        self._rejected += 1
+        logger.warning(message, extra={"queued": self._queued})
+        return TurnstileVerificationResult(
+            success=False, error_codes=[_BUSY_ERROR_CODE]
+        )
+
+    async def _post(
+        self,
+        token: str,
+        remote_ip: str | None,
+        deadline: float,
+    ) -> TurnstileVerificationResult:
         form: dict[str, str] = {
             "secret": self._secret_key or "",
             "response": token,
@@ -54,12 +258,14 @@ class TurnstileVerifierService:
             form["remoteip"] = remote_ip
 
         try:
-            response = await self._client.post(
-                self._verify_url,
-                data=form,
-                timeout=self._timeout,
-                follow_redirects=True,
-            )
+            async with asyncio.timeout_at(deadline):
+                response = await request_with_reconnect(
+                    self._client,
+                    "POST",
+                    self._verify_url,
+                    data=form,
+                    follow_redirects=True,
+                )
         except Exception as exc:  # noqa: BLE001
             logger.warning("Turnstile verification request failed")
             logger.debug("Turnstile verification network error: %s", exc)
@@ -93,7 +299,9 @@ class TurnstileVerifierService:
         if not success and not codes and response.status_code != 200:
             codes = [f"turnstile_http_{response.status_code}"]
 
-        hostname = data.get("hostname") if isinstance(data.get("hostname"), str) else None
+        hostname = (
+            data.get("hostname") if isinstance(data.get("hostname"), str) else None
+        )
         action = data.get("action") if isinstance(data.get("action"), str) else None
 
         return TurnstileVerificationResult(
@@ -104,5 +312,33 @@ class TurnstileVerifierService:
         )
 
 
-__all__ = ("TurnstileVerificationResult", "TurnstileVerifierService")
+def _is_upstream_failure(result: TurnstileVerificationResult) -> bool:
+    """Whether the result says siteverify itself is unhealthy, not the token."""
+    for code in result.error_codes:
+        if code in {"internal-error", "turnstile_network_error", "turnstile_http_429"}:
+            return True
+        if code.startswith("turnstile_http_5"):
+            return True
+    return False
+
+
+def _is_final(result: TurnstileVerificationResult) -> bool:
+    return result.success or (
+        bool(result.error_codes) and _FINAL_ERROR_CODES.issuperset(result.error_codes)
+    )
+
+
+def _replayed(result: TurnstileVerificationResult) -> TurnstileVerificationResult:
+    """The verdict for a token that was already verified once.
+
+    A token passes only once, so a replay of a successful one fails the way
+    siteverify itself would answer it.
+    """
+    if not result.success:
+        return result
+    return TurnstileVerificationResult(
+        success=False, error_codes=[_DUPLICATE_ERROR_CODE]
+    )
+
 
+__all__ = ("TurnstileStats", "TurnstileVerificationResult", "TurnstileVerifierService")
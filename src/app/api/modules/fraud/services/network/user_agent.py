@@ -1,21 +1,18 @@
+from functools import lru_cache
+
+from app.api.modules.fraud.services.core.evaluation import UserAgentFacts
+from app.api.modules.fraud.services.core.markers import MARKER_FAMILIES, marker_matcher
+from app.api.modules.fraud.services.network.common import normalize_text
+
+# Traffic is dominated by a few thousand distinct User-Agents.
+UA_CLASSIFICATION_CACHE_SIZE = 8192
 
 MOBILE_UA_MARKERS = ("android", "iphone", "ipad", "ipod", "mobile")
-AUTOMATION_MARKERS = (
-    "headless",
-    "phantomjs",
-    "puppeteer",
-    "playwright",
-    "selenium",
-    "webdriver",
-)
-BOT_UA_MARKERS = ("bot", "crawler", "spider", "scrapy", "curl", "wget")
-STRONG_BOT_UA_MARKERS = (
-    "curl/",
-    "wget/",
-    "python-requests",
-    "go-http-client",
-    "httpclient",
-)
+AUTOMATION_MARKERS = MARKER_FAMILIES["automation"]
+BOT_UA_MARKERS = MARKER_FAMILIES["bot"]
+STRONG_BOT_UA_MARKERS = MARKER_FAMILIES["strong_bot"]
+
+_UA_MARKER_MATCHER = marker_matcher("automation", "bot", "strong_bot")
 
 
 def contains_any(value: str, markers: tuple[str, ...]) -> bool:
@@ -39,7 +36,9 @@ def is_desktop_mac_ua(ua: str) -> bool:
 
 
 def is_chromium_ua(ua: str) -> bool:
-    return any(token in ua for token in ("chrome/", "chromium", "crios", "edg/", "opr/"))
+    return any(
+        token in ua for token in ("chrome/", "chromium", "crios", "edg/", "opr/")
+    )
 
 
 def is_tablet_ua(ua: str) -> bool:
@@ -48,11 +47,56 @@ def is_tablet_ua(ua: str) -> bool:
     return "android" in ua and "mobile" not in ua
 
 
+def platform_family_from_user_agent(ua: str) -> str | None:
+    marker = ua.lower()
+    if "android" in marker:
+        return "android"
+    if "iphone" in marker or "ipad" in marker or "ipod" in marker:
+        return "apple"
+    if "windows" in marker:
+        return "windows"
+    if "macintosh" in marker:
+        return "apple"
+    if "cros" in marker:
+        return "chromeos"
+    if "linux" in marker:
+        return "linux"
+    return None
+
+
+@lru_cache(maxsize=UA_CLASSIFICATION_CACHE_SIZE)
+def classify_user_agent(user_agent: str) -> UserAgentFacts:
+    """Classify a raw User-Agent once and memoize the result.
+
+    Hit/miss counters are available via ``classify_user_agent.cache_info()``.
+    """
+    ua = user_agent.lower()
+    marker_hits = _UA_MARKER_MATCHER.scan(ua)
+    return UserAgentFacts(
+        lowered=ua,
+        normalized=normalize_text(user_agent),
+        is_mobile=has_mobile_ua(ua),
+        is_tablet=is_tablet_ua(ua),
+        is_android=is_android_ua(ua),
+        is_ios=is_ios_ua(ua),
+        is_desktop_mac=is_desktop_mac_ua(ua),
+        is_windows="windows" in ua,
+        is_linux="linux" in ua,
+        is_chromium=is_chromium_ua(ua),
+        platform_family=platform_family_from_user_agent(ua),
+        has_automation_marker="automation" in marker_hits,
+        has_bot_marker="bot" in marker_hits,
+        has_strong_bot_marker="strong_bot" in marker_hits,
+    )
+
+
 __all__ = (
     "AUTOMATION_MARKERS",
     "BOT_UA_MARKERS",
     "MOBILE_UA_MARKERS",
     "STRONG_BOT_UA_MARKERS",
+    "UA_CLASSIFICATION_CACHE_SIZE",
+    "classify_user_agent",
     "contains_any",
     "has_mobile_ua",
     "is_android_ua",
@@ -60,4 +104,5 @@ __all__ = (
     "is_desktop_mac_ua",
     "is_ios_ua",
     "is_tablet_ua",
+    "platform_family_from_user_agent",
 )
@@ -1,66 +1,65 @@
-from app.api.modules.fraud.schema import FraudCheckRequest, FraudSignal
-from app.api.modules.fraud.services.core import create_signal
-from app.api.modules.fraud.services.network.user_agent import is_chromium_ua
+from app.api.modules.fraud.schema import FraudSignal
+from app.api.modules.fraud.services.core import EvaluationContext, define_signal
+from app.api.modules.fraud.services.core.markers import MARKER_FAMILIES, marker_matcher
 
-SOFTWARE_RENDERER_MARKERS = ("swiftshader", "llvmpipe", "software")
+SOFTWARE_RENDERER_MARKERS = MARKER_FAMILIES["software_renderer"]
+
+_RENDERER_MARKER_MATCHER = marker_matcher("software_renderer")
+
+_LOW_CPU_CORE_COUNT = define_signal(
+    code="LOW_CPU_CORE_COUNT",
+    weight=8,
+    message="Very low CPU core count for modern browsers.",
+)
+_LOW_DEVICE_MEMORY_DESKTOP = define_signal(
+    code="LOW_DEVICE_MEMORY_DESKTOP",
+    weight=10,
+    message="Desktop-like browser with very low device memory.",
+)
+_ZERO_PLUGINS_DESKTOP = define_signal(
+    code="ZERO_PLUGINS_DESKTOP",
+    weight=12,
+    message="Desktop browser reports zero plugins.",
+)
+_SOFTWARE_WEBGL_RENDERER = define_signal(
+    code="SOFTWARE_WEBGL_RENDERER",
+    weight=25,
+    message="WebGL renderer indicates software rendering/emulation.",
+)
 
 
 class SystemFingerprintService:
     def collect(
         self,
-        payload: FraudCheckRequest,
-        ua: str,
-        is_desktop_ua: bool,
+        context: EvaluationContext,
     ) -> list[FraudSignal]:
+        payload = context.payload
+        is_desktop_ua = not context.ua.is_mobile
         signals: list[FraudSignal] = []
 
         if payload.navigator.hardware_concurrency is not None:
             if payload.navigator.hardware_concurrency <= 1:
-                signals.append(
-                    create_signal(
-                        code="LOW_CPU_CORE_COUNT",
-                        weight=8,
-                        message="Very low CPU core count for modern browsers.",
-                    )
-                )
+                signals.append(_LOW_CPU_CORE_COUNT)
 
         if (
             is_desktop_ua
             and payload.navigator.device_memory is not None
             and payload.navigator.device_memory <= 0.5
         ):
-            signals.append(
-                create_signal(
-                    code="LOW_DEVICE_MEMORY_DESKTOP",
-                    weight=10,
-                    message="Desktop-like browser with very low device memory.",
-                )
-            )
+            signals.append(_LOW_DEVICE_MEMORY_DESKTOP)
 
         if (
             is_desktop_ua
             and payload.navigator.plugins_count is not None
             and payload.navigator.plugins_count == 0
-            and is_chromium_ua(ua)
+            and context.ua.is_chromium
         ):
-            signals.append(
-                create_signal(
-                    code="ZERO_PLUGINS_DESKTOP",
-                    weight=12,
-                    message="Desktop browser reports zero plugins.",
-                )
-            )
+            signals.append(_ZERO_PLUGINS_DESKTOP)
 
         if payload.webgl and payload.webgl.renderer:
             renderer = payload.webgl.renderer.lower()
-            if any(marker in renderer for marker in SOFTWARE_RENDERER_MARKERS):
-                signals.append(
-                    create_signal(
-                        code="SOFTWARE_WEBGL_RENDERER",
-                        weight=25,
-                        message="WebGL renderer indicates software rendering/emulation.",
-                    )
-                )
+            if _RENDERER_MARKER_MATCHER.scan(renderer):
+                signals.append(_SOFTWARE_WEBGL_RENDERER)
 
         return signals
 
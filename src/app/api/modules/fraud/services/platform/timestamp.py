@@ -1,15 +1,27 @@
 from datetime import UTC, datetime, timedelta
 
-from app.api.modules.fraud.schema import FraudCheckRequest, FraudSignal
-from app.api.modules.fraud.services.core import create_signal
+from app.api.modules.fraud.schema import FraudSignal
+from app.api.modules.fraud.services.core import EvaluationContext, define_signal
+
+_CLIENT_TIMESTAMP_IN_FUTURE = define_signal(
+    code="CLIENT_TIMESTAMP_IN_FUTURE",
+    weight=12,
+    message="Client snapshot timestamp is too far in the future.",
+)
+_STALE_CLIENT_SNAPSHOT = define_signal(
+    code="STALE_CLIENT_SNAPSHOT",
+    weight=18,
+    message="Client snapshot looks stale and may be replayed.",
+)
 
 
 class TimestampConsistencyService:
     def collect(
         self,
-        payload: FraudCheckRequest,
+        context: EvaluationContext,
         now: datetime | None = None,
     ) -> list[FraudSignal]:
+        payload = context.payload
         if payload.collected_at is None:
             return []
 
@@ -19,22 +31,10 @@ class TimestampConsistencyService:
             collected_at = collected_at.replace(tzinfo=UTC)
 
         if collected_at > evaluation_time + timedelta(minutes=2):
-            return [
-                create_signal(
-                    code="CLIENT_TIMESTAMP_IN_FUTURE",
-                    weight=12,
-                    message="Client snapshot timestamp is too far in the future.",
-                )
-            ]
+            return [_CLIENT_TIMESTAMP_IN_FUTURE]
 
         if evaluation_time - collected_at > timedelta(minutes=10):
-            return [
-                create_signal(
-                    code="STALE_CLIENT_SNAPSHOT",
-                    weight=18,
-                    message="Client snapshot looks stale and may be replayed.",
-                )
-            ]
+            return [_STALE_CLIENT_SNAPSHOT]
 
         return []
 
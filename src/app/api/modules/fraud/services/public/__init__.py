@@ -1 +1,6 @@
-__all__ = ()
+from app.api.modules.fraud.services.public.collector import (
+    CollectorScript,
+    build_collector_script,
+)
+
+__all__ = ("CollectorScript", "build_collector_script")
@@ -1,5 +1,14 @@
+import gzip
+from dataclasses import dataclass
+from hashlib import sha256
+
 import rjsmin
 
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
 
 def build_collector_script(
     default_check_endpoint: str = "/fraud/check",
@@ -25,3 +34,78 @@ async function run(p){{var o=(p&&p.options)||{{}};var ce=(p&&p.checkEndpoint)||'
 g.FraudCollector={{collectSignals:collectSignals,check:check,verifyCaptcha:verifyCaptcha,getTurnstileToken:getTurnstileToken,run:run}}}})(window);"""
     return rjsmin.jsmin(raw)
 
+
+def _parse_quality(params: str) -> float:
+    for param in params.split(";"):
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "q":
+            try:
+                return min(max(float(value.strip()), 0.0), 1.0)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def _parse_accept_encoding(header: str | None) -> dict[str, float]:
+    """Map each coding in Accept-Encoding to its q-value (RFC 9110, case-insensitive)."""
+    if not header:
+        return {}
+    encodings: dict[str, float] = {}
+    for token in header.split(","):
+        name, _, params = token.partition(";")
+        name = name.strip().lower()
+        if name:
+            encodings[name] = _parse_quality(params)
+    return encodings
+
+
+@dataclass(frozen=True, slots=True)
+class CollectorScript:
+    """Prebuilt collector.js with pre-compressed variants and a content hash.
+
+    Built once per config so requests only pick a body and compare ETags.
+    """
+
+    body: bytes
+    gzip_body: bytes
+    brotli_body: bytes | None
+    version: str
+
+    @property
+    def etag(self) -> str:
+        # Weak: the gzip/brotli variants are semantically identical to the body.
+        return f'W/"{self.version}"'
+
+    @classmethod
+    def build(cls, turnstile_js_url: str) -> "CollectorScript":
+        body = build_collector_script(turnstile_js_url=turnstile_js_url).encode("utf-8")
+        return cls(
+            body=body,
+            gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+            brotli_body=brotli.compress(body) if brotli is not None else None,
+            version=sha256(body).hexdigest()[:16],
+        )
+
+    def matches(self, if_none_match: str | None) -> bool:
+        if not if_none_match:
+            return False
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate == "*" or candidate.removeprefix("W/") == f'"{self.version}"':
+                return True
+        return False
+
+    def select(self, accept_encoding: str | None) -> tuple[bytes, str | None]:
+        """Return the body and Content-Encoding best matching Accept-Encoding."""
+        encodings = _parse_accept_encoding(accept_encoding)
+        wildcard = encodings.get("*", 0.0)
+        # Codings not listed take the wildcard's q-value, so "*;q=0" refuses them.
+        candidates = [(encodings.get("gzip", wildcard), "gzip")]
+        if self.brotli_body is not None:
+            # max() keeps the first of equal candidates, so brotli, the smaller
+            # body, wins a tie.
+            candidates.insert(0, (encodings.get("br", wildcard), "br"))
+        quality, encoding = max(candidates, key=lambda candidate: candidate[0])
+        if quality <= 0:
+            return self.body, None
+        return (self.brotli_body if encoding == "br" else self.gzip_body), encoding
@@ -1,6 +1,7 @@
+import asyncio
 import logging
 from collections.abc import AsyncIterator
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 from dishka.integrations.fastapi import setup_dishka
 from fastapi import APIRouter, FastAPI
@@ -8,9 +9,18 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import register_routers
 from app.api.middleware import ApiKeyMiddleware
+from app.api.modules.fraud.services.context import GeoConsistencyService
+from app.api.modules.fraud.services.network import (
+    IpGeoClient,
+    TurnstileVerifierService,
+    persist_geo_cache,
+    persist_geo_cache_periodically,
+    restore_geo_cache,
+)
+from app.api.modules.fraud.services.public import CollectorScript
 from app.ioc import get_async_container
 from app.services.logging import setup_logging
-from app.settings import get_config
+from app.settings import Config, get_config
 
 logger = logging.getLogger(__name__)
 
@@ -18,9 +28,56 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     logger.info("Starting application...")
+    # Build and compress collector.js once, before the first request needs it.
+    await app.state.dishka_container.get(CollectorScript)
+    # Load the offline IP geolocation database and hosting ranges, if configured,
+    # at startup.
+    geo_client = await app.state.dishka_container.get(IpGeoClient)
+    await app.state.dishka_container.get(GeoConsistencyService)
+    # Open upstream connections (TCP, TLS, HTTP/2) before the first request waits.
+    # This runs in the background, so an unreachable upstream cannot delay startup
+    # by its connect timeout.
+    turnstile_verifier = await app.state.dishka_container.get(TurnstileVerifierService)
+    warm_up = asyncio.gather(geo_client.warm_up(), turnstile_verifier.warm_up())
+
+    config = await app.state.dishka_container.get(Config)
+    snapshot_path = config.fraud.ip_geolocation_cache_snapshot_path
+    snapshot_task: asyncio.Task[None] | None = None
+    if (
+        snapshot_path
+        and config.fraud.ip_geolocation_enabled
+        and config.fraud.ip_geolocation_provider == "http"
+    ):
+        # Start warm after a deploy instead of sending every IP to the provider again.
+        await restore_geo_cache(geo_client, snapshot_path)
+        snapshot_task = asyncio.create_task(
+            persist_geo_cache_periodically(
+                geo_client,
+                snapshot_path,
+                config.fraud.ip_geolocation_cache_snapshot_interval_seconds,
+            )
+        )
+
     yield
     logger.info("Shutting down application...")
 
+    warm_up.cancel()
+    with suppress(asyncio.CancelledError):
+        await warm_up
+
+    if snapshot_task is not None:
+        snapshot_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await snapshot_task
+        try:
+            saved = await persist_geo_cache(geo_client, snapshot_path)
+        except OSError as exc:
+            logger.warning("Failed to save IP geolocation cache snapshot: %s", exc)
+        else:
+            logger.info(
+                "Saved %d IP geolocation cache entries to %s", saved, snapshot_path
+            )
+
 
 def get_production_app() -> FastAPI:
     """Get the FastAPI application instance."""
@@ -33,8 +90,8 @@ def get_production_app() -> FastAPI:
         lifespan=lifespan,
     )
 
-    if config.api.api_key:
-        app.add_middleware(ApiKeyMiddleware, api_key=config.api.api_key)
+    if config.api.accepted_api_keys:
+        app.add_middleware(ApiKeyMiddleware, api_keys=config.api.accepted_api_keys)
 
     app.add_middleware(
         CORSMiddleware,
@@ -2,24 +2,26 @@
 
 from collections.abc import AsyncIterator
 
-import httpx
 from dishka import Provider, Scope, provide
 
-from app.api.modules.fraud.services.network import IpGeoClient, TurnstileVerifierService
+from app.api.modules.fraud.services.network import (
+    IpGeoClient,
+    IpGeoDatabase,
+    TurnstileVerifierService,
+    build_http_client,
+)
 from app.settings import Config
 
 
 class HttpClientsProvider(Provider):
     """Provider for HTTP clients and external service integrations.
 
-    This provider manages the lifecycle of httpx.AsyncClient and provides
-    HTTP clients for external services with proper dependency injection.
-
-    Key features:
-    - Single httpx.AsyncClient instance per APP scope (connection pooling)
-    - Automatic client cleanup on application shutdown
-    - Easy integration with custom service clients
-    - Configuration injection from Config
+    Every upstream gets its own httpx.AsyncClient, built by ``build_http_client``
+    from that upstream's ``HttpPoolConfig``:
+    - a separate connection pool, so a slow upstream cannot starve the others
+    - HTTP/2 when the server supports it, HTTP/1.1 otherwise
+    - connect/read/write/pool timeouts and pool limits from Config
+    - APP scope: one pool for the application's lifetime, closed on shutdown
 
     Usage:
         Add this provider to your IoC container in ioc.py:
@@ -33,49 +35,39 @@ class HttpClientsProvider(Provider):
     """
 
     @provide(scope=Scope.APP)
-    async def get_httpx_client(self) -> AsyncIterator[httpx.AsyncClient]:
-        """Provide httpx AsyncClient with connection pooling.
-
-        Scope: APP - single instance for the entire application lifecycle.
-        This enables connection pooling and resource reuse.
-
-        Default configuration:
-        - timeout: 30 seconds
-        - connection limits: 100 total, 20 per host
-        - http2: enabled
-        - follow_redirects: enabled
-
-        :return: Configured httpx AsyncClient instance
-        """
-        async with httpx.AsyncClient(
-            timeout=httpx.Timeout(30.0),
-            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
-            follow_redirects=True,
-        ) as client:
-            yield client
-
-    @provide(scope=Scope.APP)
-    def get_ip_geo_client(
-        self,
-        client: httpx.AsyncClient,
-        config: Config,
-    ) -> IpGeoClient:
-        return IpGeoClient(client, config)
+    async def get_ip_geo_client(self, config: Config) -> AsyncIterator[IpGeoClient]:
+        database = None
+        if (
+            config.fraud.ip_geolocation_enabled
+            and config.fraud.ip_geolocation_provider == "database"
+        ):
+            if not config.fraud.ip_geolocation_database_path:
+                raise ValueError(
+                    "ip_geolocation_database_path is required for the database provider"
+                )
+            database = IpGeoDatabase(
+                config.fraud.ip_geolocation_database_path,
+                reload_interval_seconds=(
+                    config.fraud.ip_geolocation_database_reload_interval_seconds
+                ),
+            )
+        async with build_http_client(config.fraud.ip_geolocation_http) as client:
+            yield IpGeoClient(client, config, database=database)
 
     @provide(scope=Scope.APP)
-    def get_turnstile_verifier(
+    async def get_turnstile_verifier(
         self,
-        client: httpx.AsyncClient,
         config: Config,
-    ) -> TurnstileVerifierService:
-        return TurnstileVerifierService(client, config)
+    ) -> AsyncIterator[TurnstileVerifierService]:
+        async with build_http_client(config.fraud.turnstile_http) as client:
+            yield TurnstileVerifierService(client, config)
 
-    # Add more client providers here as needed:
+    # Add more client providers here as needed, each with its own pool:
     #
-    # @provide(scope=Scope.REQUEST)
-    # def get_another_service_client(
+    # @provide(scope=Scope.APP)
+    # async def get_another_service_client(
     #     self,
-    #     client: httpx.AsyncClient,
     #     config: Config,
-    # ) -> AnotherServiceClient:
-    #     return AnotherServiceClient(client, config)
+    # ) -> AsyncIterator[AnotherServiceClient]:
+    #     async with build_http_client(config.another_service_http) as client:
+    #         yield AnotherServiceClient(client, config)
@@ -0,0 +1,94 @@
+"""Pre-warm the IP geolocation cache snapshot from a list of recent IPs.
+
+Reads one IP per line (``-`` for stdin), resolves the ones not already in the
+snapshot through the configured provider and writes the snapshot back, so the next
+start of the service begins with a warm cache.
+"""
+
+import argparse
+import asyncio
+import sys
+from collections.abc import Iterable
+
+from app.api.modules.fraud.services.network import (
+    IpGeoClient,
+    normalize_ip,
+    persist_geo_cache,
+    restore_geo_cache,
+)
+from app.api.modules.fraud.services.network.geo_snapshot import prewarm_geo_cache
+from app.ioc import get_async_container
+from app.services.logging import setup_logging
+from app.settings import get_config
+
+
+def _read_ips(lines: Iterable[str]) -> list[str]:
+    ips: dict[str, None] = {}
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        ip = normalize_ip(line)
+        if ip:
+            ips[ip] = None
+    return list(ips)
+
+
+async def _prewarm(ips: list[str], snapshot_path: str, concurrency: int) -> None:
+    container = get_async_container()
+    try:
+        client = await container.get(IpGeoClient)
+        await restore_geo_cache(client, snapshot_path)
+        resolved = await prewarm_geo_cache(client, ips, concurrency)
+        saved = await persist_geo_cache(client, snapshot_path)
+    finally:
+        await container.close()
+    print(
+        f"resolved {resolved}/{len(ips)} IPs, saved {saved} entries to {snapshot_path}"
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("ips", help="file with one IP per line, or - for stdin")
+    parser.add_argument(
+        "--snapshot",
+        help="snapshot file (default: APP__FRAUD__IP_GEOLOCATION_CACHE_SNAPSHOT_PATH)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="max lookups in flight (default and upper bound: "
+        "APP__FRAUD__IP_GEOLOCATION_MAX_CONCURRENCY)",
+    )
+    args = parser.parse_args(argv)
+
+    config = get_config()
+    setup_logging(config.env)
+    snapshot_path = args.snapshot or config.fraud.ip_geolocation_cache_snapshot_path
+    if not snapshot_path:
+        parser.error("no snapshot path: pass --snapshot or set the config option")
+    if (
+        not config.fraud.ip_geolocation_enabled
+        or config.fraud.ip_geolocation_provider != "http"
+    ):
+        parser.error("pre-warming needs ip_geolocation_enabled with the http provider")
+
+    if args.ips == "-":
+        ips = _read_ips(sys.stdin)
+    else:
+        with open(args.ips, encoding="utf-8") as file:
+            ips = _read_ips(file)
+
+    # More workers than the client's own limit would only queue on its semaphore.
+    max_concurrency = max(1, config.fraud.ip_geolocation_max_concurrency)
+    concurrency = min(args.concurrency or max_concurrency, max_concurrency)
+    try:
+        asyncio.run(_prewarm(ips, snapshot_path, concurrency))
+    except OSError as exc:
+        parser.exit(1, f"failed to save snapshot: {exc}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,5 @@
+from collections.abc import AsyncIterator
+
 from dishka import AsyncContainer, Provider, Scope, make_async_container, provide
 
 from app.api.modules.fraud.service import FraudFacadeService
@@ -12,20 +14,33 @@ from app.api.modules.fraud.services.context.geo import GeoConsistencyService
 from app.api.modules.fraud.services.context.ip import IpConsistencyService
 from app.api.modules.fraud.services.context.locale import LocaleConsistencyService
 from app.api.modules.fraud.services.core.challenge_store import (
+    CaptchaChallengeStore,
     InMemoryCaptchaChallengeStore,
 )
+from app.api.modules.fraud.services.core.redis_challenge_store import (
+    RedisCaptchaChallengeStore,
+    RedisReplayFilter,
+)
+from app.api.modules.fraud.services.core.signed_challenge_store import (
+    SignedCaptchaChallengeStore,
+)
 from app.api.modules.fraud.services.network import (
+    HostingRangeIndex,
     InMemoryIpRateLimiter,
     IpGeoClient,
+    IpRateLimiter,
     RequestIpResolver,
     TurnstileVerifierService,
 )
 from app.api.modules.fraud.services.network.headers import HeaderConsistencyService
+from app.api.modules.fraud.services.network.redis_rate_limit import RedisIpRateLimiter
 from app.api.modules.fraud.services.platform.system import SystemFingerprintService
 from app.api.modules.fraud.services.platform.timestamp import (
     TimestampConsistencyService,
 )
+from app.api.modules.fraud.services.public import CollectorScript
 from app.clients.providers import HttpClientsProvider
+from app.services.redis import RedisConnection
 from app.settings import Config, get_config
 
 
@@ -41,12 +56,37 @@ class ServicesProvider(Provider):
     """Services provider for dependency injection."""
 
     @provide(scope=Scope.APP)
-    def get_fraud_rate_limiter(self, config: Config) -> InMemoryIpRateLimiter:
+    async def get_redis_connection(
+        self, config: Config
+    ) -> AsyncIterator[RedisConnection]:
+        # Connects lazily, so the in-memory backend never opens a connection.
+        connection = RedisConnection(config.redis)
+        yield connection
+        await connection.aclose()
+
+    @provide(scope=Scope.APP)
+    def get_fraud_rate_limiter(
+        self,
+        config: Config,
+        redis_connection: RedisConnection,
+    ) -> IpRateLimiter:
+        if config.fraud.state_backend == "redis":
+            return RedisIpRateLimiter(
+                connection=redis_connection,
+                window_seconds=config.fraud.rate_limit_window_seconds,
+                max_requests_per_ip=config.fraud.rate_limit_max_requests_per_ip,
+                algorithm=config.fraud.rate_limit_algorithm,
+            )
         return InMemoryIpRateLimiter(
             window_seconds=config.fraud.rate_limit_window_seconds,
             max_requests_per_ip=config.fraud.rate_limit_max_requests_per_ip,
+            algorithm=config.fraud.rate_limit_algorithm,
         )
 
+    @provide(scope=Scope.APP)
+    def get_collector_script(self, config: Config) -> CollectorScript:
+        return CollectorScript.build(turnstile_js_url=config.fraud.turnstile_js_url)
+
     @provide(scope=Scope.APP)
     def get_request_ip_resolver(self, config: Config) -> RequestIpResolver:
         return RequestIpResolver(config)
@@ -84,13 +124,38 @@ class ServicesProvider(Provider):
         return BehaviorConsistencyService()
 
     @provide(scope=Scope.APP)
-    def get_geo_checks_service(self) -> GeoConsistencyService:
-        return GeoConsistencyService()
+    def get_geo_checks_service(self, config: Config) -> GeoConsistencyService:
+        hosting_ranges = None
+        if config.fraud.hosting_ranges_paths:
+            hosting_ranges = HostingRangeIndex(
+                config.fraud.hosting_ranges_paths,
+                reload_interval_seconds=config.fraud.hosting_ranges_reload_interval_seconds,
+            )
+        return GeoConsistencyService(hosting_ranges=hosting_ranges)
 
     @provide(scope=Scope.APP)
-    def get_captcha_challenge_store(self, config: Config) -> InMemoryCaptchaChallengeStore:
+    def get_captcha_challenge_store(
+        self,
+        config: Config,
+        redis_connection: RedisConnection,
+    ) -> CaptchaChallengeStore:
+        if config.fraud.turnstile_challenge_mode == "signed":
+            replay_filter = None
+            if config.fraud.state_backend == "redis":
+                replay_filter = RedisReplayFilter(redis_connection)
+            return SignedCaptchaChallengeStore(
+                secret=config.fraud.turnstile_challenge_secret,
+                ttl_seconds=config.fraud.turnstile_challenge_ttl_seconds,
+                replay_filter=replay_filter,
+            )
+        if config.fraud.state_backend == "redis":
+            return RedisCaptchaChallengeStore(
+                connection=redis_connection,
+                ttl_seconds=config.fraud.turnstile_challenge_ttl_seconds,
+            )
         return InMemoryCaptchaChallengeStore(
             ttl_seconds=config.fraud.turnstile_challenge_ttl_seconds,
+            max_items=config.fraud.turnstile_challenge_max_items,
         )
 
     @provide(scope=Scope.APP)
@@ -131,12 +196,12 @@ class ServicesProvider(Provider):
     def get_fraud_facade_service(
         self,
         config: Config,
-        fraud_rate_limiter: InMemoryIpRateLimiter,
+        fraud_rate_limiter: IpRateLimiter,
         request_ip_resolver: RequestIpResolver,
         client_checks: ClientChecksCollector,
         network_checks: NetworkChecksCollector,
         turnstile_verifier: TurnstileVerifierService,
-        captcha_challenge_store: InMemoryCaptchaChallengeStore,
+        captcha_challenge_store: CaptchaChallengeStore,
     ) -> FraudFacadeService:
         return FraudFacadeService(
             config=config,
@@ -0,0 +1,47 @@
+from typing import TYPE_CHECKING
+
+from app.settings import RedisConfig
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+
+class RedisConnection:
+    """Lazily created Redis client shared by the Redis-backed fraud services.
+
+    ``redis`` is an optional dependency (``pip install 'app[redis]'``). It is only
+    imported when a Redis-backed service first talks to the server, so the default
+    in-memory backend does not need it.
+    """
+
+    def __init__(self, config: RedisConfig):
+        self._config = config
+        self._client: Redis | None = None
+
+    @property
+    def client(self) -> "Redis":
+        if self._client is None:
+            try:
+                from redis.asyncio import Redis
+            except ImportError as exc:
+                raise RuntimeError(
+                    "The redis state backend requires the 'redis' package: "
+                    "pip install 'app[redis]'"
+                ) from exc
+            self._client = Redis.from_url(
+                self._config.url,
+                socket_timeout=self._config.socket_timeout_seconds,
+                socket_connect_timeout=self._config.socket_timeout_seconds,
+            )
+        return self._client
+
+    def key(self, *parts: str) -> str:
+        return ":".join((self._config.key_prefix, *parts))
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+__all__ = ("RedisConnection",)
@@ -1,9 +1,12 @@
 from functools import lru_cache
 from typing import Literal, final
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+RateLimitAlgorithm = Literal["sliding_log", "sliding_window_counter"]
+StateBackend = Literal["memory", "redis"]
+
 
 class APIConfig(BaseModel):
     title: str = "Fraud Checker API"
@@ -12,6 +15,29 @@ class APIConfig(BaseModel):
     host: str = "0.0.0.0"
     allowed_hosts: list[str] = ["*"]
     api_key: str | None = None
+    # Extra accepted keys, e.g. the previous key while clients rotate to a new one.
+    api_keys: list[str] = []
+
+    @property
+    def accepted_api_keys(self) -> list[str]:
+        keys = [self.api_key, *self.api_keys] if self.api_key else list(self.api_keys)
+        return [key for key in keys if key]
+
+
+class HttpPoolConfig(BaseModel):
+    """Connection pool and per-phase timeouts for one upstream HTTP service."""
+
+    http2: bool = True
+    max_connections: int = 32
+    max_keepalive_connections: int = 32
+    keepalive_expiry_seconds: float = 60.0
+    connect_timeout_seconds: float = 1.0
+    read_timeout_seconds: float = 2.0
+    write_timeout_seconds: float = 1.0
+    # How long a request may wait for a free connection from the pool.
+    pool_timeout_seconds: float = 1.0
+    # Connections opened at startup; one is enough when the upstream speaks HTTP/2.
+    prewarm_connections: int = 1
 
 
 class FraudConfig(BaseModel):
@@ -20,21 +46,100 @@ class FraudConfig(BaseModel):
 
     trust_forwarded_ip: bool = False
 
+    # fingerprint_id scheme: 1 (SHA-256 over JSON) or 2 (BLAKE2b, about 2x faster).
+    # Switching changes every fingerprint_id, so it is not done by default.
+    fingerprint_version: int = Field(default=1, ge=1, le=2)
+
+    # "redis" shares rate limits and captcha challenges between replicas.
+    state_backend: StateBackend = "memory"
+
     rate_limit_window_seconds: int = 60
     rate_limit_max_requests_per_ip: int = 120
+    # "sliding_window_counter" keeps O(1) memory per IP at the cost of exactness.
+    rate_limit_algorithm: RateLimitAlgorithm = "sliding_log"
 
     ip_geolocation_enabled: bool = False
+    # "database" answers from a local IP range file instead of the HTTP provider.
+    ip_geolocation_provider: Literal["http", "database"] = "http"
+    ip_geolocation_database_path: str | None = None
+    ip_geolocation_database_reload_interval_seconds: float = 60.0
     ip_geolocation_timeout_seconds: float = 1.5
     ip_geolocation_base_url: str = "https://ipapi.co"
     ip_geolocation_cache_ttl_seconds: int = 300
+    ip_geolocation_cache_max_size: int = 4096
+    # Optional cap on the approximate memory used by cached geo results.
+    ip_geolocation_cache_max_bytes: int | None = None
+    # "prefix" caches one result per IPv4/IPv6 network instead of per address.
+    ip_geolocation_cache_key: Literal["ip", "prefix"] = "ip"
+    ip_geolocation_cache_ipv4_prefix: int = 24
+    ip_geolocation_cache_ipv6_prefix: int = 48
+    # Failed lookups and provider errors are cached for this long before a retry.
+    ip_geolocation_negative_cache_ttl_seconds: int = 30
+    ip_geolocation_max_concurrency: int = 32
+    # Consecutive provider failures that open the circuit; it probes again after the reset.
+    ip_geolocation_circuit_failure_threshold: int = 5
+    ip_geolocation_circuit_reset_seconds: float = 30.0
+    # Optional file the geo cache is saved to periodically and on shutdown, and
+    # restored from on startup.
+    ip_geolocation_cache_snapshot_path: str | None = None
+    ip_geolocation_cache_snapshot_interval_seconds: float = 300.0
+    ip_geolocation_http: HttpPoolConfig = HttpPoolConfig()
+
+    # Local files of hosting, cloud, VPN and proxy ranges for HOSTING_PROVIDER_IP.
+    hosting_ranges_paths: list[str] = []
+    hosting_ranges_reload_interval_seconds: float = 60.0
 
     # Optional Turnstile captcha challenge for suspicious traffic.
     turnstile_site_key: str | None = None
     turnstile_secret_key: str | None = None
-    turnstile_verify_url: str = "https://challenges.cloudflare.com/turnstile/v0/siteverify"
-    turnstile_js_url: str = "https://challenges.cloudflare.com/turnstile/v0/api.js?render=explicit"
+    turnstile_verify_url: str = (
+        "https://challenges.cloudflare.com/turnstile/v0/siteverify"
+    )
+    turnstile_js_url: str = (
+        "https://challenges.cloudflare.com/turnstile/v0/api.js?render=explicit"
+    )
     turnstile_timeout_seconds: float = 2.0
+    # Verdicts for consumed or rejected tokens, kept by token hash so replays skip
+    # siteverify. Turnstile tokens are valid for 300 seconds.
+    turnstile_token_cache_ttl_seconds: int = 300
+    turnstile_token_cache_max_size: int = 100_000
+    # At most max_concurrency siteverify calls run at once and max_queue wait for a
+    # slot; the wait counts against turnstile_timeout_seconds.
+    turnstile_max_concurrency: int = 32
+    turnstile_max_queue: int = 256
+    # Consecutive siteverify failures that open the circuit; verifies then fail fast
+    # with turnstile_unavailable until the reset.
+    turnstile_circuit_failure_threshold: int = 5
+    turnstile_circuit_reset_seconds: float = 30.0
+    turnstile_http: HttpPoolConfig = HttpPoolConfig()
     turnstile_challenge_ttl_seconds: int = 600  # 10 minutes
+    turnstile_challenge_max_items: int = 100_000
+    # "signed" keeps challenges in HMAC-signed tokens so any replica can verify them.
+    turnstile_challenge_mode: Literal["memory", "signed"] = "memory"
+    # HMAC key for signed challenges; required in "signed" mode and must be the same
+    # on every replica.
+    turnstile_challenge_secret: str | None = None
+
+    # Cache lifetime for /fraud/collector.js; the versioned URL is always immutable.
+    collector_cache_max_age_seconds: int = 3600
+
+    @model_validator(mode="after")
+    def _require_challenge_secret(self) -> "FraudConfig":
+        if (
+            self.turnstile_challenge_mode == "signed"
+            and not self.turnstile_challenge_secret
+        ):
+            raise ValueError(
+                "turnstile_challenge_secret is required when "
+                'turnstile_challenge_mode is "signed"'
+            )
+        return self
+
+
+class RedisConfig(BaseModel):
+    url: str = "redis://localhost:6379/0"
+    key_prefix: str = "fraud"
+    socket_timeout_seconds: float = 0.5
 
 
 @final
@@ -51,6 +156,7 @@ class Config(BaseSettings):
 
     api: APIConfig = APIConfig()
     fraud: FraudConfig = FraudConfig()
+    redis: RedisConfig = RedisConfig()
 
 
 @lru_cache
@@ -0,0 +1,50 @@
+from collections.abc import AsyncIterator, Callable
+
+import pytest
+from fakeredis import FakeAsyncRedis, FakeServer
+from helpers import FakeClock, FakeGeoClientProvider, FakeGeoProvider
+
+from app.services.redis import RedisConnection
+from app.settings import RedisConfig
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+def fake_clock(monkeypatch: pytest.MonkeyPatch) -> Callable[..., FakeClock]:
+    """Patch a clock function, given by dotted path, with a ``FakeClock``."""
+
+    def install(target: str, now: float = 1000.0) -> FakeClock:
+        clock = FakeClock(now)
+        monkeypatch.setattr(target, clock)
+        return clock
+
+    return install
+
+
+@pytest.fixture
+def redis_server() -> FakeServer:
+    """In-process stand-in for a Redis server; set ``connected = False`` to fail it."""
+    return FakeServer()
+
+
+@pytest.fixture
+async def redis_connection(redis_server: FakeServer) -> AsyncIterator[RedisConnection]:
+    connection = RedisConnection(RedisConfig(key_prefix="test"))
+    connection._client = FakeAsyncRedis(server=redis_server)
+    yield connection
+    await connection.aclose()
+
+
+@pytest.fixture
+def geo() -> FakeGeoProvider:
+    return FakeGeoProvider()
+
+
+@pytest.fixture
+def geo_provider(geo: FakeGeoProvider) -> FakeGeoClientProvider:
+    """Container override serving ``IpGeoClient`` from the ``geo`` fake."""
+    return FakeGeoClientProvider(geo)
@@ -0,0 +1,73 @@
+"""Test doubles and builders shared across test modules."""
+
+import asyncio
+from collections import Counter
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+
+import httpx
+from dishka import Provider, Scope, provide
+
+from app.api.modules.fraud.schema import FraudCheckResponse
+from app.api.modules.fraud.services.core import signal_catalogue
+from app.api.modules.fraud.services.network import IpGeoClient
+from app.settings import Config
+
+
+class FakeClock:
+    """Stands in for ``monotonic``/``time``; tests move it by changing ``now``."""
+
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeGeoProvider:
+    """ipapi.co stand-in counting requests per IP; 192.0.2.0/24 gets a 503.
+
+    Responses wait for ``release``, which starts set; clear it to hold them.
+    """
+
+    def __init__(self) -> None:
+        self.calls: Counter[str] = Counter()
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        ip = request.url.path.split("/")[1]
+        self.calls[ip] += 1
+        await self.release.wait()
+        if ip.startswith("192.0.2."):
+            return httpx.Response(503)
+        return httpx.Response(200, json={"country_code": "de", "org": "Example"})
+
+
+class FakeGeoClientProvider(Provider):
+    """Points ``IpGeoClient`` at a ``FakeGeoProvider``."""
+
+    def __init__(self, geo: FakeGeoProvider):
+        super().__init__()
+        self._geo = geo
+
+    @provide(scope=Scope.APP)
+    async def get_ip_geo_client(self, config: Config) -> AsyncIterator[IpGeoClient]:
+        transport = httpx.MockTransport(self._geo)
+        async with httpx.AsyncClient(transport=transport) as client:
+            yield IpGeoClient(client, config)
+
+
+def review_response(signal_codes: list[str] | None = None) -> FraudCheckResponse:
+    """A review-band response, with the first three catalogue signals by default."""
+    catalogue = signal_catalogue()
+    codes = sorted(catalogue)[:3] if signal_codes is None else signal_codes
+    return FraudCheckResponse(
+        decision="review",
+        risk_score=55,
+        fingerprint_id="0123456789abcdef01234567",
+        request_ip="203.0.113.7",
+        ip_country_iso="DE",
+        signals=[catalogue[code] for code in codes],
+        evaluated_at=datetime.now(UTC),
+    )
@@ -0,0 +1,58 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.api.middleware import ApiKeyMiddleware
+
+
+async def _ok(request):
+    return PlainTextResponse("ok")
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = Starlette(routes=[Route("/{path:path}", _ok, methods=["GET", "POST"])])
+    app.add_middleware(ApiKeyMiddleware, api_keys=["current-key", "previous-key"])
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-API-Key": "wrong"}, {"X-API-Key": ""}])
+def test_rejects_missing_or_invalid_key(client: TestClient, headers: dict) -> None:
+    response = client.post("/fraud/check", headers=headers)
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Invalid or missing API key"}
+
+
+@pytest.mark.parametrize("key", ["current-key", "previous-key"])
+def test_accepts_every_configured_key(client: TestClient, key: str) -> None:
+    response = client.post("/fraud/check", headers={"x-api-key": key})
+    assert response.status_code == 200
+    assert response.text == "ok"
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/fraud/collector.js",
+        "/fraud/collector.0123456789abcdef.js",
+        "/openapi.json",
+        "/docs",
+        "/redoc",
+    ],
+)
+def test_exempt_paths_need_no_key(client: TestClient, path: str) -> None:
+    assert client.get(path).status_code == 200
+
+
+@pytest.mark.parametrize(
+    "path", ["/fraud/collector.x/y.js", "/docs/extra", "/fraud/check"]
+)
+def test_other_paths_need_a_key(client: TestClient, path: str) -> None:
+    assert client.get(path).status_code == 401
+
+
+def test_requires_at_least_one_key() -> None:
+    with pytest.raises(ValueError):
+        ApiKeyMiddleware(_ok, api_keys=["", ""])
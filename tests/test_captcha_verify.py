@@ -0,0 +1,286 @@
+from collections.abc import AsyncIterator, Iterator
+from datetime import UTC, datetime
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+from dishka import AsyncContainer, Provider, Scope, make_async_container, provide
+from fakeredis import FakeServer
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.api.modules.fraud.schema import (
+    CaptchaVerifyRequest,
+    FraudCheckRequest,
+    FraudCheckResponse,
+)
+from app.api.modules.fraud.service import FraudFacadeService
+from app.api.modules.fraud.services.core.challenge_store import (
+    CaptchaChallengeStore,
+    hash_origin,
+)
+from app.api.modules.fraud.services.core.signals import signal_catalogue
+from app.api.modules.fraud.services.network import TurnstileVerifierService
+from app.clients.providers import HttpClientsProvider
+from app.ioc import AppProvider, ServicesProvider
+from app.services.redis import RedisConnection
+from app.settings import Config, get_config
+
+pytestmark = pytest.mark.anyio
+
+_IP = "203.0.113.7"
+_ORIGIN = "https://shop.example"
+
+
+async def _siteverify(request: httpx.Request) -> httpx.Response:
+    token = parse_qs(request.content.decode())["response"][0]
+    if token.startswith("bad"):
+        return httpx.Response(
+            200, json={"success": False, "error-codes": ["invalid-input-response"]}
+        )
+    return httpx.Response(200, json={"success": True})
+
+
+class _SiteverifyProvider(Provider):
+    """Points the Turnstile verifier at the in-process ``_siteverify``."""
+
+    @provide(scope=Scope.APP)
+    async def get_turnstile_verifier(
+        self, config: Config
+    ) -> AsyncIterator[TurnstileVerifierService]:
+        transport = httpx.MockTransport(_siteverify)
+        async with httpx.AsyncClient(transport=transport) as client:
+            yield TurnstileVerifierService(client, config)
+
+
+@pytest.fixture
+def config(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setenv("APP__FRAUD__TURNSTILE_SITE_KEY", "site")
+    monkeypatch.setenv("APP__FRAUD__TURNSTILE_SECRET_KEY", "secret")
+    monkeypatch.setenv("APP__FRAUD__TURNSTILE_CIRCUIT_FAILURE_THRESHOLD", "1")
+    get_config.cache_clear()
+    yield
+    get_config.cache_clear()
+
+
+@pytest.fixture
+async def container(config: None) -> AsyncIterator[AsyncContainer]:
+    container = make_async_container(
+        AppProvider(), ServicesProvider(), HttpClientsProvider(), _SiteverifyProvider()
+    )
+    yield container
+    await container.close()
+
+
+def _request(origin: str = _ORIGIN) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "POST",
+            "path": "/fraud/captcha/verify",
+            "query_string": b"",
+            "headers": [(b"origin", origin.encode())],
+            "client": (_IP, 50000),
+        }
+    )
+
+
+def _review_response() -> FraudCheckResponse:
+    catalogue = signal_catalogue()
+    # Not in catalogue order, so a rebuild that reorders them is caught.
+    codes = sorted(catalogue, reverse=True)[:5]
+    return FraudCheckResponse(
+        decision="review",
+        risk_score=55,
+        fingerprint_id="fp-0123456789",
+        request_ip=_IP,
+        ip_country_iso="DE",
+        signals=[catalogue[code] for code in codes],
+        evaluated_at=datetime.now(UTC),
+    )
+
+
+async def _challenge(
+    container: AsyncContainer, response: FraudCheckResponse | None = None
+) -> str:
+    store = await container.get(CaptchaChallengeStore)
+    if response is None:
+        response = FraudCheckResponse(
+            decision="review",
+            risk_score=55,
+            fingerprint_id="fp",
+            request_ip=_IP,
+            signals=[],
+            evaluated_at=datetime.now(UTC),
+        )
+    return await store.create(response=response, request_ip=_IP, origin=_ORIGIN)
+
+
+async def _verify(
+    container: AsyncContainer,
+    challenge_id: str,
+    token: str,
+    origin: str = _ORIGIN,
+) -> FraudCheckResponse:
+    async with container() as request_container:
+        facade = await request_container.get(FraudFacadeService)
+        return await facade.verify_captcha_request(
+            request=_request(origin),
+            payload=CaptchaVerifyRequest(
+                challenge_id=challenge_id, captcha_token=token
+            ),
+        )
+
+
+async def _attempts(container: AsyncContainer, challenge_id: str) -> int:
+    store = await container.get(CaptchaChallengeStore)
+    challenge = await store.get(challenge_id)
+    assert challenge is not None
+    return challenge.attempts
+
+
+async def test_rejected_token_uses_up_an_attempt(container: AsyncContainer) -> None:
+    challenge_id = await _challenge(container)
+    response = await _verify(container, challenge_id, "bad-token-0123456789")
+    assert response.decision == "review"
+    assert response.captcha_error_codes == ["invalid-input-response"]
+    assert await _attempts(container, challenge_id) == 1
+
+
+async def test_unavailable_verification_keeps_the_attempts(
+    container: AsyncContainer,
+) -> None:
+    challenge_id = await _challenge(container)
+    verifier = await container.get(TurnstileVerifierService)
+    verifier._breaker.record_failure()
+
+    for _ in range(3):
+        response = await _verify(container, challenge_id, "good-token-0123456789")
+        assert response.decision == "review"
+        assert response.captcha_error_codes == ["turnstile_unavailable"]
+    assert await _attempts(container, challenge_id) == 0
+
+
+@pytest.fixture(params=["memory", "signed"])
+def challenge_mode(
+    request: pytest.FixtureRequest, config: None, monkeypatch: pytest.MonkeyPatch
+) -> str:
+    monkeypatch.setenv("APP__FRAUD__TURNSTILE_CHALLENGE_MODE", request.param)
+    monkeypatch.setenv("APP__FRAUD__TURNSTILE_CHALLENGE_SECRET", "challenge-secret")
+    get_config.cache_clear()
+    return request.param
+
+
+@pytest.mark.parametrize(
+    ("token", "decision"),
+    [("good-token-0123456789", "allow"), ("bad-token-0123456789", "review")],
+)
+async def test_response_is_rebuilt_from_the_snapshot(
+    challenge_mode: str, container: AsyncContainer, token: str, decision: str
+) -> None:
+    original = _review_response()
+    challenge_id = await _challenge(container, original)
+    store = await container.get(CaptchaChallengeStore)
+    challenge = await store.get(challenge_id)
+    assert challenge is not None
+    if challenge_mode == "signed":
+        # The token carries only a digest of the origin.
+        assert challenge.origin is None
+        assert challenge.origin_digest == hash_origin(_ORIGIN)
+
+    response = await _verify(
+        container, challenge_id, token, origin=" HTTPS://Shop.Example"
+    )
+    assert response.decision == decision
+    assert response.captcha_verified is (decision == "allow")
+    assert response.challenge_id == challenge_id
+    assert (response.fingerprint_id, response.risk_score) == ("fp-0123456789", 55)
+    assert (response.request_ip, response.ip_country_iso) == (_IP, "DE")
+    assert response.signals == original.signals
+
+
+async def test_snapshot_keeps_the_origin_binding(
+    challenge_mode: str, container: AsyncContainer
+) -> None:
+    challenge_id = await _challenge(container, _review_response())
+    with pytest.raises(HTTPException) as error:
+        await _verify(
+            container,
+            challenge_id,
+            "good-token-0123456789",
+            origin="https://evil.example",
+        )
+    assert error.value.detail == "captcha_challenge_origin_mismatch"
+    assert await _attempts(container, challenge_id) == 0
+
+
+class _RedisProvider(Provider):
+    """Hands out the fakeredis-backed connection from conftest."""
+
+    def __init__(self, connection: RedisConnection):
+        super().__init__()
+        self._connection = connection
+
+    @provide(scope=Scope.APP)
+    def get_redis_connection(self) -> RedisConnection:
+        return self._connection
+
+
+@pytest.fixture(params=["memory", "signed"])
+async def redis_container(
+    request: pytest.FixtureRequest,
+    config: None,
+    monkeypatch: pytest.MonkeyPatch,
+    redis_connection: RedisConnection,
+) -> AsyncIterator[AsyncContainer]:
+    monkeypatch.setenv("APP__FRAUD__STATE_BACKEND", "redis")
+    monkeypatch.setenv("APP__FRAUD__TURNSTILE_CHALLENGE_MODE", request.param)
+    monkeypatch.setenv("APP__FRAUD__TURNSTILE_CHALLENGE_SECRET", "challenge-secret")
+    # Every check lands in the review band.
+    monkeypatch.setenv("APP__FRAUD__REVIEW_SCORE_THRESHOLD", "0")
+    get_config.cache_clear()
+    container = make_async_container(
+        AppProvider(),
+        ServicesProvider(),
+        HttpClientsProvider(),
+        _SiteverifyProvider(),
+        _RedisProvider(redis_connection),
+    )
+    yield container
+    await container.close()
+
+
+# Signed challenges are issued without touching Redis.
+@pytest.mark.parametrize("redis_container", ["memory"], indirect=True)
+async def test_review_has_no_challenge_while_the_store_is_down(
+    redis_container: AsyncContainer, redis_server: FakeServer
+) -> None:
+    payload = FraudCheckRequest.model_validate(
+        {
+            "navigator": {"user_agent": "Mozilla/5.0", "language": "en-US"},
+            "screen": {"width": 1920, "height": 1080},
+            "viewport": {"width": 1200, "height": 800},
+        }
+    )
+    redis_server.connected = False
+    async with redis_container() as request_container:
+        facade = await request_container.get(FraudFacadeService)
+        response = await facade.check(payload=payload, request_ip=_IP, origin=_ORIGIN)
+
+    assert response.decision == "review"
+    assert not response.captcha_required
+    assert response.challenge_id is None
+    assert response.captcha_error_codes == ["challenge_store_unavailable"]
+
+
+@pytest.mark.parametrize("token", ["good-token-0123456789", "bad-token-0123456789"])
+async def test_verify_reports_the_store_being_down(
+    redis_container: AsyncContainer, redis_server: FakeServer, token: str
+) -> None:
+    challenge_id = await _challenge(redis_container)
+    redis_server.connected = False
+
+    with pytest.raises(HTTPException) as error:
+        await _verify(redis_container, challenge_id, token)
+    assert error.value.status_code == 503
+    assert error.value.detail == "captcha_challenge_store_unavailable"
@@ -0,0 +1,78 @@
+from collections.abc import Callable
+
+import pytest
+from helpers import FakeClock, review_response
+
+from app.api.modules.fraud.services.core.challenge_store import (
+    CaptchaChallengeStoreStats,
+    InMemoryCaptchaChallengeStore,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def clock(fake_clock: Callable[..., FakeClock]) -> FakeClock:
+    return fake_clock("app.api.modules.fraud.services.core.challenge_store.monotonic")
+
+
+async def _create(store: InMemoryCaptchaChallengeStore) -> str:
+    return await store.create(review_response(), request_ip=None, origin=None)
+
+
+async def test_challenges_expire_after_the_ttl(clock: FakeClock) -> None:
+    store = InMemoryCaptchaChallengeStore(ttl_seconds=600)
+    challenge_id = await _create(store)
+    clock.now += 599
+    assert await store.get(challenge_id) is not None
+
+    clock.now += 1
+    assert await store.get(challenge_id) is None
+    assert await store.increment_attempts(challenge_id) is None
+    assert store.stats() == CaptchaChallengeStoreStats(live=0, expired=1, evicted=0)
+
+
+async def test_create_purges_expired_challenges(clock: FakeClock) -> None:
+    store = InMemoryCaptchaChallengeStore(ttl_seconds=600)
+    old = [await _create(store) for _ in range(3)]
+    clock.now += 300
+    recent = await _create(store)
+    clock.now += 300
+
+    await _create(store)
+    assert store.stats() == CaptchaChallengeStoreStats(live=2, expired=3, evicted=0)
+    assert all([await store.get(challenge_id) is None for challenge_id in old])
+    assert await store.get(recent) is not None
+
+
+async def test_evicts_the_oldest_challenge_at_the_cap(clock: FakeClock) -> None:
+    store = InMemoryCaptchaChallengeStore(ttl_seconds=600, max_items=3)
+    challenge_ids = []
+    for _ in range(5):
+        challenge_ids.append(await _create(store))
+        clock.now += 1
+
+    live = [await store.get(challenge_id) is not None for challenge_id in challenge_ids]
+    assert live == [False, False, True, True, True]
+    assert store.stats() == CaptchaChallengeStoreStats(live=3, expired=0, evicted=2)
+
+
+async def test_last_attempt_drops_the_challenge(clock: FakeClock) -> None:
+    store = InMemoryCaptchaChallengeStore(ttl_seconds=600, max_attempts=3)
+    challenge_id = await _create(store)
+    assert [await store.increment_attempts(challenge_id) for _ in range(3)] == [
+        1,
+        2,
+        3,
+    ]
+    assert await store.get(challenge_id) is None
+    assert store.stats() == CaptchaChallengeStoreStats(live=0, expired=1, evicted=0)
+
+
+async def test_consume_is_single_use(clock: FakeClock) -> None:
+    store = InMemoryCaptchaChallengeStore(ttl_seconds=600)
+    challenge_id = await _create(store)
+    consumed = await store.consume(challenge_id)
+    assert consumed is not None and consumed.risk_score == 55
+    assert await store.consume(challenge_id) is None
+    assert store.stats() == CaptchaChallengeStoreStats(live=0, expired=0, evicted=0)
@@ -0,0 +1,131 @@
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+
+import pytest
+from dishka import AsyncContainer, make_async_container
+from helpers import FakeGeoClientProvider, FakeGeoProvider
+
+from app.api.modules.fraud.schema import FraudCheckRequest
+from app.api.modules.fraud.service import FraudFacadeService
+from app.api.modules.fraud.services.collectors import (
+    ClientChecksCollector,
+    NetworkChecksCollector,
+)
+from app.api.modules.fraud.services.core import EvaluationContext
+from app.api.modules.fraud.services.network import IpGeoResult
+from app.clients.providers import HttpClientsProvider
+from app.ioc import AppProvider, ServicesProvider
+from app.settings import get_config
+
+pytestmark = pytest.mark.anyio
+
+_PAYLOAD = FraudCheckRequest.model_validate(
+    {
+        "navigator": {
+            "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+            "(KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+            "language": "en-US",
+            "platform": "Win32",
+        },
+        "screen": {"width": 1920, "height": 1080},
+        "viewport": {"width": 1200, "height": 800},
+    }
+)
+
+
+@pytest.fixture
+def config(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setenv("APP__FRAUD__IP_GEOLOCATION_ENABLED", "true")
+    get_config.cache_clear()
+    yield
+    get_config.cache_clear()
+
+
+@pytest.fixture
+async def facade(
+    config: None, geo: FakeGeoProvider, geo_provider: FakeGeoClientProvider
+) -> AsyncIterator[FraudFacadeService]:
+    # The provider answers once a test releases it.
+    geo.release.clear()
+    container: AsyncContainer = make_async_container(
+        AppProvider(), ServicesProvider(), HttpClientsProvider(), geo_provider
+    )
+    async with container() as request_container:
+        yield await request_container.get(FraudFacadeService)
+    await container.close()
+
+
+@pytest.fixture
+def lookups(monkeypatch: pytest.MonkeyPatch) -> list[asyncio.Task]:
+    """Records the tasks ``start_lookup`` returns."""
+    tasks: list[asyncio.Task] = []
+    start_lookup = NetworkChecksCollector.start_lookup
+
+    def recording_start_lookup(self, request_ip):
+        task = start_lookup(self, request_ip)
+        tasks.append(task)
+        return task
+
+    monkeypatch.setattr(NetworkChecksCollector, "start_lookup", recording_start_lookup)
+    return tasks
+
+
+async def test_lookup_is_sent_before_the_client_checks_run(
+    facade: FraudFacadeService,
+    geo: FakeGeoProvider,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls_during_checks: list[int] = []
+    collect = ClientChecksCollector.collect
+
+    def observing_collect(self, context: EvaluationContext):
+        calls_during_checks.append(geo.calls.total())
+        # The lookup is still waiting on the provider while the checks run.
+        geo.release.set()
+        return collect(self, context)
+
+    monkeypatch.setattr(ClientChecksCollector, "collect", observing_collect)
+    response = await facade.check(payload=_PAYLOAD, request_ip="203.0.113.7")
+    assert calls_during_checks == [1]
+    assert response.ip_country_iso == "DE"
+
+
+async def test_failing_client_checks_cancel_the_lookup(
+    facade: FraudFacadeService,
+    geo: FakeGeoProvider,
+    lookups: list[asyncio.Task],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def failing_collect(self, context: EvaluationContext):
+        raise RuntimeError("check failed")
+
+    monkeypatch.setattr(ClientChecksCollector, "collect", failing_collect)
+    with pytest.raises(RuntimeError):
+        await facade.check(payload=_PAYLOAD, request_ip="203.0.113.7")
+    await asyncio.sleep(0)
+    assert len(lookups) == 1 and lookups[0].cancelled()
+
+
+async def test_aborted_request_cancels_the_lookup_but_not_the_shared_fetch(
+    facade: FraudFacadeService,
+    geo: FakeGeoProvider,
+    lookups: list[asyncio.Task],
+) -> None:
+    aborted = asyncio.create_task(
+        facade.check(payload=_PAYLOAD, request_ip="203.0.113.7")
+    )
+    other = asyncio.create_task(
+        facade.check(payload=_PAYLOAD, request_ip="203.0.113.7")
+    )
+    await asyncio.sleep(0.01)
+    aborted.cancel()
+    await asyncio.sleep(0)
+    assert lookups[0].cancelled()
+
+    geo.release.set()
+    response = await other
+    assert response.ip_country_iso == "DE"
+    assert aborted.cancelled()
+    assert geo.calls.total() == 1
+    result: IpGeoResult | None = await lookups[1]
+    assert result is not None
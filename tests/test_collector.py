@@ -0,0 +1,74 @@
+import gzip
+
+import pytest
+
+from app.api.modules.fraud.services.public import CollectorScript
+
+
+@pytest.fixture(scope="module")
+def script() -> CollectorScript:
+    return CollectorScript.build(turnstile_js_url="https://example.test/api.js")
+
+
+def test_gzip_body_decompresses_to_the_script(script: CollectorScript) -> None:
+    assert gzip.decompress(script.gzip_body) == script.body
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        (None, None),
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("gzip, br", "br"),
+        ("*", "br"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("GZIP;Q=0.8, BR;Q=0.9", "br"),
+        ("gzip;level=1;q=0", None),
+        ("br;q=abc, gzip;q=0.1", "gzip"),
+        ("*;q=0", None),
+        ("*;Q=0", None),
+        ("* ; q=0 , gzip", "gzip"),
+    ],
+)
+def test_select_honours_accept_encoding(
+    script: CollectorScript,
+    accept_encoding: str | None,
+    expected: str | None,
+) -> None:
+    if expected == "br" and script.brotli_body is None:
+        pytest.skip("brotli is not installed")
+    bodies = {None: script.body, "gzip": script.gzip_body, "br": script.brotli_body}
+    assert script.select(accept_encoding) == (bodies[expected], expected)
+
+
+def test_brotli_is_skipped_when_unavailable(script: CollectorScript) -> None:
+    without_brotli = CollectorScript(
+        body=script.body,
+        gzip_body=script.gzip_body,
+        brotli_body=None,
+        version=script.version,
+    )
+    assert without_brotli.select("br, gzip;q=0.5") == (script.gzip_body, "gzip")
+    assert without_brotli.select("br") == (script.body, None)
+
+
+@pytest.mark.parametrize(
+    ("if_none_match", "expected"),
+    [
+        (None, False),
+        ("*", True),
+        ('"other"', False),
+        ('"other", W/"{version}"', True),
+        ('"{version}"', True),
+    ],
+)
+def test_matches_if_none_match(
+    script: CollectorScript,
+    if_none_match: str | None,
+    expected: bool,
+) -> None:
+    if if_none_match is not None:
+        if_none_match = if_none_match.format(version=script.version)
+    assert script.matches(if_none_match) is expected
@@ -0,0 +1,64 @@
+import dataclasses
+
+import pytest
+
+from app.api.modules.fraud.schema import FraudCheckRequest
+from app.api.modules.fraud.services.collectors.evaluation import (
+    build_evaluation_context,
+)
+
+_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+
+
+def _payload(**navigator) -> FraudCheckRequest:
+    return FraudCheckRequest.model_validate(
+        {
+            "navigator": {"user_agent": _USER_AGENT, **navigator},
+            "screen": {"width": 1920, "height": 1080},
+            "viewport": {"width": 1200, "height": 800},
+            "client_hints": {"platform": "Windows"},
+            "client_reported_ip": " 2001:DB8::1 ",
+        }
+    )
+
+
+def test_context_holds_normalized_request_facts() -> None:
+    context = build_evaluation_context(
+        _payload(
+            language="de-DE", languages=["de-DE", "en-US", "en"], platform="Win32"
+        ),
+        "203.0.113.9",
+        {"User-Agent": "  Mozilla/5.0   Test ", "Accept-Language": "fr-CH, en;q=0.8"},
+    )
+    assert context.request_ip == "203.0.113.9"
+    assert context.client_reported_ip == "2001:db8::1"
+    assert context.headers["user-agent"] == "  Mozilla/5.0   Test "
+    assert context.header_ua_normalized == "mozilla/5.0 test"
+    assert context.navigator_platform == "win32"
+    assert context.navigator_platform_family == "windows"
+    assert context.client_hints_platform_family == "windows"
+    assert context.ua.is_windows and context.ua.is_chromium
+    assert context.language_base == "de"
+    assert context.language_bases == frozenset({"de", "en"})
+    assert context.header_primary_language_base == "fr"
+    assert context.header_language_bases == frozenset({"fr", "en"})
+
+
+def test_context_without_headers_or_languages() -> None:
+    context = build_evaluation_context(_payload(), None, None)
+    assert dict(context.headers) == {}
+    assert context.header_ua_normalized is None
+    assert context.header_primary_language_base is None
+    assert context.header_language_bases == frozenset()
+    assert context.language_base is None
+
+
+def test_context_is_immutable() -> None:
+    context = build_evaluation_context(_payload(), None, {"Accept": "*/*"})
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        context.request_ip = "203.0.113.9"  # type: ignore[misc]
+    with pytest.raises(TypeError):
+        context.headers["accept"] = "text/html"  # type: ignore[index]
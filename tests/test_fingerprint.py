@@ -0,0 +1,42 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from app.api.modules.fraud.schema import FraudCheckRequest
+from app.api.modules.fraud.services.core.utils import build_fingerprint
+
+# (payload, expected ID per scheme) pairs. The v1 IDs were produced by the
+# original SHA-256 implementation. A released scheme must keep producing exactly
+# these IDs; a change of scheme gets a new version and a new column here.
+_CORPUS = json.loads(
+    (Path(__file__).parent / "data" / "fingerprint_corpus.json").read_text("utf-8")
+)
+_VERSIONS = (1, 2)
+
+
+@pytest.mark.parametrize("version", _VERSIONS)
+def test_fingerprints_match_the_corpus(version: int) -> None:
+    mismatches = []
+    for index, entry in enumerate(_CORPUS):
+        payload = FraudCheckRequest.model_validate(entry["payload"])
+        if build_fingerprint(payload, version) != entry[f"v{version}"]:
+            mismatches.append(index)
+    assert mismatches == []
+
+
+def test_corpus_ids_are_distinct() -> None:
+    for version in _VERSIONS:
+        ids = [entry[f"v{version}"] for entry in _CORPUS]
+        assert len(set(ids)) == len(ids)
+
+
+def test_default_version_is_v1() -> None:
+    payload = FraudCheckRequest.model_validate(_CORPUS[0]["payload"])
+    assert build_fingerprint(payload) == _CORPUS[0]["v1"]
+
+
+def test_unknown_version_is_rejected() -> None:
+    payload = FraudCheckRequest.model_validate(_CORPUS[0]["payload"])
+    with pytest.raises(ValueError):
+        build_fingerprint(payload, version=3)
@@ -0,0 +1,111 @@
+from collections.abc import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.modules.fraud.services.collectors import ClientChecksCollector
+from app.application import get_production_app
+from app.settings import get_config
+
+_PAYLOAD = {
+    "navigator": {
+        "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+        "language": "en-US",
+        "languages": ["en-US", "en"],
+        "platform": "Win32",
+    },
+    "screen": {"width": 1920, "height": 1080},
+    "viewport": {"width": 1200, "height": 800},
+}
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> Iterator[TestClient]:
+    monkeypatch.setenv("APP__FRAUD__RATE_LIMIT_MAX_REQUESTS_PER_IP", "2")
+    monkeypatch.setenv("APP__API__API_KEY", "")
+    get_config.cache_clear()
+    with TestClient(get_production_app()) as client:
+        yield client
+    get_config.cache_clear()
+
+
+def _item(request_ip: str | None, user_agent: str | None = None) -> dict:
+    payload = _PAYLOAD
+    if user_agent is not None:
+        payload = {**_PAYLOAD, "navigator": {**_PAYLOAD["navigator"]}}
+        payload["navigator"]["user_agent"] = user_agent
+    return {"payload": payload, "request_ip": request_ip}
+
+
+def _check_batch(client: TestClient, items: list[dict]) -> list[dict]:
+    response = client.post("/fraud/check/batch", json={"items": items})
+    assert response.status_code == 200, response.text
+    return response.json()["results"]
+
+
+def test_results_follow_input_order(client: TestClient) -> None:
+    ips = ["203.0.113.9", "198.51.100.1", "2001:db8::5", None]
+    results = _check_batch(client, [_item(ip) for ip in ips])
+    assert [result["index"] for result in results] == [0, 1, 2, 3]
+    assert [result["result"]["request_ip"] for result in results] == ips
+    assert all(result["error"] is None for result in results)
+
+
+def test_items_share_the_per_ip_rate_limit(client: TestClient) -> None:
+    results = _check_batch(client, [_item("203.0.113.9")] * 3)
+    codes = [[s["code"] for s in result["result"]["signals"]] for result in results]
+    assert "RATE_LIMIT_EXCEEDED" not in codes[0] + codes[1]
+    assert codes[2] == ["RATE_LIMIT_EXCEEDED"]
+
+
+@pytest.mark.parametrize("request_ip", ["not-an-ip", "999.1.1.1", " ; "])
+def test_invalid_request_ip_is_not_evaluated(
+    client: TestClient, request_ip: str
+) -> None:
+    # Garbage IPs must not be a way around the limiter: the third valid item
+    # is still limited, and the invalid ones get no verdict.
+    items = [_item("203.0.113.9"), _item(request_ip), _item("203.0.113.9")]
+    items += [_item(request_ip), _item("203.0.113.9")]
+    results = _check_batch(client, items)
+    assert [result["error"] for result in results] == [
+        None,
+        "invalid_request_ip",
+        None,
+        "invalid_request_ip",
+        None,
+    ]
+    assert results[1]["result"] is None
+    assert results[4]["result"]["decision"] == "block"
+
+
+def test_failing_item_is_reported_as_check_failed(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    collect = ClientChecksCollector.collect
+
+    def collect_or_fail(self, context):
+        if "Exploding" in context.payload.navigator.user_agent:
+            raise RuntimeError("check failed")
+        return collect(self, context)
+
+    monkeypatch.setattr(ClientChecksCollector, "collect", collect_or_fail)
+    items = [
+        _item("203.0.113.1"),
+        _item("203.0.113.2", user_agent="Exploding/1.0 test agent"),
+        _item("203.0.113.3"),
+    ]
+    results = _check_batch(client, items)
+    assert [result["error"] for result in results] == [None, "check_failed", None]
+    assert results[1]["result"] is None
+    assert results[2]["result"]["request_ip"] == "203.0.113.3"
+
+
+def test_batch_is_capped_at_500_items(client: TestClient) -> None:
+    items = [_item(f"10.0.{n // 250}.{n % 250}") for n in range(500)]
+    assert len(_check_batch(client, items)) == 500
+
+    response = client.post("/fraud/check/batch", json={"items": items + items[:1]})
+    assert response.status_code == 422
+    response = client.post("/fraud/check/batch", json={"items": []})
+    assert response.status_code == 422
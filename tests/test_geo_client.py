@@ -0,0 +1,171 @@
+import asyncio
+from collections import Counter
+from time import perf_counter
+
+import httpx
+import pytest
+
+from app.api.modules.fraud.services.network import IpGeoClient
+from app.settings import Config, FraudConfig
+
+pytestmark = pytest.mark.anyio
+
+
+class _FakeProvider:
+    """Stand-in for the ipapi.co JSON API with adjustable latency and failures."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.status = 200
+        self.calls: Counter[str] = Counter()
+        # IP -> the network the provider reports it in.
+        self.networks: dict[str, str] = {}
+        self.active = 0
+        self.peak_active = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        ip = request.url.path.split("/")[1]
+        self.calls[ip] += 1
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if self.status != 200:
+            return httpx.Response(self.status, json={"error": True})
+        data = {"country_code": "de", "org": "Example Telecom", "ip": ip}
+        if ip in self.networks:
+            data["network"] = self.networks[ip]
+        return httpx.Response(200, json=data)
+
+
+def _client(provider: _FakeProvider, **fraud: object) -> IpGeoClient:
+    config = Config(fraud=FraudConfig(ip_geolocation_enabled=True, **fraud))
+    http = httpx.AsyncClient(transport=httpx.MockTransport(provider))
+    return IpGeoClient(http, config)
+
+
+async def test_burst_for_one_ip_makes_one_upstream_call() -> None:
+    provider = _FakeProvider()
+    client = _client(provider)
+    results = await asyncio.gather(*(client.resolve("203.0.113.7") for _ in range(50)))
+    assert provider.calls == {"203.0.113.7": 1}
+    assert {result.country_iso for result in results} == {"DE"}
+
+
+async def test_cancelled_waiter_does_not_cancel_the_shared_lookup() -> None:
+    provider = _FakeProvider()
+    client = _client(provider)
+    first = asyncio.create_task(client.resolve("203.0.113.7"))
+    second = asyncio.create_task(client.resolve("203.0.113.7"))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    result = await second
+    assert result is not None and result.country_iso == "DE"
+    assert first.cancelled()
+    assert provider.calls == {"203.0.113.7": 1}
+
+
+async def test_prefix_mode_coalesces_a_network() -> None:
+    provider = _FakeProvider()
+    client = _client(provider, ip_geolocation_cache_key="prefix")
+    ips = [f"198.51.100.{host}" for host in range(1, 21)]
+    results = await asyncio.gather(*(client.resolve(ip) for ip in ips))
+    assert sum(provider.calls.values()) == 1
+    assert all(result is not None for result in results)
+    await client.resolve("198.51.100.200")
+    assert sum(provider.calls.values()) == 1
+
+
+async def test_prefix_mode_does_not_share_a_narrower_answer() -> None:
+    provider = _FakeProvider()
+    provider.networks["198.51.100.1"] = "198.51.100.0/28"
+    client = _client(provider, ip_geolocation_cache_key="prefix")
+    first = asyncio.create_task(client.resolve("198.51.100.1"))
+    await asyncio.sleep(0)
+    await asyncio.gather(first, client.resolve("198.51.100.2"))
+    assert provider.calls == {"198.51.100.1": 1, "198.51.100.2": 1}
+
+
+async def test_circuit_opens_and_fails_fast() -> None:
+    provider = _FakeProvider(delay=0.01)
+    provider.status = 503
+    client = _client(
+        provider,
+        ip_geolocation_circuit_failure_threshold=3,
+        ip_geolocation_negative_cache_ttl_seconds=0,
+    )
+    for host in range(3):
+        assert await client.resolve(f"203.0.113.{host}") is None
+    assert sum(provider.calls.values()) == 3
+
+    started = perf_counter()
+    results = await asyncio.gather(
+        *(client.resolve(f"198.51.100.{host}") for host in range(100))
+    )
+    assert results == [None] * 100
+    assert sum(provider.calls.values()) == 3
+    assert perf_counter() - started < 0.05
+
+
+async def test_client_errors_do_not_open_the_circuit() -> None:
+    provider = _FakeProvider(delay=0)
+    provider.status = 404
+    client = _client(provider, ip_geolocation_circuit_failure_threshold=2)
+    for host in range(5):
+        assert await client.resolve(f"203.0.113.{host}") is None
+    assert sum(provider.calls.values()) == 5
+
+
+async def test_failures_are_negatively_cached() -> None:
+    provider = _FakeProvider(delay=0)
+    provider.status = 500
+    client = _client(provider, ip_geolocation_negative_cache_ttl_seconds=30)
+    for _ in range(3):
+        assert await client.resolve("203.0.113.7") is None
+    assert provider.calls == {"203.0.113.7": 1}
+
+
+async def test_concurrency_cap_bounds_upstream_calls() -> None:
+    provider = _FakeProvider(delay=0.02)
+    client = _client(provider, ip_geolocation_max_concurrency=4)
+    results = await asyncio.gather(
+        *(client.resolve(f"10.0.0.{host}") for host in range(20))
+    )
+    assert all(result is not None for result in results)
+    assert provider.peak_active == 4
+
+
+async def test_slot_wait_and_request_share_one_deadline() -> None:
+    provider = _FakeProvider(delay=0.3)
+    client = _client(
+        provider,
+        ip_geolocation_max_concurrency=1,
+        ip_geolocation_timeout_seconds=0.4,
+    )
+    first = asyncio.create_task(client.resolve("203.0.113.1"))
+    await asyncio.sleep(0)
+    started = perf_counter()
+    # Waits about 0.3 s for the slot, leaving 0.1 s of its 0.4 s for the request.
+    assert await client.resolve("203.0.113.2") is None
+    assert perf_counter() - started < 0.5
+    assert await first is not None
+
+
+async def test_queued_lookups_fail_fast_once_the_circuit_opens() -> None:
+    provider = _FakeProvider(delay=0.05)
+    provider.status = 503
+    client = _client(
+        provider,
+        ip_geolocation_max_concurrency=1,
+        ip_geolocation_circuit_failure_threshold=1,
+        ip_geolocation_circuit_reset_seconds=0,
+    )
+    # The first lookup opens the circuit (half-open at once, with no reset
+    # timeout); the ones queued behind it must not all probe the provider.
+    results = await asyncio.gather(
+        *(client.resolve(f"203.0.113.{host}") for host in range(5))
+    )
+    assert results == [None] * 5
+    assert sum(provider.calls.values()) == 1
@@ -0,0 +1,146 @@
+import logging
+from pathlib import Path
+
+import pytest
+
+from app.api.modules.fraud.services.network import IpGeoDatabase
+
+_HEADER = "start_ip,end_ip,country_code,org\n"
+
+
+def _database(
+    tmp_path: Path, rows: str, header: str = _HEADER, **kwargs: float
+) -> IpGeoDatabase:
+    path = tmp_path / "geo.csv"
+    path.write_text(header + rows, encoding="utf-8")
+    return IpGeoDatabase(path, **kwargs)
+
+
+def _country(database: IpGeoDatabase, ip: str) -> str | None:
+    result = database.lookup(ip)
+    return None if result is None else result.country_iso
+
+
+def test_looks_up_unsorted_ipv4_and_ipv6_ranges(tmp_path: Path) -> None:
+    database = _database(
+        tmp_path,
+        "2001:db8:1::,2001:db8:1::ffff,FR,Example\n"
+        "10.0.1.0,10.0.1.255,DE,Example\n"
+        "10.0.0.0,10.0.0.255,US,Example\n"
+        "2001:db8::,2001:db8::ffff,GB,Example\n",
+    )
+    assert len(database) == 4
+    assert _country(database, "10.0.0.7") == "US"
+    assert _country(database, "10.0.1.255") == "DE"
+    assert _country(database, "10.0.2.0") is None
+    assert _country(database, "2001:db8::1") == "GB"
+    assert _country(database, "2001:db8:1::ffff") == "FR"
+    assert _country(database, "2001:db8:2::") is None
+
+
+def test_reads_cidr_networks_and_skips_bad_rows(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    with caplog.at_level(logging.WARNING):
+        database = _database(
+            tmp_path,
+            "192.0.2.0/24,NL\nnot-a-network,NL\n",
+            header="network,country_code\n",
+        )
+    assert len(database) == 1
+    assert _country(database, "192.0.2.200") == "NL"
+    assert "Skipped 1 unparsable rows" in caplog.text
+
+
+@pytest.mark.parametrize(
+    "rows",
+    [
+        # Nested: the inner range would hide the rest of the outer one.
+        "10.0.0.0,10.0.255.255,US,Outer\n10.0.1.0,10.0.1.255,DE,Inner\n",
+        # Overlapping, listed in reverse order.
+        "10.0.128.0,10.1.0.255,DE,Inner\n10.0.0.0,10.0.255.255,US,Outer\n",
+    ],
+)
+def test_drops_overlapping_ranges_with_a_warning(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture, rows: str
+) -> None:
+    with caplog.at_level(logging.WARNING):
+        database = _database(tmp_path, rows)
+    assert len(database) == 1
+    assert "Dropped 1 ranges overlapping" in caplog.text
+    for ip in ("10.0.0.1", "10.0.1.1", "10.0.200.1"):
+        assert _country(database, ip) == "US"
+
+
+def test_drops_overlapping_ipv6_ranges(tmp_path: Path) -> None:
+    database = _database(
+        tmp_path,
+        "2001:db8::,2001:db8:ffff:ffff:ffff:ffff:ffff:ffff,US,Outer\n"
+        "2001:db8:0:1::,2001:db8:0:1:ffff:ffff:ffff:ffff,DE,Inner\n"
+        "2001:db9::,2001:db9::ffff,FR,Next\n",
+    )
+    assert len(database) == 2
+    assert _country(database, "2001:db8:0:1::5") == "US"
+    assert _country(database, "2001:db8:0:2::5") == "US"
+    assert _country(database, "2001:db9::5") == "FR"
+
+
+@pytest.mark.anyio
+async def test_reload_if_changed_swaps_in_the_new_tables(tmp_path: Path) -> None:
+    database = _database(
+        tmp_path, "10.0.0.0,10.0.0.255,US,Example\n", reload_interval_seconds=0
+    )
+    path = tmp_path / "geo.csv"
+
+    database.reload_if_changed()
+    assert database._reload_task is None
+
+    old_tables = database._tables
+    path.write_text(
+        _HEADER
+        + "10.0.0.0,10.0.0.127,DE,Example\n2001:db8::,2001:db8::ffff,FR,Example\n",
+        encoding="utf-8",
+    )
+    database.reload_if_changed()
+    assert database._reload_task is not None
+    # Lookups keep using the old tables until the reload swaps them.
+    assert _country(database, "10.0.0.200") == "US"
+    assert await database._reload_task
+    assert database._tables is not old_tables
+    assert len(database) == 2
+    assert _country(database, "10.0.0.7") == "DE"
+    assert _country(database, "10.0.0.200") is None
+    assert _country(database, "2001:db8::1") == "FR"
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("rows", ["not-an-ip,10.0.0.1,DE,Example\n", None])
+async def test_failed_reload_keeps_the_old_tables(
+    tmp_path: Path, rows: str | None
+) -> None:
+    database = _database(
+        tmp_path, "10.0.0.0,10.0.0.255,US,Example\n", reload_interval_seconds=0
+    )
+    path = tmp_path / "geo.csv"
+    if rows is None:
+        path.unlink()
+    else:
+        path.write_text(_HEADER + rows, encoding="utf-8")
+
+    database.reload_if_changed()
+    assert database._reload_task is not None
+    assert not await database._reload_task
+    assert _country(database, "10.0.0.7") == "US"
+
+
+def test_reload_is_throttled_by_the_interval(tmp_path: Path) -> None:
+    database = _database(
+        tmp_path, "10.0.0.0,10.0.0.255,US,Example\n", reload_interval_seconds=3600
+    )
+    (tmp_path / "geo.csv").write_text(
+        _HEADER + "10.0.0.0,10.0.0.255,DE,Example\n", encoding="utf-8"
+    )
+    # Not due yet, so the file is not even checked (and no event loop is needed).
+    database.reload_if_changed()
+    assert database._reload_task is None
+    assert _country(database, "10.0.0.7") == "US"
@@ -0,0 +1,146 @@
+import io
+from collections.abc import Iterator
+from pathlib import Path
+from time import time
+
+import pytest
+from dishka import AsyncContainer, make_async_container
+from helpers import FakeGeoClientProvider, FakeGeoProvider
+
+from app import geo_prewarm
+from app.api.modules.fraud.services.network import IpGeoResult
+from app.api.modules.fraud.services.network.geo_snapshot import (
+    load_geo_snapshot,
+    save_geo_snapshot,
+)
+from app.clients.providers import HttpClientsProvider
+from app.ioc import AppProvider, ServicesProvider
+from app.settings import get_config
+
+
+@pytest.fixture(autouse=True)
+def container(
+    monkeypatch: pytest.MonkeyPatch, geo_provider: FakeGeoClientProvider
+) -> Iterator[None]:
+    def get_async_container() -> AsyncContainer:
+        return make_async_container(
+            AppProvider(), ServicesProvider(), HttpClientsProvider(), geo_provider
+        )
+
+    monkeypatch.setattr(geo_prewarm, "get_async_container", get_async_container)
+    monkeypatch.setattr(geo_prewarm, "setup_logging", lambda env: None)
+    monkeypatch.setenv("APP__FRAUD__IP_GEOLOCATION_ENABLED", "true")
+    get_config.cache_clear()
+    yield
+    get_config.cache_clear()
+
+
+def _snapshot_ips(path: Path) -> list[str]:
+    return [ip for ip, _, _ in load_geo_snapshot(path, time())]
+
+
+def test_resolves_the_listed_ips_into_the_snapshot(
+    tmp_path: Path, geo: FakeGeoProvider, capsys: pytest.CaptureFixture[str]
+) -> None:
+    ips = tmp_path / "ips.txt"
+    ips.write_text(
+        "# recent clients\n198.51.100.7\n\n 2001:DB8::1 \n198.51.100.7\n"
+        "not-an-ip\n192.0.2.1\n",
+        encoding="utf-8",
+    )
+    snapshot = tmp_path / "geo-cache.ndjson"
+
+    assert geo_prewarm.main([str(ips), "--snapshot", str(snapshot)]) == 0
+    assert geo.calls == {"198.51.100.7": 1, "2001:db8::1": 1, "192.0.2.1": 1}
+    # The failed lookup is saved too, as a negative cache entry.
+    assert sorted(_snapshot_ips(snapshot)) == [
+        "192.0.2.1",
+        "198.51.100.7",
+        "2001:db8::1",
+    ]
+    assert f"resolved 2/3 IPs, saved 3 entries to {snapshot}" in capsys.readouterr().out
+
+
+def test_skips_ips_already_in_the_snapshot(
+    tmp_path: Path, geo: FakeGeoProvider, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    snapshot = tmp_path / "geo-cache.ndjson"
+    cached = IpGeoResult("NL", False, None, None, None, None)
+    save_geo_snapshot(snapshot, [("198.51.100.7", cached, 300.0)], now=time())
+    monkeypatch.setenv("APP__FRAUD__IP_GEOLOCATION_CACHE_SNAPSHOT_PATH", str(snapshot))
+    monkeypatch.setattr("sys.stdin", io.StringIO("198.51.100.7\n198.51.100.8\n"))
+    get_config.cache_clear()
+
+    assert geo_prewarm.main(["-"]) == 0
+    assert geo.calls == {"198.51.100.8": 1}
+    assert sorted(_snapshot_ips(snapshot)) == ["198.51.100.7", "198.51.100.8"]
+
+
+@pytest.mark.parametrize(
+    ("env", "message"),
+    [
+        ({}, "no snapshot path"),
+        (
+            {
+                "APP__FRAUD__IP_GEOLOCATION_CACHE_SNAPSHOT_PATH": "geo.ndjson",
+                "APP__FRAUD__IP_GEOLOCATION_ENABLED": "false",
+            },
+            "needs ip_geolocation_enabled",
+        ),
+    ],
+)
+def test_rejects_an_unusable_config(
+    tmp_path: Path,
+    geo: FakeGeoProvider,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    env: dict[str, str],
+    message: str,
+) -> None:
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    get_config.cache_clear()
+    ips = tmp_path / "ips.txt"
+    ips.write_text("198.51.100.7\n", encoding="utf-8")
+
+    with pytest.raises(SystemExit) as exit_info:
+        geo_prewarm.main([str(ips)])
+    assert exit_info.value.code == 2
+    assert message in capsys.readouterr().err
+    assert not geo.calls
+
+
+def test_reports_a_snapshot_that_cannot_be_saved(
+    tmp_path: Path, geo: FakeGeoProvider, capsys: pytest.CaptureFixture[str]
+) -> None:
+    ips = tmp_path / "ips.txt"
+    ips.write_text("198.51.100.7\n", encoding="utf-8")
+    snapshot = tmp_path / "missing-dir" / "geo-cache.ndjson"
+
+    with pytest.raises(SystemExit) as exit_info:
+        geo_prewarm.main([str(ips), "--snapshot", str(snapshot)])
+    assert exit_info.value.code == 1
+    assert "failed to save snapshot" in capsys.readouterr().err
+
+
+def test_concurrency_is_capped_by_the_client_limit(
+    tmp_path: Path, geo: FakeGeoProvider, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    used: list[int] = []
+    prewarm = geo_prewarm._prewarm
+
+    async def recording_prewarm(ips, snapshot_path, concurrency):
+        used.append(concurrency)
+        await prewarm(ips, snapshot_path, concurrency)
+
+    monkeypatch.setattr(geo_prewarm, "_prewarm", recording_prewarm)
+    monkeypatch.setenv("APP__FRAUD__IP_GEOLOCATION_MAX_CONCURRENCY", "4")
+    get_config.cache_clear()
+    ips = tmp_path / "ips.txt"
+    ips.write_text("198.51.100.7\n", encoding="utf-8")
+    snapshot = str(tmp_path / "geo-cache.ndjson")
+
+    geo_prewarm.main([str(ips), "--snapshot", snapshot, "--concurrency", "100"])
+    geo_prewarm.main([str(ips), "--snapshot", snapshot, "--concurrency", "2"])
+    geo_prewarm.main([str(ips), "--snapshot", snapshot])
+    assert used == [4, 2, 4]
@@ -0,0 +1,228 @@
+import asyncio
+import json
+import logging
+from pathlib import Path
+from time import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.modules.fraud.services.network import (
+    IpGeoClient,
+    IpGeoResult,
+    geo_snapshot,
+    persist_geo_cache,
+    persist_geo_cache_periodically,
+    restore_geo_cache,
+)
+from app.api.modules.fraud.services.network.client import format_cache_entries
+from app.api.modules.fraud.services.network.geo_snapshot import (
+    load_geo_snapshot,
+    save_geo_snapshot,
+)
+from app.application import get_production_app
+from app.settings import Config, FraudConfig, get_config
+
+pytestmark = pytest.mark.anyio
+
+
+async def _provider(request: httpx.Request) -> httpx.Response:
+    ip = request.url.path.split("/")[1]
+    if ip.startswith("192.0.2."):
+        return httpx.Response(503)
+    return httpx.Response(200, json={"country_code": "nl", "org": "Example"})
+
+
+def _client(**fraud: object) -> IpGeoClient:
+    config = Config(fraud=FraudConfig(ip_geolocation_enabled=True, **fraud))
+    http = httpx.AsyncClient(transport=httpx.MockTransport(_provider))
+    return IpGeoClient(http, config)
+
+
+@pytest.mark.parametrize("cache_key", ["ip", "prefix"])
+async def test_persisted_cache_restores_into_a_new_client(
+    tmp_path: Path, cache_key: str
+) -> None:
+    path = tmp_path / "geo-cache.ndjson"
+    client = _client(ip_geolocation_cache_key=cache_key)
+    ips = ["198.51.100.7", "2001:db8::1", "192.0.2.1"]
+    await asyncio.gather(*(client.resolve(ip) for ip in ips))
+    assert await persist_geo_cache(client, path) == 3
+
+    restored = _client(ip_geolocation_cache_key=cache_key)
+    assert await restore_geo_cache(restored, path) == 3
+    assert [key for key, _, _ in restored.cache_snapshot()] == [
+        key for key, _, _ in client.cache_snapshot()
+    ]
+    result = await restored.resolve("198.51.100.7")
+    assert result is not None and result.country_iso == "NL"
+    assert restored.cache_stats().hits == 1
+
+
+_RESULT = IpGeoResult(
+    country_iso="NL",
+    is_hosting=False,
+    timezone="Europe/Amsterdam",
+    utc_offset_minutes=60,
+    latitude=52.37,
+    longitude=4.89,
+)
+
+
+def test_load_drops_expired_entries(tmp_path: Path) -> None:
+    path = tmp_path / "geo-cache.ndjson"
+    entries = [
+        ("198.51.100.7", _RESULT, 10.0),
+        ("198.51.100.8", _RESULT, 300.0),
+        ("192.0.2.1", None, 30.0),
+    ]
+    assert save_geo_snapshot(path, entries, now=1000.0) == 3
+
+    assert load_geo_snapshot(path, now=1020.0) == [
+        ("198.51.100.8", _RESULT, 280.0),
+        ("192.0.2.1", None, 10.0),
+    ]
+    assert load_geo_snapshot(path, now=1300.0) == []
+
+
+async def test_restore_skips_entries_that_expired_while_stopped(
+    tmp_path: Path,
+) -> None:
+    path = tmp_path / "geo-cache.ndjson"
+    # Saved an hour ago: only the entry with a two-hour TTL is still valid.
+    entries = [("198.51.100.7", _RESULT, 300.0), ("198.51.100.8", _RESULT, 7200.0)]
+    save_geo_snapshot(path, entries, now=time() - 3600)
+
+    client = _client()
+    assert await restore_geo_cache(client, path) == 1
+    entries = format_cache_entries(client.cache_snapshot())
+    assert [ip for ip, _, _ in entries] == ["198.51.100.8"]
+
+
+def test_load_skips_corrupt_and_truncated_lines(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    path = tmp_path / "geo-cache.ndjson"
+    header = json.dumps({"format": "ip-geo-cache", "version": 1})
+    path.write_text(
+        f"{header}\n"
+        '["198.51.100.7",2000,"NL",false,null,null,null,null]\n'
+        "not json\n"
+        '"198.51.100.8"\n'
+        '["198.51.100.9",2000,"NL",false,null,null,null,null,"extra"]\n'
+        '["192.0.2.1",2000]\n'
+        # A crash while writing leaves the last line cut short.
+        '["198.51.100.10",2000,"N',
+        encoding="utf-8",
+    )
+    with caplog.at_level(logging.WARNING):
+        entries = load_geo_snapshot(path, now=1000.0)
+    assert [ip for ip, _, _ in entries] == ["198.51.100.7", "192.0.2.1"]
+    assert "Skipped 4 malformed lines" in caplog.text
+
+
+@pytest.mark.parametrize(
+    "content",
+    ['{"format": "something-else", "version": 1}\n', '{"format": "ip-geo-c'],
+)
+async def test_restore_ignores_a_file_that_is_not_a_snapshot(
+    tmp_path: Path, content: str, caplog: pytest.LogCaptureFixture
+) -> None:
+    path = tmp_path / "geo-cache.ndjson"
+    path.write_text(content, encoding="utf-8")
+    client = _client()
+    with caplog.at_level(logging.WARNING):
+        assert await restore_geo_cache(client, path) == 0
+    assert "Failed to load IP geolocation cache snapshot" in caplog.text
+    assert client.cache_snapshot() == []
+
+
+async def test_cache_is_persisted_periodically(tmp_path: Path) -> None:
+    path = tmp_path / "geo-cache.ndjson"
+    client = _client()
+    await client.resolve("198.51.100.7")
+    task = asyncio.create_task(persist_geo_cache_periodically(client, path, 0.01))
+    try:
+        await asyncio.sleep(0.05)
+        assert [ip for ip, _, _ in load_geo_snapshot(path, time())] == ["198.51.100.7"]
+
+        # Later snapshots pick up new entries.
+        await client.resolve("198.51.100.8")
+        await asyncio.sleep(0.05)
+        assert len(load_geo_snapshot(path, time())) == 2
+    finally:
+        task.cancel()
+
+
+async def test_periodic_persist_survives_a_failed_write(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    path = tmp_path / "missing-dir" / "geo-cache.ndjson"
+    task = asyncio.create_task(persist_geo_cache_periodically(_client(), path, 0.01))
+    try:
+        with caplog.at_level(logging.WARNING):
+            await asyncio.sleep(0.05)
+        assert "Failed to save IP geolocation cache snapshot" in caplog.text
+        path.parent.mkdir()
+        await asyncio.sleep(0.05)
+        assert path.exists()
+    finally:
+        task.cancel()
+
+
+async def test_periodic_persist_survives_an_unexpected_error(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    path = tmp_path / "geo-cache.ndjson"
+    failures = iter([ValueError("bad entry")])
+
+    def flaky_save(*args: object) -> int:
+        for error in failures:
+            raise error
+        return save_geo_snapshot(*args)
+
+    monkeypatch.setattr(geo_snapshot, "save_geo_snapshot", flaky_save)
+    task = asyncio.create_task(persist_geo_cache_periodically(_client(), path, 0.01))
+    try:
+        with caplog.at_level(logging.ERROR):
+            await asyncio.sleep(0.05)
+        assert "Failed to save IP geolocation cache snapshot" in caplog.text
+        assert "ValueError: bad entry" in caplog.text
+        assert not task.done()
+        assert path.exists()
+    finally:
+        task.cancel()
+
+
+def test_lifespan_restores_persists_and_saves_on_shutdown(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "geo-cache.ndjson"
+    save_geo_snapshot(path, [("198.51.100.7", _RESULT, 300.0)], now=time())
+    monkeypatch.setenv("APP__API__API_KEY", "")
+    monkeypatch.setenv("APP__FRAUD__IP_GEOLOCATION_ENABLED", "true")
+    monkeypatch.setenv("APP__FRAUD__IP_GEOLOCATION_HTTP__PREWARM_CONNECTIONS", "0")
+    monkeypatch.setenv("APP__FRAUD__IP_GEOLOCATION_CACHE_SNAPSHOT_PATH", str(path))
+    monkeypatch.setenv(
+        "APP__FRAUD__IP_GEOLOCATION_CACHE_SNAPSHOT_INTERVAL_SECONDS", "0.05"
+    )
+    get_config.cache_clear()
+    try:
+        with TestClient(get_production_app()) as client:
+            stats = client.get("/fraud/stats").json()
+            assert stats["geo_cache"]["size"] == 1
+
+            # The periodic task writes the snapshot again while serving.
+            path.unlink()
+            for _ in range(100):
+                if path.exists():
+                    break
+                client.portal.call(asyncio.sleep, 0.01)
+            assert path.exists()
+
+            path.unlink()
+        # Shutdown saves a final snapshot.
+        assert [ip for ip, _, _ in load_geo_snapshot(path, time())] == ["198.51.100.7"]
+    finally:
+        get_config.cache_clear()
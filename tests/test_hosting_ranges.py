@@ -0,0 +1,137 @@
+import logging
+from pathlib import Path
+
+import pytest
+
+from app.api.modules.fraud.services.network import HostingRangeIndex
+
+
+def _index(tmp_path: Path, *files: str, **kwargs: float) -> HostingRangeIndex:
+    paths = []
+    for number, content in enumerate(files):
+        path = tmp_path / f"ranges-{number}.txt"
+        path.write_text(content, encoding="utf-8")
+        paths.append(path)
+    return HostingRangeIndex(paths, **kwargs)
+
+
+def test_parses_cidrs_addresses_and_ranges(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    with caplog.at_level(logging.WARNING):
+        index = _index(
+            tmp_path,
+            "# Example Cloud, AS64496\n"
+            "203.0.113.0/24 example-cloud\n"
+            "198.51.100.7\n"
+            "192.0.2.10-192.0.2.20 AS64497\n"
+            "\n"
+            "2001:db8::/32\n"
+            "not-a-range\n"
+            "10.0.0.0/33\n"
+            "192.0.2.30-192.0.2.25\n",
+        )
+    assert len(index) == 4
+    assert "Skipped 3 unparsable hosting range lines" in caplog.text
+    assert index.contains("203.0.113.77")
+    assert index.contains("198.51.100.7")
+    assert not index.contains("198.51.100.8")
+    assert index.contains("192.0.2.15")
+    assert index.contains("2001:db8:ffff::1")
+    assert not index.contains("not-an-ip")
+
+
+def test_host_bits_of_a_cidr_are_ignored(tmp_path: Path) -> None:
+    index = _index(tmp_path, "203.0.113.77/24\n")
+    assert index.contains("203.0.113.0")
+    assert index.contains("203.0.113.255")
+
+
+def test_merges_overlapping_and_adjacent_ranges_across_files(tmp_path: Path) -> None:
+    index = _index(
+        tmp_path,
+        "10.0.0.0/24\n10.0.0.128/25\n10.0.2.0/24\n",
+        "10.0.1.0/24\n2001:db8::/48\n2001:db8:1::/48\n2001:db8:3::/48\n",
+    )
+    # 10.0.0.0-10.0.2.255, 2001:db8::/47 and 2001:db8:3::/48.
+    assert len(index) == 3
+    assert index.contains("10.0.1.128")
+    assert index.contains("2001:db8:1:ffff::1")
+    assert not index.contains("2001:db8:2::1")
+
+
+@pytest.mark.parametrize(
+    ("ip", "expected"),
+    [
+        ("198.51.99.255", False),
+        ("198.51.100.0", True),
+        ("198.51.100.255", True),
+        ("198.51.101.0", False),
+        ("0.0.0.0", True),
+        ("255.255.255.255", True),
+        ("2001:db7:ffff:ffff:ffff:ffff:ffff:ffff", False),
+        ("2001:db8::", True),
+        ("2001:db8:0:ffff:ffff:ffff:ffff:ffff", True),
+        ("2001:db8:1::", False),
+        # Ranges sharing the high 64 bits are told apart by the low half.
+        ("2001:db8:5::0:ffff", False),
+        ("2001:db8:5::1:0", True),
+        ("2001:db8:5::1:ffff", True),
+        ("2001:db8:5::2:0", False),
+        ("2001:db8:5::3:0", True),
+        ("::", True),
+        ("ffff:ffff:ffff:ffff:ffff:ffff:ffff:ffff", True),
+    ],
+)
+def test_contains_at_range_edges(tmp_path: Path, ip: str, expected: bool) -> None:
+    index = _index(
+        tmp_path,
+        "0.0.0.0/32\n198.51.100.0/24\n255.255.255.255\n"
+        "::/128\n2001:db8::/48\n2001:db8:5::1:0-2001:db8:5::1:ffff\n"
+        "2001:db8:5::3:0/112\nffff:ffff:ffff:ffff:ffff:ffff:ffff:ffff/128\n",
+    )
+    assert index.contains(ip) is expected
+
+
+@pytest.mark.anyio
+async def test_reload_if_changed_swaps_in_the_new_ranges(tmp_path: Path) -> None:
+    index = _index(tmp_path, "203.0.113.0/24\n", reload_interval_seconds=0)
+    path = tmp_path / "ranges-0.txt"
+
+    index.reload_if_changed()
+    assert index._reload_task is None
+
+    path.write_text("198.51.100.0/24\n2001:db8::/32\n", encoding="utf-8")
+    index.reload_if_changed()
+    assert index._reload_task is not None
+    await index._reload_task
+    assert len(index) == 2
+    assert index.contains("198.51.100.1")
+    assert not index.contains("203.0.113.1")
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("content", ["# nothing valid\nnot-a-range\n", None])
+async def test_failed_reload_keeps_the_old_ranges(
+    tmp_path: Path, content: str | None
+) -> None:
+    index = _index(tmp_path, "203.0.113.0/24\n", reload_interval_seconds=0)
+    path = tmp_path / "ranges-0.txt"
+    if content is None:
+        path.unlink()
+    else:
+        path.write_text(content, encoding="utf-8")
+
+    index.reload_if_changed()
+    assert index._reload_task is not None
+    assert not await index._reload_task
+    assert index.contains("203.0.113.1")
+
+
+def test_reload_is_throttled_by_the_interval(tmp_path: Path) -> None:
+    index = _index(tmp_path, "203.0.113.0/24\n", reload_interval_seconds=3600)
+    (tmp_path / "ranges-0.txt").write_text("198.51.100.0/24\n", encoding="utf-8")
+    # Not due yet, so the file is not even checked (and no event loop is needed).
+    index.reload_if_changed()
+    assert index._reload_task is None
+    assert index.contains("203.0.113.1")
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from collections.abc import Callable
+from time import perf_counter
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.modules.fraud.services.network import TurnstileVerifierService
+from app.api.modules.fraud.services.network.http_pool import (
+    build_http_client,
+    request_with_reconnect,
+    warm_up_connections,
+)
+from app.application import get_production_app
+from app.settings import HttpPoolConfig, get_config
+
+_URL = "https://upstream.test/resource"
+
+
+def _client(*failures: Exception) -> tuple[httpx.AsyncClient, list[httpx.Request]]:
+    """A client whose first requests raise ``failures``, then answer 200."""
+    requests: list[httpx.Request] = []
+    pending = list(failures)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if pending:
+            raise pending.pop(0)
+        return httpx.Response(200, json={"ok": True})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler)), requests
+
+
+_CLOSED_CONNECTION = [httpx.ReadError, httpx.WriteError, httpx.RemoteProtocolError]
+
+
+def test_build_http_client_applies_the_pool_config() -> None:
+    config = HttpPoolConfig(
+        connect_timeout_seconds=0.5,
+        read_timeout_seconds=3,
+        write_timeout_seconds=0.75,
+        pool_timeout_seconds=0.25,
+        max_connections=7,
+        max_keepalive_connections=5,
+    )
+    client = build_http_client(config)
+    assert client.timeout == httpx.Timeout(connect=0.5, read=3, write=0.75, pool=0.25)
+    pool = client._transport._pool
+    assert (pool._max_connections, pool._max_keepalive_connections) == (7, 5)
+    assert pool._http2
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("error", _CLOSED_CONNECTION)
+async def test_retries_once_on_a_closed_connection(
+    error: Callable[[str], Exception],
+) -> None:
+    client, requests = _client(error("connection closed"))
+    response = await request_with_reconnect(client, "POST", _URL, data={"a": "1"})
+    assert response.status_code == 200
+    assert len(requests) == 2
+    assert requests[1].content == b"a=1"
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("error", _CLOSED_CONNECTION)
+async def test_does_not_retry_twice(error: Callable[[str], Exception]) -> None:
+    client, requests = _client(error("closed"), error("closed again"))
+    with pytest.raises(error):
+        await request_with_reconnect(client, "GET", _URL)
+    assert len(requests) == 2
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "error",
+    [httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadTimeout, httpx.PoolTimeout],
+)
+async def test_does_not_retry_other_errors(error: Callable[[str], Exception]) -> None:
+    client, requests = _client(error("failed"))
+    with pytest.raises(error):
+        await request_with_reconnect(client, "GET", _URL)
+    assert len(requests) == 1
+
+
+@pytest.mark.anyio
+async def test_warm_up_sends_head_requests() -> None:
+    client, requests = _client()
+    assert await warm_up_connections(client, _URL, 3) == 3
+    assert [request.method for request in requests] == ["HEAD"] * 3
+    assert await warm_up_connections(client, _URL, 0) == 0
+
+
+@pytest.mark.anyio
+async def test_warm_up_swallows_failures(caplog: pytest.LogCaptureFixture) -> None:
+    client, requests = _client(httpx.ConnectError("refused"), RuntimeError("boom"))
+    with caplog.at_level(logging.WARNING):
+        assert await warm_up_connections(client, _URL, 3) == 1
+    assert len(requests) == 3
+    assert caplog.text.count("Failed to pre-warm HTTP connection") == 2
+
+
+def test_slow_warm_up_does_not_delay_startup(monkeypatch: pytest.MonkeyPatch) -> None:
+    finished = []
+
+    async def slow_warm_up(self: TurnstileVerifierService) -> None:
+        try:
+            await asyncio.sleep(30)
+        finally:
+            finished.append(True)
+
+    monkeypatch.setattr(TurnstileVerifierService, "warm_up", slow_warm_up)
+    monkeypatch.setenv("APP__API__API_KEY", "")
+    get_config.cache_clear()
+    started = perf_counter()
+    with TestClient(get_production_app()) as client:
+        assert perf_counter() - started < 5
+        assert client.get("/fraud/stats").status_code == 200
+        assert not finished
+    # Shutdown cancels the warm-up that is still running.
+    assert finished == [True]
+    get_config.cache_clear()
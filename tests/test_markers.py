@@ -0,0 +1,105 @@
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from app.api.modules.fraud.services.core.markers import (
+    MARKER_FAMILIES,
+    MarkerMatcher,
+    load_marker_families,
+    marker_matcher,
+)
+from app.api.modules.fraud.services.network.user_agent import contains_any
+
+
+def _contains_any_families(
+    families: dict[str, tuple[str, ...]], value: str
+) -> frozenset[str]:
+    return frozenset(
+        family for family, markers in families.items() if contains_any(value, markers)
+    )
+
+
+@pytest.mark.parametrize("family", sorted(MARKER_FAMILIES))
+def test_every_marker_is_found_in_its_family(family: str) -> None:
+    matcher = marker_matcher(family)
+    for marker in MARKER_FAMILIES[family]:
+        assert matcher.scan(f"prefix {marker} suffix") == {family}
+        assert matcher.scan(marker) == {family}
+
+
+def test_scan_reports_every_family_present() -> None:
+    matcher = marker_matcher("automation", "bot", "strong_bot")
+    assert matcher.scan("mozilla/5.0 chrome/120.0 safari/537.36") == frozenset()
+    assert matcher.scan("headlesschrome/120") == {"automation"}
+    assert matcher.scan("googlebot/2.1") == {"bot"}
+    assert matcher.scan("python-requests/2.31 selenium") == {"automation", "strong_bot"}
+
+
+def test_longest_marker_still_reports_its_sub_markers() -> None:
+    # "curl/" hides "curl" at the same position; both families must be reported.
+    matcher = marker_matcher("bot", "strong_bot")
+    assert matcher.scan("curl/8.4.0") == {"bot", "strong_bot"}
+    assert matcher.scan("curl 8.4.0") == {"bot"}
+
+    nested = MarkerMatcher({"outer": ["xabcx"], "inner": ["abc"], "other": ["b"]})
+    assert nested.scan("..xabcx..") == {"outer", "inner", "other"}
+    assert nested.scan("..abc..") == {"inner", "other"}
+
+
+def test_empty_inputs() -> None:
+    assert marker_matcher("bot").scan("") == frozenset()
+    assert MarkerMatcher({}).scan("anything") == frozenset()
+    assert MarkerMatcher({"empty": ["", ""]}).scan("anything") == frozenset()
+    assert marker_matcher("no-such-family").scan("bot") == frozenset()
+
+
+def test_markers_are_matched_literally() -> None:
+    matcher = MarkerMatcher({"regex": ["a.c", "(x)", "1+1"]})
+    assert matcher.scan("abc") == frozenset()
+    assert matcher.scan("a.c") == {"regex"}
+    assert matcher.scan("(x)") == {"regex"}
+    assert matcher.scan("1+1=2") == {"regex"}
+
+
+def test_load_marker_families_lowercases_and_drops_duplicates(tmp_path: Path) -> None:
+    path = tmp_path / "markers.json"
+    path.write_text(json.dumps({"bot": ["Bot", "bot", "", "Spider"]}))
+    assert load_marker_families(path) == {"bot": ("bot", "spider")}
+
+
+def test_matches_contains_any_on_random_values() -> None:
+    rng = random.Random(11)
+    markers = [marker for family in MARKER_FAMILIES.values() for marker in family]
+    alphabet = "abcdefghijklmnopqrstuvwxyz /.-_0123456789"
+    matcher = MarkerMatcher(MARKER_FAMILIES)
+    for _ in range(5000):
+        pieces = []
+        for _ in range(rng.randint(0, 6)):
+            if rng.random() < 0.4:
+                marker = rng.choice(markers)
+                # Truncated markers exercise prefixes that must not match.
+                pieces.append(marker[: rng.randint(1, len(marker))])
+            else:
+                pieces.append("".join(rng.choices(alphabet, k=rng.randint(0, 8))))
+        value = "".join(pieces)
+        expected = _contains_any_families(MARKER_FAMILIES, value)
+        assert matcher.scan(value) == expected, value
+
+
+def test_matches_contains_any_on_synthetic_marker_sets() -> None:
+    rng = random.Random(3)
+    for _ in range(50):
+        families = {
+            f"family{index}": tuple(
+                "".join(rng.choices("abc", k=rng.randint(1, 4)))
+                for _ in range(rng.randint(1, 5))
+            )
+            for index in range(rng.randint(1, 4))
+        }
+        matcher = MarkerMatcher(families)
+        for _ in range(200):
+            value = "".join(rng.choices("abcd", k=rng.randint(0, 12)))
+            expected = _contains_any_families(families, value)
+            assert matcher.scan(value) == expected, (families, value)
@@ -0,0 +1,67 @@
+from collections.abc import Callable
+
+import pytest
+from helpers import FakeClock
+
+from app.api.modules.fraud.services.network import rate_limit
+from app.api.modules.fraud.services.network.rate_limit import InMemoryIpRateLimiter
+
+
+@pytest.fixture
+def clock(fake_clock: Callable[..., FakeClock]) -> FakeClock:
+    return fake_clock("app.api.modules.fraud.services.network.rate_limit.monotonic")
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("algorithm", ["sliding_log", "sliding_window_counter"])
+async def test_limits_each_ip_independently(clock: FakeClock, algorithm: str) -> None:
+    limiter = InMemoryIpRateLimiter(60, 3, algorithm=algorithm)
+    assert [await limiter.allow("1.1.1.1") for _ in range(4)] == [True] * 3 + [False]
+    assert await limiter.allow("2.2.2.2")
+    assert await limiter.allow(None)
+
+
+@pytest.mark.anyio
+async def test_sliding_log_frees_slots_as_the_window_slides(clock: FakeClock) -> None:
+    limiter = InMemoryIpRateLimiter(60, 2)
+    assert await limiter.allow("1.1.1.1")
+    clock.now += 30
+    assert await limiter.allow("1.1.1.1")
+    assert not await limiter.allow("1.1.1.1")
+    clock.now += 31
+    assert await limiter.allow("1.1.1.1")
+    assert not await limiter.allow("1.1.1.1")
+
+
+@pytest.mark.anyio
+async def test_window_counter_weights_the_previous_window(clock: FakeClock) -> None:
+    clock.now = 6000.0  # the start of a 60 s window
+    limiter = InMemoryIpRateLimiter(60, 10, algorithm="sliding_window_counter")
+    assert all([await limiter.allow("1.1.1.1") for _ in range(10)])
+    # Halfway into the next window, half of the previous 10 still count.
+    clock.now += 90
+    assert [await limiter.allow("1.1.1.1") for _ in range(6)] == [True] * 5 + [False]
+
+
+@pytest.mark.anyio
+async def test_allow_many_consumes_slots_in_input_order(clock: FakeClock) -> None:
+    limiter = InMemoryIpRateLimiter(60, 2)
+    decisions = await limiter.allow_many(["a", None, "a", "b", "a", ""])
+    assert decisions == [True, True, True, True, False, True]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("algorithm", ["sliding_log", "sliding_window_counter"])
+async def test_stale_ips_are_purged_incrementally(
+    clock: FakeClock, algorithm: str
+) -> None:
+    limiter = InMemoryIpRateLimiter(60, 5, algorithm=algorithm)
+    await limiter.allow_many([f"10.0.0.{index}" for index in range(100)])
+    clock.now += 180
+    for index in range(10):
+        await limiter.allow(f"10.1.0.{index}")
+    table = getattr(limiter._limiter, "events", None) or limiter._limiter.counters
+    # Each call drops only a few of the oldest stale IPs.
+    purged = 10 * rate_limit._PURGE_BATCH
+    assert len(table) == 100 + 10 - purged
+    assert next(iter(table)) == f"10.0.0.{purged}"
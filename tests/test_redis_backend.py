@@ -0,0 +1,140 @@
+import pytest
+from fakeredis import FakeServer
+from helpers import review_response
+
+from app.api.modules.fraud.services.core.challenge_store import (
+    CaptchaChallengeStoreUnavailable,
+)
+from app.api.modules.fraud.services.core.redis_challenge_store import (
+    RedisCaptchaChallengeStore,
+    RedisReplayFilter,
+)
+from app.api.modules.fraud.services.network.redis_rate_limit import (
+    RedisIpRateLimiter,
+)
+from app.services.redis import RedisConnection
+
+pytestmark = pytest.mark.anyio
+
+ALGORITHMS = ["sliding_log", "sliding_window_counter"]
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+async def test_limit_is_shared_by_replicas(
+    redis_connection: RedisConnection, algorithm: str
+) -> None:
+    first = RedisIpRateLimiter(redis_connection, 60, 3, algorithm=algorithm)
+    second = RedisIpRateLimiter(redis_connection, 60, 3, algorithm=algorithm)
+    decisions = [
+        await limiter.allow("1.1.1.1") for limiter in (first, second, first, second)
+    ]
+    assert decisions == [True, True, True, False]
+    assert await second.allow("2.2.2.2")
+    assert await first.allow(None)
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+async def test_keys_expire_with_the_window(
+    redis_connection: RedisConnection, algorithm: str
+) -> None:
+    limiter = RedisIpRateLimiter(redis_connection, 60, 3, algorithm=algorithm)
+    await limiter.allow("1.1.1.1")
+    key = redis_connection.key("rl", algorithm, "1.1.1.1")
+    assert 0 < await redis_connection.client.ttl(key) <= 120
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+async def test_allow_many_uses_one_pipeline_in_input_order(
+    redis_connection: RedisConnection, algorithm: str
+) -> None:
+    limiter = RedisIpRateLimiter(redis_connection, 60, 2, algorithm=algorithm)
+    decisions = await limiter.allow_many(["a", None, "a", "b", "a", ""])
+    assert decisions == [True, True, True, True, False, True]
+    assert await limiter.allow_many([None, ""]) == [True, True]
+
+
+async def test_limiter_fails_open_when_redis_is_down(
+    redis_server: FakeServer, redis_connection: RedisConnection
+) -> None:
+    limiter = RedisIpRateLimiter(redis_connection, 60, 1)
+    assert await limiter.allow("1.1.1.1")
+    redis_server.connected = False
+    assert await limiter.allow("1.1.1.1")
+    assert await limiter.allow_many(["1.1.1.1", "1.1.1.1"]) == [True, True]
+
+
+async def test_challenge_round_trip_with_native_ttl(
+    redis_connection: RedisConnection,
+) -> None:
+    store = RedisCaptchaChallengeStore(redis_connection, ttl_seconds=600)
+    response = review_response()
+    challenge_id = await store.create(response, "203.0.113.7", "https://shop.example")
+
+    challenge = await store.get(challenge_id)
+    assert challenge is not None
+    assert challenge.fingerprint_id == response.fingerprint_id
+    assert challenge.risk_score == 55
+    assert list(challenge.signals) == response.signals
+    assert challenge.request_ip == "203.0.113.7"
+    assert challenge.matches_origin("https://SHOP.example")
+    key = redis_connection.key("challenge", challenge_id)
+    assert 0 < await redis_connection.client.ttl(key) <= 600
+
+
+async def test_challenge_is_consumed_once_across_replicas(
+    redis_connection: RedisConnection,
+) -> None:
+    first = RedisCaptchaChallengeStore(redis_connection, ttl_seconds=600)
+    second = RedisCaptchaChallengeStore(redis_connection, ttl_seconds=600)
+    challenge_id = await first.create(review_response(), None, None)
+
+    assert await second.get(challenge_id) is not None
+    assert await second.consume(challenge_id) is not None
+    assert await first.consume(challenge_id) is None
+    assert await first.get(challenge_id) is None
+
+
+async def test_challenge_is_deleted_after_max_attempts(
+    redis_connection: RedisConnection,
+) -> None:
+    store = RedisCaptchaChallengeStore(
+        redis_connection, ttl_seconds=600, max_attempts=3
+    )
+    challenge_id = await store.create(review_response(), None, None)
+
+    assert [await store.increment_attempts(challenge_id) for _ in range(4)] == [
+        1,
+        2,
+        3,
+        None,
+    ]
+    assert await store.get(challenge_id) is None
+    assert await store.increment_attempts("missing") is None
+
+
+async def test_challenge_store_reports_redis_being_down(
+    redis_server: FakeServer, redis_connection: RedisConnection
+) -> None:
+    store = RedisCaptchaChallengeStore(redis_connection, ttl_seconds=600)
+    challenge_id = await store.create(review_response(), None, None)
+    redis_server.connected = False
+
+    with pytest.raises(CaptchaChallengeStoreUnavailable):
+        await store.create(review_response(), None, None)
+    for call in (store.get, store.increment_attempts, store.consume):
+        with pytest.raises(CaptchaChallengeStoreUnavailable):
+            await call(challenge_id)
+
+
+async def test_replay_filter_reports_redis_being_down(
+    redis_server: FakeServer, redis_connection: RedisConnection
+) -> None:
+    replay_filter = RedisReplayFilter(redis_connection)
+    redis_server.connected = False
+
+    with pytest.raises(CaptchaChallengeStoreUnavailable):
+        await replay_filter.attempts("token")
+    with pytest.raises(CaptchaChallengeStoreUnavailable):
+        await replay_filter.add_attempt("token", expires_at=1e10, max_attempts=3)
+    with pytest.raises(CaptchaChallengeStoreUnavailable):
+        await replay_filter.spend("token", expires_at=1e10, max_attempts=3)
@@ -0,0 +1,57 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.api.modules.fraud.services.core import (
+    SIGNAL_MODULES,
+    define_signal,
+    signal_catalogue,
+)
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+def _catalogue_codes_in_fresh_interpreter(setup: str) -> list[str]:
+    script = (
+        f"{setup}\n"
+        "import json\n"
+        "from app.api.modules.fraud.services.core import signals\n"
+        "print(json.dumps(sorted(signals.signal_catalogue())))\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        check=True,
+        cwd=SRC,
+        text=True,
+    )
+    return json.loads(completed.stdout)
+
+
+def test_every_module_defining_signals_is_registered() -> None:
+    defining = {
+        ".".join(path.relative_to(SRC).with_suffix("").parts)
+        for path in SRC.rglob("*.py")
+        if "define_signal(" in path.read_text(encoding="utf-8")
+    }
+    defining.discard("app.api.modules.fraud.services.core.signals")
+    assert defining == set(SIGNAL_MODULES)
+
+
+def test_catalogue_does_not_depend_on_import_order() -> None:
+    codes = _catalogue_codes_in_fresh_interpreter("")
+    assert codes == _catalogue_codes_in_fresh_interpreter("import app.ioc")
+    assert codes == sorted(signal_catalogue())
+    assert "RATE_LIMIT_EXCEEDED" in codes
+
+
+def test_define_signal_returns_the_registered_instance() -> None:
+    catalogue = signal_catalogue()
+    code = sorted(catalogue)[0]
+    signal = catalogue[code]
+    assert define_signal(code, signal.weight, signal.message) is signal
+    with pytest.raises(ValueError, match="already defined differently"):
+        define_signal(code, signal.weight + 1, signal.message)
@@ -0,0 +1,160 @@
+from collections.abc import Callable
+
+import pytest
+from helpers import FakeClock, review_response
+from pydantic import ValidationError
+
+from app.api.modules.fraud.schema import CaptchaVerifyRequest
+from app.api.modules.fraud.services.core import signal_catalogue
+from app.api.modules.fraud.services.core.redis_challenge_store import (
+    RedisReplayFilter,
+)
+from app.api.modules.fraud.services.core.signed_challenge_store import (
+    InMemoryReplayFilter,
+    SignedCaptchaChallengeStore,
+)
+from app.settings import FraudConfig
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def clock(fake_clock: Callable[..., FakeClock]) -> FakeClock:
+    return fake_clock(
+        "app.api.modules.fraud.services.core.signed_challenge_store.time",
+        now=1_700_000_000.0,
+    )
+
+
+def _store(**kwargs) -> SignedCaptchaChallengeStore:
+    return SignedCaptchaChallengeStore(secret="test-secret", ttl_seconds=600, **kwargs)
+
+
+async def test_round_trip_binds_ip_and_origin(clock: FakeClock) -> None:
+    store = _store()
+    response = review_response()
+    challenge_id = await store.create(response, "203.0.113.7", "https://Shop.Example")
+
+    challenge = await store.get(challenge_id)
+    assert challenge is not None
+    assert challenge.fingerprint_id == response.fingerprint_id
+    assert challenge.risk_score == 55
+    assert challenge.ip_country_iso == "DE"
+    assert list(challenge.signals) == response.signals
+    assert challenge.request_ip == "203.0.113.7"
+    assert challenge.origin_bound
+    assert challenge.matches_origin(" https://shop.example ")
+    assert not challenge.matches_origin("https://evil.example")
+    assert challenge.attempts == 0
+
+
+async def test_rejects_tampered_foreign_and_expired_tokens(clock: FakeClock) -> None:
+    store = _store()
+    challenge_id = await store.create(review_response(), None, None)
+    body, _, signature = challenge_id.partition(".")
+
+    assert await store.get(f"{body}x.{signature}") is None
+    assert await _store().get(challenge_id) is not None
+    assert await SignedCaptchaChallengeStore("other", 600).get(challenge_id) is None
+
+    clock.now += 601
+    assert await store.get(challenge_id) is None
+    assert await store.consume(challenge_id) is None
+
+
+async def test_consume_is_single_use(clock: FakeClock) -> None:
+    store = _store()
+    challenge_id = await store.create(review_response(), None, None)
+    assert await store.consume(challenge_id) is not None
+    assert await store.consume(challenge_id) is None
+    assert await store.get(challenge_id) is None
+    assert await store.increment_attempts(challenge_id) is None
+
+
+async def test_attempts_are_capped(clock: FakeClock) -> None:
+    store = _store(max_attempts=3)
+    challenge_id = await store.create(review_response(), None, None)
+    assert [await store.increment_attempts(challenge_id) for _ in range(4)] == [
+        1,
+        2,
+        3,
+        None,
+    ]
+    assert await store.get(challenge_id) is None
+    assert await store.consume(challenge_id) is None
+
+
+async def test_longest_possible_token_fits_the_verify_request(clock: FakeClock) -> None:
+    store = _store()
+    response = review_response(sorted(signal_catalogue()))
+    response.risk_score = 100
+    challenge_id = await store.create(
+        response,
+        "ffff:ffff:ffff:ffff:ffff:ffff:255.255.255.255",
+        "https://" + "a" * 10_000,
+    )
+    # Raises a ValidationError if the token is longer than the field allows.
+    CaptchaVerifyRequest(challenge_id=challenge_id, captcha_token="t" * 16)
+
+
+async def test_replay_filter_drops_expired_entries_in_any_spend_order(
+    clock: FakeClock,
+) -> None:
+    replay_filter = InMemoryReplayFilter()
+    now = clock.now
+    # Spent first, but expires last: it must not shield the others from pruning.
+    assert await replay_filter.spend("late", now + 600, 5)
+    for index in range(10):
+        assert await replay_filter.spend(f"early-{index}", now + 10, 5)
+    assert len(replay_filter) == 11
+
+    clock.now += 11
+    await replay_filter.add_attempt("new", clock.now + 600, 5)
+    assert len(replay_filter) == 2
+    assert not await replay_filter.spend("late", now + 600, 5)
+
+
+async def test_full_replay_filter_refuses_new_tokens_without_evicting(
+    clock: FakeClock,
+) -> None:
+    replay_filter = InMemoryReplayFilter(max_entries=2)
+    assert await replay_filter.spend("a", clock.now + 600, 5)
+    assert await replay_filter.add_attempt("b", clock.now + 600, 5) == 1
+
+    assert not await replay_filter.spend("c", clock.now + 600, 5)
+    assert await replay_filter.add_attempt("c", clock.now + 600, 5) is None
+    # Tracked tokens keep working, and spent ones stay spent.
+    assert await replay_filter.spend("b", clock.now + 600, 5)
+    assert not await replay_filter.spend("a", clock.now + 600, 5)
+
+    clock.now += 601
+    assert await replay_filter.spend("c", clock.now + 600, 5)
+
+
+async def test_redis_replay_filter_is_shared_by_replicas(redis_connection) -> None:
+    replay_filter = RedisReplayFilter(redis_connection)
+    first = _store(max_attempts=3, replay_filter=replay_filter)
+    second = _store(max_attempts=3, replay_filter=replay_filter)
+    challenge_id = await first.create(review_response(), None, None)
+
+    assert await first.increment_attempts(challenge_id) == 1
+    assert await second.increment_attempts(challenge_id) == 2
+    assert (await first.get(challenge_id)).attempts == 2
+
+    assert await second.consume(challenge_id) is not None
+    assert await first.consume(challenge_id) is None
+    assert await first.get(challenge_id) is None
+    assert await first.increment_attempts(challenge_id) is None
+
+    keys = await redis_connection.client.keys(redis_connection.key("spent", "*"))
+    assert len(keys) == 1
+    assert 0 < await redis_connection.client.ttl(keys[0]) <= 600
+
+
+def test_signed_mode_requires_its_own_secret() -> None:
+    with pytest.raises(ValidationError, match="turnstile_challenge_secret"):
+        FraudConfig(turnstile_challenge_mode="signed", turnstile_secret_key="cf")
+    config = FraudConfig(
+        turnstile_challenge_mode="signed", turnstile_challenge_secret="shared"
+    )
+    assert config.turnstile_challenge_secret == "shared"
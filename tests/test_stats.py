@@ -0,0 +1,37 @@
+from collections.abc import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.application import get_production_app
+from app.settings import get_config
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> Iterator[TestClient]:
+    monkeypatch.setenv("APP__API__API_KEY", "")
+    get_config.cache_clear()
+    with TestClient(get_production_app()) as client:
+        yield client
+    get_config.cache_clear()
+
+
+_EMPTY_CACHE = {
+    "size": 0,
+    "approx_bytes": 0,
+    "hits": 0,
+    "misses": 0,
+    "evictions": 0,
+    "expirations": 0,
+}
+
+
+def test_stats_report_cache_and_turnstile_counters(client: TestClient) -> None:
+    response = client.get("/fraud/stats")
+    assert response.status_code == 200, response.text
+    stats = response.json()
+    assert stats["geo_cache"] == _EMPTY_CACHE
+    assert stats["turnstile_cache"] == _EMPTY_CACHE
+    assert stats["turnstile"]["requests"] == 0
+    assert stats["turnstile"]["circuit_state"] == "closed"
+    assert stats["captcha_challenges"] == {"live": 0, "expired": 0, "evicted": 0}
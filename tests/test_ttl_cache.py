@@ -0,0 +1,104 @@
+from collections.abc import Callable
+
+import pytest
+from helpers import FakeClock
+
+from app.api.modules.fraud.services.core.ttl_cache import TtlLruCache, approximate_size
+
+
+@pytest.fixture
+def clock(fake_clock: Callable[..., FakeClock]) -> FakeClock:
+    return fake_clock("app.api.modules.fraud.services.core.ttl_cache.monotonic")
+
+
+def test_entries_expire_after_their_ttl(clock: FakeClock) -> None:
+    cache: TtlLruCache[str, int] = TtlLruCache(max_size=10, ttl_seconds=60)
+    cache.set("default", 1)
+    cache.set("short", 2, ttl_seconds=5)
+
+    clock.now += 5
+    assert cache.get("short") is None
+    assert cache.get("default") == 1
+
+    clock.now += 55
+    assert cache.get("default", "missing") == "missing"
+    assert len(cache) == 0
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.expirations) == (1, 2, 2)
+    assert stats.evictions == 0
+
+
+def test_evicts_the_least_recently_used_entry(clock: FakeClock) -> None:
+    cache: TtlLruCache[str, int] = TtlLruCache(max_size=3, ttl_seconds=60)
+    for value, key in enumerate("abc"):
+        cache.set(key, value)
+    assert cache.get("a") == 0
+
+    cache.set("d", 3)
+    assert [key for key, _, _ in cache.snapshot()] == ["c", "a", "d"]
+    # Overwriting a key refreshes it without evicting anything.
+    cache.set("c", 4)
+    assert [key for key, _, _ in cache.snapshot()] == ["a", "d", "c"]
+    assert cache.stats().evictions == 1
+
+
+def test_writes_drop_expired_entries_before_live_ones(clock: FakeClock) -> None:
+    cache: TtlLruCache[str, int] = TtlLruCache(max_size=2, ttl_seconds=60)
+    cache.set("stale", 1, ttl_seconds=1)
+    cache.set("live", 2)
+    clock.now += 1
+
+    cache.set("new", 3)
+    assert [key for key, _, _ in cache.snapshot()] == ["live", "new"]
+    stats = cache.stats()
+    assert (stats.expirations, stats.evictions) == (1, 0)
+
+
+def test_byte_budget_caps_the_cache(clock: FakeClock) -> None:
+    entry_size = approximate_size(1, "x" * 100)
+    cache: TtlLruCache[int, str] = TtlLruCache(
+        max_size=100, ttl_seconds=60, max_bytes=3 * entry_size
+    )
+    for key in range(1, 6):
+        cache.set(key, "x" * 100)
+
+    stats = cache.stats()
+    assert len(cache) == 3
+    assert stats.approx_bytes == 3 * entry_size
+    assert stats.evictions == 2
+    assert [key for key, _, _ in cache.snapshot()] == [3, 4, 5]
+
+    cache.clear()
+    assert cache.stats().approx_bytes == 0
+
+
+def test_get_first_returns_the_first_live_key(clock: FakeClock) -> None:
+    cache: TtlLruCache[str, str] = TtlLruCache(max_size=10, ttl_seconds=60)
+    cache.set("exact", "exact", ttl_seconds=1)
+    cache.set("prefix", "prefix")
+    assert cache.get_first(["exact", "prefix"]) == "exact"
+
+    clock.now += 1
+    assert cache.get_first(["exact", "prefix"]) == "prefix"
+    assert cache.get_first(["other", "missing"], "none") == "none"
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.expirations) == (2, 1, 1)
+    assert len(cache) == 1
+
+
+def test_snapshot_restores_lru_order_and_remaining_ttl(clock: FakeClock) -> None:
+    cache: TtlLruCache[str, int] = TtlLruCache(max_size=10, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl_seconds=10)
+    cache.set("gone", 3, ttl_seconds=1)
+    cache.get("a")
+    clock.now += 4
+
+    snapshot = cache.snapshot()
+    assert snapshot == [("b", 2, 6.0), ("a", 1, 56.0)]
+
+    restored: TtlLruCache[str, int] = TtlLruCache(max_size=1, ttl_seconds=60)
+    for key, value, remaining in snapshot:
+        restored.set(key, value, ttl_seconds=remaining)
+    # The most recently used entry survives the smaller cache.
+    assert restored.snapshot() == [("a", 1, 56.0)]
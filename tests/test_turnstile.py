@@ -0,0 +1,224 @@
+import asyncio
+from collections.abc import Callable
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+from helpers import FakeClock
+
+from app.api.modules.fraud.services.network.turnstile import TurnstileVerifierService
+from app.settings import Config, FraudConfig
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def clock(fake_clock: Callable[..., FakeClock]) -> FakeClock:
+    return fake_clock(
+        "app.api.modules.fraud.services.network.circuit_breaker.monotonic"
+    )
+
+
+class _FakeSiteverify:
+    """Stand-in for Cloudflare's siteverify; tokens in ``failing`` get a 503.
+
+    Like siteverify, it accepts a token once and answers a repeat with
+    timeout-or-duplicate; tokens in ``invalid`` are rejected outright.
+    """
+
+    def __init__(self) -> None:
+        self.tokens: list[str] = []
+        self.failing: set[str] = set()
+        self.invalid: set[str] = set()
+        # Tokens whose response waits until the event is set.
+        self.gates: dict[str, asyncio.Event] = {}
+        self._consumed: set[str] = set()
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        token = parse_qs(request.content.decode())["response"][0]
+        self.tokens.append(token)
+        if token in self.gates:
+            await self.gates[token].wait()
+        if token in self.failing:
+            return httpx.Response(503, json={"success": False})
+        if token in self.invalid:
+            return _rejected("invalid-input-response")
+        if token in self._consumed:
+            return _rejected("timeout-or-duplicate")
+        self._consumed.add(token)
+        return httpx.Response(200, json={"success": True, "hostname": "example.com"})
+
+
+def _rejected(code: str) -> httpx.Response:
+    return httpx.Response(200, json={"success": False, "error-codes": [code]})
+
+
+def _service(siteverify: _FakeSiteverify, **fraud: object) -> TurnstileVerifierService:
+    fields = {
+        "turnstile_site_key": "site",
+        "turnstile_secret_key": "secret",
+        "turnstile_circuit_failure_threshold": 1,
+        "turnstile_circuit_reset_seconds": 30,
+        **fraud,
+    }
+    config = Config(fraud=FraudConfig(**fields))
+    http = httpx.AsyncClient(transport=httpx.MockTransport(siteverify))
+    return TurnstileVerifierService(http, config)
+
+
+async def test_queued_verifies_do_not_post_while_half_open() -> None:
+    siteverify = _FakeSiteverify()
+    siteverify.failing.add("first")
+    siteverify.gates["first"] = asyncio.Event()
+    # With no reset timeout the circuit is half-open as soon as it opens.
+    service = _service(
+        siteverify,
+        turnstile_max_concurrency=1,
+        turnstile_circuit_reset_seconds=0,
+    )
+
+    first = asyncio.create_task(service.verify("first", None))
+    await asyncio.sleep(0.01)
+    # Admitted while the circuit is closed; they queue behind the first verify.
+    queued = [asyncio.create_task(service.verify(f"q{n}", None)) for n in range(3)]
+    await asyncio.sleep(0.01)
+    siteverify.gates["first"].set()
+    assert not (await first).success
+    results = await asyncio.gather(*queued)
+
+    assert siteverify.tokens == ["first"]
+    assert all(result.unavailable for result in results)
+    assert service.stats().short_circuited == 3
+
+    assert (await service.verify("probe", None)).success
+    assert siteverify.tokens == ["first", "probe"]
+    assert service.stats().circuit_state == "closed"
+
+
+async def test_rejected_probe_is_released(clock: FakeClock) -> None:
+    siteverify = _FakeSiteverify()
+    siteverify.gates["slow"] = asyncio.Event()
+    service = _service(siteverify, turnstile_max_concurrency=1, turnstile_max_queue=0)
+
+    slow = asyncio.create_task(service.verify("slow", None))
+    await asyncio.sleep(0.01)
+    service._breaker.record_failure()
+    clock.now += 30
+
+    # Each probe is turned away by the full queue and hands the probe on, so the
+    # next verify probes instead of failing fast until another reset.
+    for token in ("p1", "p2"):
+        result = await service.verify(token, None)
+        assert result.error_codes == ["turnstile_busy"]
+    assert service.stats().short_circuited == 0
+
+    siteverify.gates["slow"].set()
+    assert (await slow).success
+    assert (await service.verify("p3", None)).success
+    assert siteverify.tokens == ["slow", "p3"]
+
+
+async def test_repeated_token_is_served_from_the_cache() -> None:
+    siteverify = _FakeSiteverify()
+    siteverify.invalid.add("forged")
+    service = _service(siteverify)
+
+    assert (await service.verify("token", None)).success
+    for _ in range(3):
+        replay = await service.verify("token", None)
+        assert not replay.success
+        assert replay.error_codes == ["timeout-or-duplicate"]
+    for _ in range(2):
+        rejected = await service.verify("forged", None)
+        assert rejected.error_codes == ["invalid-input-response"]
+
+    assert siteverify.tokens == ["token", "forged"]
+    stats = service.cache_stats()
+    assert (stats.size, stats.hits) == (2, 4)
+
+
+async def test_concurrent_verifies_of_one_token_make_one_call() -> None:
+    siteverify = _FakeSiteverify()
+    siteverify.gates["token"] = asyncio.Event()
+    service = _service(siteverify)
+
+    verifies = [asyncio.create_task(service.verify("token", None)) for _ in range(5)]
+    await asyncio.sleep(0.01)
+    siteverify.gates["token"].set()
+    results = await asyncio.gather(*verifies)
+
+    assert siteverify.tokens == ["token"]
+    # The token passes once; the callers that joined the call get a duplicate.
+    assert [result.success for result in results] == [True] + [False] * 4
+    assert all(result.error_codes == ["timeout-or-duplicate"] for result in results[1:])
+
+
+async def test_failed_verdicts_are_not_cached(clock: FakeClock) -> None:
+    siteverify = _FakeSiteverify()
+    siteverify.failing.add("token")
+    service = _service(siteverify, turnstile_circuit_failure_threshold=5)
+
+    for _ in range(2):
+        result = await service.verify("token", None)
+        assert result.error_codes == ["turnstile_http_503"]
+    assert siteverify.tokens == ["token", "token"]
+
+    siteverify.failing.discard("token")
+    assert (await service.verify("token", None)).success
+    assert service.cache_stats().size == 1
+
+
+async def test_unavailable_verdicts_are_not_cached(clock: FakeClock) -> None:
+    siteverify = _FakeSiteverify()
+    service = _service(siteverify)
+    service._breaker.record_failure()
+
+    assert (await service.verify("token", None)).unavailable
+    assert siteverify.tokens == []
+    assert service.cache_stats().size == 0
+
+    clock.now += 30
+    assert (await service.verify("token", None)).success
+    assert siteverify.tokens == ["token"]
+
+
+async def test_full_queue_turns_verifies_away_as_busy() -> None:
+    siteverify = _FakeSiteverify()
+    siteverify.gates["slow"] = asyncio.Event()
+    service = _service(siteverify, turnstile_max_concurrency=1, turnstile_max_queue=1)
+
+    slow = asyncio.create_task(service.verify("slow", None))
+    await asyncio.sleep(0.01)
+    queued = asyncio.create_task(service.verify("queued", None))
+    await asyncio.sleep(0.01)
+    stats = service.stats()
+    assert (stats.in_flight, stats.queued) == (1, 1)
+
+    busy = await service.verify("busy", None)
+    assert busy.error_codes == ["turnstile_busy"]
+    assert busy.unavailable
+
+    siteverify.gates["slow"].set()
+    assert (await slow).success
+    assert (await queued).success
+    assert siteverify.tokens == ["slow", "queued"]
+    stats = service.stats()
+    assert (stats.rejected, stats.peak_queued, stats.requests) == (1, 1, 2)
+
+
+async def test_open_circuit_answers_unavailable_without_a_call(
+    clock: FakeClock,
+) -> None:
+    siteverify = _FakeSiteverify()
+    siteverify.failing.add("first")
+    service = _service(siteverify)
+
+    assert (await service.verify("first", None)).error_codes == ["turnstile_http_503"]
+    assert service.stats().circuit_state == "open"
+
+    result = await service.verify("second", None)
+    assert result.error_codes == ["turnstile_unavailable"]
+    assert result.unavailable
+    assert siteverify.tokens == ["first"]
+    stats = service.stats()
+    assert (stats.short_circuited, stats.requests, stats.failures) == (1, 1, 1)
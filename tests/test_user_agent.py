@@ -0,0 +1,168 @@
+import random
+from collections.abc import Iterator
+
+import pytest
+
+from app.api.modules.fraud.services.core import UserAgentFacts
+from app.api.modules.fraud.services.network.common import normalize_text
+from app.api.modules.fraud.services.network.user_agent import (
+    AUTOMATION_MARKERS,
+    BOT_UA_MARKERS,
+    STRONG_BOT_UA_MARKERS,
+    UA_CLASSIFICATION_CACHE_SIZE,
+    classify_user_agent,
+    contains_any,
+    has_mobile_ua,
+    is_android_ua,
+    is_chromium_ua,
+    is_desktop_mac_ua,
+    is_ios_ua,
+    is_tablet_ua,
+    platform_family_from_user_agent,
+)
+
+CHROME_WINDOWS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+SAFARI_IPHONE = (
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_1 like Mac OS X) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1"
+)
+ANDROID_TABLET = (
+    "Mozilla/5.0 (Linux; Android 14; SM-X710) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+HEADLESS_LINUX = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) HeadlessChrome/120.0.0.0 Safari/537.36"
+)
+
+
+def _parse_user_agent(user_agent: str) -> UserAgentFacts:
+    """Uncached classification as it was before the LRU table and the matcher."""
+    ua = user_agent.lower()
+    return UserAgentFacts(
+        lowered=ua,
+        normalized=normalize_text(user_agent),
+        is_mobile=has_mobile_ua(ua),
+        is_tablet=is_tablet_ua(ua),
+        is_android=is_android_ua(ua),
+        is_ios=is_ios_ua(ua),
+        is_desktop_mac=is_desktop_mac_ua(ua),
+        is_windows="windows" in ua,
+        is_linux="linux" in ua,
+        is_chromium=is_chromium_ua(ua),
+        platform_family=platform_family_from_user_agent(ua),
+        has_automation_marker=contains_any(ua, AUTOMATION_MARKERS),
+        has_bot_marker=contains_any(ua, BOT_UA_MARKERS),
+        has_strong_bot_marker=contains_any(ua, STRONG_BOT_UA_MARKERS),
+    )
+
+
+@pytest.fixture
+def empty_cache() -> Iterator[None]:
+    classify_user_agent.cache_clear()
+    yield
+    classify_user_agent.cache_clear()
+
+
+def test_desktop_chrome() -> None:
+    facts = classify_user_agent(CHROME_WINDOWS)
+    assert facts.is_windows and facts.is_chromium
+    assert facts.platform_family == "windows"
+    assert not (facts.is_mobile or facts.is_tablet or facts.is_ios or facts.is_linux)
+    assert not (facts.has_automation_marker or facts.has_bot_marker)
+
+
+def test_mobile_safari() -> None:
+    facts = classify_user_agent(SAFARI_IPHONE)
+    assert facts.is_mobile and facts.is_ios
+    assert facts.platform_family == "apple"
+    assert not (facts.is_tablet or facts.is_chromium or facts.is_desktop_mac)
+
+
+def test_android_without_mobile_token_is_a_tablet() -> None:
+    facts = classify_user_agent(ANDROID_TABLET)
+    assert facts.is_android and facts.is_tablet and facts.is_mobile
+    assert facts.is_linux and facts.platform_family == "android"
+
+
+def test_headless_browser_has_automation_marker() -> None:
+    facts = classify_user_agent(HEADLESS_LINUX)
+    assert facts.has_automation_marker
+    assert not facts.has_bot_marker and not facts.has_strong_bot_marker
+    assert facts.platform_family == "linux"
+
+
+@pytest.mark.parametrize(
+    ("user_agent", "bot", "strong_bot"),
+    [
+        ("Mozilla/5.0 (compatible; Googlebot/2.1)", True, False),
+        ("curl/8.4.0", True, True),
+        ("python-requests/2.31.0", False, True),
+        ("Wget/1.21", True, True),
+    ],
+)
+def test_bot_markers(user_agent: str, bot: bool, strong_bot: bool) -> None:
+    facts = classify_user_agent(user_agent)
+    assert facts.has_bot_marker is bot
+    assert facts.has_strong_bot_marker is strong_bot
+
+
+def test_repeated_user_agent_is_a_cache_hit(empty_cache: None) -> None:
+    first = classify_user_agent(CHROME_WINDOWS)
+    assert classify_user_agent(CHROME_WINDOWS) is first
+    classify_user_agent(SAFARI_IPHONE)
+    info = classify_user_agent.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 2, 2)
+    assert info.maxsize == UA_CLASSIFICATION_CACHE_SIZE
+
+
+def test_cache_is_bounded_and_evicts_least_recently_used(empty_cache: None) -> None:
+    classify_user_agent(CHROME_WINDOWS)
+    for n in range(UA_CLASSIFICATION_CACHE_SIZE):
+        classify_user_agent(f"agent/{n}")
+        if n % 100 == 0:
+            classify_user_agent(CHROME_WINDOWS)  # kept recent, never evicted
+    assert classify_user_agent.cache_info().currsize == UA_CLASSIFICATION_CACHE_SIZE
+
+    hits = classify_user_agent.cache_info().hits
+    classify_user_agent(CHROME_WINDOWS)
+    assert classify_user_agent.cache_info().hits == hits + 1
+    classify_user_agent("agent/0")
+    assert classify_user_agent.cache_info().hits == hits + 1
+
+
+def test_matches_uncached_classification_on_random_agents() -> None:
+    rng = random.Random(5)
+    tokens = [
+        *AUTOMATION_MARKERS,
+        *BOT_UA_MARKERS,
+        *STRONG_BOT_UA_MARKERS,
+        "Mozilla/5.0",
+        "Windows NT 10.0",
+        "Macintosh",
+        "iPhone",
+        "iPad",
+        "Android 14",
+        "Mobile",
+        "Tablet",
+        "CrOS",
+        "X11; Linux",
+        "Chrome/120",
+        "CriOS/120",
+        "Edg/120",
+        "OPR/100",
+        "Safari/605",
+        "  ",
+    ]
+    agents = [CHROME_WINDOWS, SAFARI_IPHONE, ANDROID_TABLET, HEADLESS_LINUX]
+    for _ in range(2000):
+        parts = rng.choices(tokens, k=rng.randint(1, 6))
+        agents.append(
+            " ".join(part.upper() if rng.random() < 0.2 else part for part in parts)
+        )
+    for user_agent in agents:
+        expected = _parse_user_agent(user_agent)
+        assert classify_user_agent(user_agent) == expected, user_agent